@@ -1,65 +1,82 @@
 import pygame
 import constantes as constantes
 from collections import deque
+from utils.blackboard import get_blackboard
+from utils.trace import get_trace
 
 class BDIAgent:
     """
     Agrega dados de shared_info de todos os colegas, gera crenças,
-    formula desejos, intenções e executa plano (coletar/entregar)."""
+    formula desejos, intenções e executa plano (coletar/entregar).
+    As crenças são mantidas de forma incremental: coletas invalidam só a
+    crença afetada, e dos painéis dos colegas só as novidades são lidas.
+    Cada mudança de crença é publicada no quadro (utils.blackboard), de
+    onde os colegas puxam os deltas. Um passo sem mudanças não percorre
+    crenças nem recursos."""
     def __init__(self, env, x, y, base_x, base_y, grid):
         self.env = env
         self.x, self.y = x, y
         self.name = "BDI"
         self.base_x, self.base_y = base_x, base_y
-        self.grid = grid  # Lista de recursos reais
+        self.grid = grid  # recursos.ResourceIndex dos recursos reais
         self.color = constantes.BDI_COLOR
         self.beliefs = {} # Informações acumuladas de todos
         self.desires = [] # Painel que pode ser consultado pelos outros
         self.in_storm = False
+        self.cursors = {}       # agente -> cursor no log do seu painel
+        self.board = get_blackboard(env)
+        self.trace = get_trace(env)
+        self.grid.subscribe(self.on_collect)
         self.process = env.process(self.run())
 
+    def on_collect(self, res):
+        """Coleta de um recurso: invalida apenas a crença sobre ele."""
+        if self.beliefs.get((res.x, res.y)) == res.type:
+            del self.beliefs[(res.x, res.y)]
+            self.board.retract((res.x, res.y))
+            if self.trace is not None:
+                self.trace.belief(self.id, (res.x, res.y), None)
+
     def validate_beliefs(self):
-        """Remove crenças sobre recursos já coletados ou inexistentes"""
-        to_remove = []
-        for pos, rtype in self.beliefs.items():
-            resource_exists = False
-            for res in self.grid:
-                if not res.collected and (res.x, res.y) == pos and res.type == rtype:
-                    resource_exists = True
-                    break
-            
-            if not resource_exists:
-                to_remove.append(pos)
+        """
+        Remove crenças sobre recursos já coletados ou inexistentes.
+        Varredura completa; com `on_collect` ela só é necessária se recursos
+        forem coletados por fora do ResourceIndex."""
+        to_remove = [
+            pos for pos, rtype in self.beliefs.items()
+            if not self.grid.is_available(pos, rtype)
+        ]
         
         for pos in to_remove:
             self.beliefs.pop(pos)
+            self.board.retract(pos)
+            if self.trace is not None:
+                self.trace.belief(self.id, pos, None)
 
 
 
     def update_beliefs_from_agents(self):
-        """Agrega informações válidas dos agentes"""
-        temp_beliefs = {}
-        for ag in getattr(self.env, 'agents', []):
-            if ag is not self and hasattr(ag, 'shared_info'):
-                if (ag.x, ag.y) == (self.base_x, self.base_y):
-                    # Filtra apenas recursos não coletados
-                    for pos, rtype in ag.shared_info.items():
-                        if any(not res.collected and (res.x, res.y) == pos for res in self.grid):
-                            temp_beliefs[pos] = rtype
-        self.beliefs = temp_beliefs
-
-    def broadcast_to_agents(self):
-        """Atualiza os painéis (shared_info) de todos os colegas que estão na base."""
+        """Agrega as novidades dos painéis dos agentes que estão na base"""
         for ag in getattr(self.env, 'agents', []):
             if ag is not self and hasattr(ag, 'shared_info'):
                 if (ag.x, ag.y) == (self.base_x, self.base_y):
-                    ag.shared_info.update(self.beliefs)
+                    panel = ag.shared_info
+                    if hasattr(panel, 'changes_since'):
+                        keys, self.cursors[ag] = panel.changes_since(self.cursors.get(ag))
+                    else:
+                        keys = list(panel)
+                    for pos in keys:
+                        rtype = panel.get(pos)
+                        # Filtra apenas recursos não coletados
+                        if rtype is not None and pos not in self.beliefs and self.grid.is_available(pos, rtype):
+                            self.beliefs[pos] = rtype
+                            self.board.publish(rtype, pos, rtype)
+                            if self.trace is not None:
+                                self.trace.belief(self.id, pos, rtype)
 
     def run(self):
         while True:
-            self.validate_beliefs()  # Valida antes de atualizar
             self.update_beliefs_from_agents()
-            self.broadcast_to_agents()
             yield self.env.timeout(1)
 
 
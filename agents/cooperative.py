@@ -1,14 +1,23 @@
 import pygame
 from collections import deque
 import constantes
-from utils.resource_manager import register_delivery
-from agents.reactive import ReactiveAgent
+from utils.navigation import get_home_field
+from utils.shared_panel import SharedPanel
+from utils.pathfinding import find_path, get_obstacle_map
+from utils.metrics import metrics_for, LOG_DEBUG
+from utils.trace import get_trace
+from utils.perception import get_perception
+from utils.allocation import get_allocator
 
 class CooperativeAgent:
     """
-    Fica na base. Só sai quando o BDI informar um alvo cooperativo (estrutura/diamante).
-    Vai com outro agente cooperar, baseado em utilidade (valor/distância).
+    Fica na base. Só sai quando o alocador de tarefas (utils.allocation)
+    lhe dá uma estrutura e uma equipe: as estruturas vêm do BDI pelo quadro
+    e são distribuídas por utilidade (valor/distância). É o líder da equipe:
+    coleta quando todos chegaram e volta à base.
+    Com `sensor_range` > 0 também oferece ao alocador as estruturas que percebe da base.
     """
+    sensor_range = 0    # alcance da percepção (Manhattan); 0 = só o que o BDI informa
 
     def __init__(self, env, x, y, grid, base_x, base_y, obstacles):
         self.env = env
@@ -17,13 +26,18 @@ class CooperativeAgent:
         self.grid = grid
         self.base_x, self.base_y = base_x, base_y
         self.obstacles = obstacles
+        self.obstacle_map = get_obstacle_map(env, obstacles)
+        self.home = get_home_field(env, (base_x, base_y), self.obstacle_map)
         self.color = constantes.COOPERATIVE_COLOR
         self.resources_collected = 0
-        self.shared_info = {}
-        self.plan = []
+        self.shared_info = SharedPanel()
+        self.allocator = get_allocator(env, grid, self.home)
+        self.metrics = metrics_for(env)
+        self.trace = get_trace(env)
+        self.plan = deque()
         self.target = None
-        self.collecteds = []
-        self.waiting = False
+        self.task = None        # utils.allocation.Task em andamento
+        self.waiting = False    # pediu tarefa e aguarda equipe
         self.in_storm = False
         self.process = env.process(self.run())
 
@@ -33,109 +47,83 @@ class CooperativeAgent:
             if self.in_storm:
                 yield from self.return_to_base()
                 self.in_storm = False
+                # Retoma a tarefa a partir da base (ou descarta o resto do caminho)
+                if self.task is not None and not self.task.done:
+                    self.plan = self.find_path((self.x, self.y), self.task.pos)
+                else:
+                    self.plan = deque()
                 continue
 
-            # Sempre começa na base
-            if (self.x, self.y) == (self.base_x, self.base_y):
-                # Se ainda não tem alvo, busca alvos cooperativos no shared_info
-                if not self.target:
-                    coop_targets = [
-                        pos for pos, tipo in self.shared_info.items()
-                        if tipo in ['estrutura']
-                    ]
-                    print(f"ESTRUTURAS DO COOPERATIVO: {coop_targets}")
-                    #O cooperativo só esta indo na primeira estrutura encontrada
-                    if coop_targets:
-                        for position in coop_targets:
-                            if position not in self.collecteds:
-                                self.target = position
-                                self.plan = self.find_path((self.x, self.y), self.target)
-                                self.waiting = True
-
-                                print(f"[COOP] Aguardando parceiro para {self.target}")
-                            #O COOPERATIVO NÃO VOLTA
+            # Sempre começa na base: sem tarefa, pede uma ao alocador
+            if self.task is None and not self.plan and (self.x, self.y) == (self.base_x, self.base_y):
+                if self.sensor_range > 0:
+                    for res in get_perception(self.env, self.grid).within_radius(
+                            self.x, self.y, self.sensor_range, 'estrutura'):
+                        self.allocator.add((res.x, res.y), res.type)
+                task = self.allocator.request(self)
+                if task is not None:
+                    self.metrics.log(LOG_DEBUG, "[COOP] Indo com equipe para %s", task.pos)
+                elif not self.waiting:
+                    self.metrics.log(LOG_DEBUG, "[COOP] Aguardando tarefa")
+                self.waiting = task is None
 
-                # Se estiver esperando e parceiro chegou com mesmo alvo, prossegue
-                if self.waiting and self.has_partner():
-                    print(f"[COOP] Indo com parceiro para {self.target}")
-                    self.waiting = False
-                    self.collecteds.append(self.target)
-
-            # Se já tem plano e não está esperando, signfica que já tem alguem pra ir com ele
-            if self.plan and not self.waiting: #Se tem um plano e não está esperando
-                nx, ny = self.plan.pop(0)
+            if self.plan:
+                nx, ny = self.plan.popleft()
                 self.x, self.y = nx, ny
-                #Anda anda até chegar no recurso, depois tem que voltar
-
-                # Ao chegar no destino, tenta coletar
-                if (self.x, self.y) == self.target: #AQUI
-                    for res in self.grid:
-                        if not res.collected and (res.x, res.y) == self.target: #Se n ele pode coletar outros no caminho
-                            res.collected = True
-                            self.resources_collected += res.value
-                            register_delivery(self.name, res.type)
-                            print(f"[COOP] Recurso {res.type} coletado em {self.target}")
-                            self.return_to_base()
-                            break
-                    # Limpa dados
-                    self.target = None
-                    self.plan = []
-                    self.waiting = False
+                if self.trace is not None:
+                    self.trace.move(self.id, self.x, self.y)
 
-            # Se o recurso foi pego por outro antes, limpa o alvo
-            if self.target:
-                found = any(not res.collected and (res.x, res.y) == self.target for res in self.grid)
-                if not found:
-                    print(f"[COOP] Recurso em {self.target} indisponível. Resetando.")
-                    self.target = None
-                    self.plan = []
-                    self.waiting = False
+            # No destino, coleta quando toda a equipe chegou
+            task = self.task
+            if task is not None and not self.plan and (self.x, self.y) == task.pos and self.allocator.ready(task):
+                self.collect_task(task)
 
             yield self.env.timeout(1)
 
-    def has_partner(self):
-        """Verifica se outro agente cooperativo está na base com o mesmo alvo."""
-        for ag in self.env.agents:
-            if ag is not self and not isinstance(ag, ReactiveAgent) and ag.name != "BDI":
-                if (ag.x, ag.y) == (self.base_x, self.base_y) and not ag.plan:
-                    ag.coperating = True
-                    ag.plan = self.plan
-                    return True
-        return False
+    def assign_task(self, task, plan):
+        """
+        Chamado pelo alocador: nova tarefa com o caminho até ela, ou None
+        (a tarefa sumiu e não há outra) = voltar à base.
+        """
+        self.task = task
+        self.waiting = False
+        if task is None:
+            self.target = None
+            self.plan = self.home.path_home((self.x, self.y))
+        else:
+            self.target = task.pos
+            self.plan = plan
+
+    def collect_task(self, task):
+        # Conclui antes de coletar: a coleta avisa o alocador, que senão
+        # trataria a estrutura como perdida e replanejaria a equipe
+        self.allocator.complete(task)
+        res = self.grid.at(task.pos)
+        if res is not None:
+            self.grid.collect(res)
+            if self.trace is not None:
+                self.trace.collect(self.id, res)
+            self.resources_collected += res.value
+            self.metrics.record_delivery(self.name, res.type)
+            if self.trace is not None:
+                self.trace.deliver(self.id, self.x, self.y, res.type)
+            self.metrics.log(LOG_DEBUG, "[COOP] Recurso %s coletado em %s", res.type, task.pos)
+        self.assign_task(None, None)
 
     def find_path(self, start, goal):
-        """Busca caminho usando BFS."""
-        queue = deque([start])
-        visited = {start: None}
-        dirs = [(1,0), (-1,0), (0,1), (0,-1)]
-        while queue:
-            cx, cy = queue.popleft()
-            if (cx, cy) == goal:
-                break
-            for dx, dy in dirs:
-                nx, ny = cx + dx, cy + dy
-                if (0 <= nx < constantes.GRID_WIDTH and
-                    0 <= ny < constantes.GRID_HEIGHT and
-                    (nx, ny) not in visited and
-                    (nx, ny) not in [(o.x, o.y) for o in self.obstacles]):
-                    visited[(nx, ny)] = (cx, cy)
-                    queue.append((nx, ny))
-        path, node = [], goal
-        while node and node != start:
-            path.append(node)
-            node = visited[node]
-        path.reverse()
-        return path
+        """Busca caminho com A* sobre o bitmap de obstáculos."""
+        return find_path(start, goal, self.obstacle_map)
 
     def return_to_base(self):
         """Retorna à base durante tempestade."""
         while (self.x, self.y) != (self.base_x, self.base_y):
-            dx = self.base_x - self.x
-            dy = self.base_y - self.y
-            self.x += 1 if dx > 0 else -1 if dx < 0 else 0
-            self.y += 1 if dy > 0 else -1 if dy < 0 else 0
+            step = self.home.next_step((self.x, self.y))
+            if step is None:
+                break  # sem caminho até a base
+            self.x, self.y = step
+            if self.trace is not None:
+                self.trace.move(self.id, self.x, self.y)
             yield self.env.timeout(1)
-            #Vou usar essa função
 
     def draw(self, screen): 
         """
@@ -1,78 +1,101 @@
 import pygame
 from collections import deque
 import constantes
-from utils.resource_manager import register_delivery
+from utils.navigation import get_home_field
+from utils.shared_panel import SharedPanel
+from utils.blackboard import get_blackboard, pull_updates
+from utils.pathfinding import find_path, get_obstacle_map
+from utils.metrics import metrics_for
+from utils.trace import get_trace
+from utils.allocation import get_allocator
 
 class GoalBasedAgent:
     """
     Agente baseado em objetivos. Recebe objetivos do BDI via shared_info
     quando está na base, segue até o objetivo e coleta. Não pondera valor.
+    Livre na base, pode ser chamado pelo alocador de tarefas
+    (utils.allocation) como parceiro de um cooperativo numa estrutura.
     """
     def __init__(self, env, x, y, grid, base_x, base_y, obstacles):
         self.env = env
+        self.metrics = metrics_for(env)
+        self.trace = get_trace(env)
         self.x, self.y = x, y
         self.name = "Baseado em Objetivo"
         self.grid = grid
         self.coperating = False
         self.base_x, self.base_y = base_x, base_y
         self.obstacles = obstacles
+        self.obstacle_map = get_obstacle_map(env, obstacles)
+        self.home = get_home_field(env, (base_x, base_y), self.obstacle_map)
         self.color = constantes.GOALBASED_COLOR
         self.resources_collected = 0
-        self.shared_info = {} # Atualizado pelo BDI na base
-        self.plan = []
+        self.shared_info = SharedPanel() # Atualizado pelo quadro do BDI na base
+        self.board = get_blackboard(env)
+        self.board_version = 0           # última versão do quadro já vista
+        self.plan = deque()
         self.target = None
+        self.goal = None             # destino do passo (alvo ou base); persiste entre passos
         self.in_storm = False
         self.carrying = None
         self.failed_targets = set()  # Conjunto de targets que falharam
+        self.task = None             # tarefa cooperativa (utils.allocation.Task)
+        self.allocator = get_allocator(env, grid, self.home)
+        self.allocator.register(self)
         self.process = env.process(self.run())
 
     def is_resource_available(self, pos):
         """Verifica se o recurso na posição está disponível"""
-        return any(not res.collected and (res.x, res.y) == pos for res in self.grid)
+        return self.grid.is_available(pos)
 
     def find_path(self, start, goal):
-        q = deque([start])
-        visited = {start: None}
-        dirs = [(1,0),(-1,0),(0,1),(0,-1)]
-        while q:
-            cx, cy = q.popleft()
-            if (cx,cy) == goal:
-                break
-            for dx, dy in dirs:
-                nx, ny = cx + dx, cy + dy
-                if (0 <= nx < constantes.GRID_WIDTH and
-                    0 <= ny < constantes.GRID_HEIGHT and
-                    (nx,ny) not in visited and
-                    (nx,ny) not in [(o.x, o.y) for o in self.obstacles]):
-                    visited[(nx,ny)] = (cx,cy)
-                    q.append((nx,ny))
-        path, node = [], goal
-        while node and node != start:
-            path.append(node)
-            node = visited[node]
-        path.reverse()
-        return path
+        """Busca caminho com A* sobre o bitmap de obstáculos."""
+        return find_path(start, goal, self.obstacle_map)
+
+    def available_for_task(self):
+        """Livre para uma tarefa cooperativa: parado na base, sem carga nem plano."""
+        return (not self.coperating and not self.carrying and not self.plan
+                and (self.x, self.y) == (self.base_x, self.base_y))
+
+    def assign_task(self, task, plan):
+        """Chamado pelo alocador: tarefa com o caminho até ela, ou None = voltar à base."""
+        self.task = task
+        self.coperating = True
+        self.target = self.goal = None
+        self.plan = self.home.path_home((self.x, self.y)) if task is None else plan
 
     def run(self):
         while True:
             if self.in_storm:
                 yield from self.return_to_base()
                 self.in_storm = False
+                if self.coperating:
+                    # Retoma a tarefa a partir da base (ou descarta o resto do caminho)
+                    if self.task is not None and not self.task.done:
+                        self.plan = self.find_path((self.x, self.y), self.task.pos)
+                    else:
+                        self.plan = deque()
             else:
                 if self.carrying:
-                    goal = (self.base_x, self.base_y) #Aqui muda o objetivo para a base
+                    self.goal = (self.base_x, self.base_y) #Aqui muda o objetivo para a base
                 elif self.coperating:
-                    #Aqui o plan já é atualizado para o mesmo do cooperativo
+                    # O plano leva à estrutura; lá espera o líder coletar e então volta
+                    if not self.plan and (self.task is None or self.task.done):
+                        if (self.x, self.y) == (self.base_x, self.base_y):
+                            self.coperating = False
+                            self.task = None
+                        else:
+                            self.plan = self.home.path_home((self.x, self.y))
                     if self.plan:
-                        nx, ny = self.plan.pop(0)
+                        nx, ny = self.plan.popleft()
                         self.x, self.y = nx, ny
-                    else:
-                        self.carrying = "estrutura"
-                        self.coperating = False
-                        register_delivery(self.name, self.carrying)
+                        if self.trace is not None:
+                            self.trace.move(self.id, self.x, self.y)
 
                 else:
                     if (self.x, self.y) == (self.base_x, self.base_y):
+                        # Puxa do quadro só o que mudou desde a última visita
+                        self.board_version = pull_updates(self.board, self.shared_info, self.board_version)
                         # Filtra targets válidos (disponíveis e não falhados anteriormente)
                         valid_targets = {
                             pos: rtype for pos, rtype in self.shared_info.items()
@@ -81,43 +104,51 @@ class GoalBasedAgent:
                         
                         if valid_targets:
                             self.target = next(iter(valid_targets.keys()))
-                            self.shared_info.clear()
                             "possicao_do_recurso: tipo_do_recurso"
                         else:
                             self.target = None
                     
-                    goal = self.target
+                    self.goal = self.target
 
-                if goal:
-                    if (self.x, self.y) == goal:
+                if self.goal:
+                    if (self.x, self.y) == self.goal:
                         if self.carrying and self.carrying != "estrutura":
                             self.deliver()
                         else:
                             self.collect_here()
                             if not self.carrying:  # Se não coletou
-                                self.failed_targets.add(goal)  # Marca como falhado
+                                self.failed_targets.add(self.goal)  # Marca como falhado
                                 self.target = None
                     elif not self.plan:
-                        self.plan = self.find_path((self.x, self.y), goal)
+                        if self.goal == (self.base_x, self.base_y):
+                            self.plan = self.home.path_home((self.x, self.y))
+                        else:
+                            self.plan = self.find_path((self.x, self.y), self.goal)
                     
                     if self.plan:
-                        nx, ny = self.plan.pop(0)
+                        nx, ny = self.plan.popleft()
                         self.x, self.y = nx, ny
+                        if self.trace is not None:
+                            self.trace.move(self.id, self.x, self.y)
                     
                 yield self.env.timeout(1)
 
     def collect_here(self):
         """Tenta coletar o recurso na posição atual"""
-        for res in self.grid:
-            if not res.collected and (res.x, res.y) == (self.x, self.y) and res.type != "estrutura":
-                res.collected = True
-                self.carrying = res.type #É o tipo do recurso
-                self.resources_collected += res.value
-                register_delivery(self.name, self.carrying)
-                
-                # Remove de failed_targets se estava lá
-                self.failed_targets.discard((self.x, self.y))
-                return True
+        res = self.grid.at((self.x, self.y))
+        if res is not None and res.type != "estrutura":
+            self.grid.collect(res)
+            if self.trace is not None:
+                self.trace.collect(self.id, res)
+            self.carrying = res.type #É o tipo do recurso
+            self.resources_collected += res.value
+            self.metrics.record_delivery(self.name, self.carrying)
+            if self.trace is not None:
+                self.trace.deliver(self.id, self.x, self.y, self.carrying)
+            
+            # Remove de failed_targets se estava lá
+            self.failed_targets.discard((self.x, self.y))
+            return True
         
         # Se chegou aqui, não encontrou recurso
         return False
@@ -125,16 +156,19 @@ class GoalBasedAgent:
     def return_to_base(self):
         """Retorna diretamente à base durante tempestades"""
         while (self.x, self.y) != (self.base_x, self.base_y):
-            dx = self.base_x - self.x
-            dy = self.base_y - self.y
-            self.x += 1 if dx > 0 else -1 if dx < 0 else 0
-            self.y += 1 if dy > 0 else -1 if dy < 0 else 0
+            step = self.home.next_step((self.x, self.y))
+            if step is None:
+                break  # sem caminho até a base
+            self.x, self.y = step
+            if self.trace is not None:
+                self.trace.move(self.id, self.x, self.y)
             yield self.env.timeout(1)
 
     def deliver(self):
         """Entrega o recurso na base"""
-        from utils.resource_manager import register_delivery
-        register_delivery(self.name, self.carrying)
+        self.metrics.record_delivery(self.name, self.carrying)
+        if self.trace is not None:
+            self.trace.deliver(self.id, self.x, self.y, self.carrying)
         self.carrying = None
 
     def draw(self, screen):
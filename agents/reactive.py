@@ -1,21 +1,34 @@
 import random
 import constantes
-from utils.resource_manager import register_delivery
+from utils.navigation import get_home_field
+from utils.shared_panel import SharedPanel
+from utils.pathfinding import get_obstacle_map
+from utils.metrics import metrics_for
+from utils.trace import get_trace
+from utils.perception import get_perception, step_towards
 class ReactiveAgent:
     """
     Agente puramente reativo: anda aleatoriamente, coleta cristais e registra
     no painel local (shared_info) todos os recursos vistos na vizinhança.
+    Com `sensor_range` > 1 percebe um raio maior (utils.perception) e anda
+    em direção ao cristal mais próximo que estiver ao alcance.
     """
+    sensor_range = 1    # alcance da percepção (Manhattan); 1 = vizinhança-4
+
     def __init__(self, env, x, y, grid, base_x, base_y, obstacles):
         self.env = env
+        self.metrics = metrics_for(env)
+        self.trace = get_trace(env)
         self.x, self.y = x, y
         self.name = "Reativo"
-        self.grid = grid                # lista de Resource
+        self.grid = grid                # recursos.ResourceIndex
         self.base_x, self.base_y = base_x, base_y
         self.obstacles = obstacles
+        self.obstacle_map = get_obstacle_map(env, obstacles)
+        self.home = get_home_field(env, (base_x, base_y), self.obstacle_map)
         self.color = constantes.REACTIVE_COLOR
         self.resources_collected = 0
-        self.shared_info = {}           # painel local
+        self.shared_info = SharedPanel() # painel local
         self.in_storm = False
         # dispara o processo de simulação
         self.process = env.process(self.run())
@@ -24,26 +37,55 @@ class ReactiveAgent:
         dx, dy = random.choice([(1,0),(-1,0),(0,1),(0,-1)])
         nx = max(0, min(self.x+dx, constantes.grid_width-1))
         ny = max(0, min(self.y+dy, constantes.grid_height-1))
-        if (nx,ny) not in [(o.x, o.y) for o in self.obstacles]:
+        if not self.obstacle_map.is_blocked(nx, ny):
             self.x, self.y = nx, ny
+            if self.trace is not None:
+                self.trace.move(self.id, self.x, self.y)
+
+    def seek_crystal(self):
+        """Um passo em direção ao cristal percebido mais próximo; False se não há nenhum."""
+        res = get_perception(self.env, self.grid).nearest(self.x, self.y, 'cristal', self.sensor_range)
+        if res is None or not step_towards(self, (res.x, res.y)):
+            return False
+        if self.trace is not None:
+            self.trace.move(self.id, self.x, self.y)
+        return True
+
+    def sense(self):
+        """Registra no painel os recursos percebidos ao redor (exceto a própria célula)."""
+        if self.sensor_range <= 1:
+            for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
+                nx, ny = self.x+dx, self.y+dy
+                res = self.grid.at((nx, ny))
+                if res is not None:
+                    self.shared_info[(nx,ny)] = res.type
+            return
+        for res in get_perception(self.env, self.grid).within_radius(self.x, self.y, self.sensor_range):
+            if (res.x, res.y) != (self.x, self.y):
+                self.shared_info[(res.x, res.y)] = res.type
 
     def collect_if_crystal(self):
-        for res in self.grid:
-            if not res.collected and res.type=='cristal' and res.x==self.x and res.y==self.y:
-                res.collected = True
-                self.resources_collected += res.value
-                register_delivery(self.name, res.type)
-                # registra coleta no painel
-                self.shared_info[(self.x, self.y)] = res.type
-                break
+        res = self.grid.at((self.x, self.y))
+        if res is not None and res.type=='cristal':
+            self.grid.collect(res)
+            if self.trace is not None:
+                self.trace.collect(self.id, res)
+            self.resources_collected += res.value
+            self.metrics.record_delivery(self.name, res.type)
+            if self.trace is not None:
+                self.trace.deliver(self.id, self.x, self.y, res.type)
+            # registra coleta no painel
+            self.shared_info[(self.x, self.y)] = res.type
 
     def return_to_base(self):
-        # movimento direto em linha reta
+        # segue o campo de distâncias da base (desvia de obstáculos)
         while (self.x, self.y) != (self.base_x, self.base_y):
-            dx = self.base_x - self.x
-            dy = self.base_y - self.y
-            self.x += 1 if dx>0 else -1 if dx<0 else 0
-            self.y += 1 if dy>0 else -1 if dy<0 else 0
+            step = self.home.next_step((self.x, self.y))
+            if step is None:
+                break  # sem caminho até a base
+            self.x, self.y = step
+            if self.trace is not None:
+                self.trace.move(self.id, self.x, self.y)
             yield self.env.timeout(1)
 
     def run(self):
@@ -54,14 +96,10 @@ class ReactiveAgent:
                 self.in_storm = False
             else:
                 # antes de mover, registra vizinhança
-                for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-                    nx, ny = self.x+dx, self.y+dy
-                    for res in self.grid:
-                        if (not res.collected and 
-                            (res.x,res.y)==(nx,ny)):
-                            self.shared_info[(nx,ny)] = res.type
+                self.sense()
                 # movimenta e tenta coletar
-                self.move_randomly()
+                if self.sensor_range <= 1 or not self.seek_crystal():
+                    self.move_randomly()
                 self.collect_if_crystal()
                 yield self.env.timeout(1)
 
@@ -0,0 +1,429 @@
+# agents/sharded.py
+#
+# ReactiveSwarm repartido entre processos, para mundos e enxames grandes
+# demais para um núcleo. EXPERIMENTAL: confere com o enxame de um processo,
+# mas o ganho só aparece com núcleos livres (benchmarks/bench_swarm.py
+# --shards mede a vazão e projeta o tempo com um núcleo por processo).
+#
+# A grade é repartida em faixas contíguas de células, em ordem de linha,
+# cada uma de um processo trabalhador, dono do estado da faixa:
+#   - os agentes que estão nela, em vetores próprios (id global, x, y,
+#     voltando), sem cópia no coordenador;
+#   - as células de recurso da faixa: a máscara de coletados fica em
+#     memória compartilhada e cada faixa só escreve nas suas células.
+# Para que uma célula cheia (a base, depois da tempestade) não pese toda
+# numa faixa, o dono de um agente é dado pela chave célula * tamanho + id:
+# uma célula pode ficar dividida entre faixas vizinhas, e a coleta nela é
+# decidida pelo coordenador (no máximo uma por fronteira).
+#
+# Cada passo tem duas fases separadas por barreiras:
+#   1. cada faixa sorteia as direções dos seus agentes (agents.swarm.
+#      directions: depende só de chave, passo e id, então dá o mesmo que
+#      num processo), move-os e põe na sua caixa de saída, em memória
+#      compartilhada, o registro completo de quem saiu da faixa;
+#   2. cada faixa recebe quem entrou e resolve as coletas nas suas células
+#      (menor id vence, como no enxame de um processo).
+# O coordenador (o processo SimPy) só faz o que é global: a base, a
+# tempestade (um sinal para todas as faixas), os outros agentes e o BDI,
+# e a junção das coletas (métricas, ResourceIndex e trace, em ordem de
+# célula). O trabalho dele por passo é proporcional às coletas, não ao
+# tamanho do enxame. As posições só vêm para o coordenador quando alguém
+# as pede (`sync`: desenho, ponto de salvamento, mapas de visitados).
+# As faixas são reequilibradas pelo número de agentes de tempos em tempos;
+# quem muda de dono passa pelas mesmas caixas.
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+from mundo import RESOURCE_CODES, np
+from agents.swarm import ReactiveSwarm, move_agents, collect_crystals, directions, _DX, _DY
+
+BALANCE_INTERVAL = 10   # passos entre verificações do equilíbrio das faixas
+BALANCE_SLACK = 1.2     # reequilibra se a faixa mais cheia passar disto x a média
+SAMPLES = 256           # chaves que cada faixa manda ao coordenador para reequilibrar
+
+# Posições em `control`
+CMD = 0         # comando do coordenador
+TICK = 1        # passo atual (para `directions`)
+KEY = 2         # chave do gerador
+STORM = 3       # 1: a tempestade começou, todos voltam à base
+BALANCE = 4     # 1: as faixas mandam amostras das chaves antes de mover
+
+# Comandos
+STEP = 0
+LOAD = 1        # cada faixa pega os seus agentes dos vetores globais
+EXPORT = 2      # cada faixa escreve os seus agentes nos vetores globais
+STOP = 3
+
+
+def agent_keys(xs, ys, ids, width, size):
+    """Chave de posse de cada agente: célula em ordem de linha, depois id."""
+    return (ys * width + xs) * size + ids
+
+
+def cut_points(keys, weights, shards, end):
+    """
+    Limites das faixas (shards + 1 chaves; a faixa k possui [cuts[k],
+    cuts[k + 1])) que dividem o peso das chaves em partes iguais.
+    """
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    total = np.cumsum(weights[order])
+    at = np.searchsorted(total, total[-1] * np.arange(1, shards) / shards)
+    return np.concatenate(([0], keys[np.minimum(at, len(keys) - 1)], [end])).astype(np.int64)
+
+
+class ShardPool:
+    """
+    Vetores em memória compartilhada e os processos das faixas. Os vetores
+    são criados no coordenador (`share`) e abertos pelos trabalhadores a
+    partir de `spec` (nome -> (memória, forma, dtype)).
+    """
+    def __init__(self, width):
+        self.width = width
+        self.memory = {}
+        self.arrays = {}
+        self.spec = {}
+        self.processes = []
+        self.barrier = None
+        self.ticks = 0
+        self.critical = 0.0     # soma, por passo, do tempo de CPU da faixa mais lenta
+        self.shard_cpu = None   # tempo de CPU total de cada faixa
+
+    def share(self, name, array):
+        """Cópia de `array` em memória compartilhada (o vetor devolvido é a cópia)."""
+        array = np.ascontiguousarray(array)
+        mem = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=mem.buf)
+        shared[...] = array
+        self.memory[name] = mem
+        self.arrays[name] = shared
+        self.spec[name] = (mem.name, array.shape, array.dtype.str)
+        return shared
+
+    def start(self, shards, base_x, base_y):
+        # `barrier` junta coordenador e faixas; `inner`, só as faixas (entre as fases)
+        self.barrier = multiprocessing.Barrier(shards + 1)
+        inner = multiprocessing.Barrier(shards)
+        self.shard_cpu = np.zeros(shards)
+        for k in range(shards):
+            proc = multiprocessing.Process(target=_shard_worker, daemon=True,
+                                           args=(k, self.spec, self.barrier, inner, base_x, base_y))
+            proc.start()
+            self.processes.append(proc)
+
+    def command(self, cmd):
+        """LOAD ou EXPORT: as faixas leem ou escrevem os vetores globais."""
+        self.arrays['control'][CMD] = cmd
+        self.barrier.wait()
+        self.barrier.wait()
+
+    def step(self, balance=False):
+        """
+        Um passo das faixas; devolve (ids, xs, ys) dos vencedores das
+        coletas, em ordem de célula. Com `balance`, redivide as faixas
+        antes do movimento.
+        """
+        a = self.arrays
+        control = a['control']
+        control[CMD] = STEP
+        control[BALANCE] = balance
+        barrier = self.barrier
+        barrier.wait()      # comando escrito
+        if balance:
+            barrier.wait()  # amostras escritas
+            weight = a['sample_weight']
+            live = weight > 0
+            a['cuts'][:] = cut_points(a['sample'][live].ravel(), np.repeat(weight[live], SAMPLES),
+                                      len(self.processes), a['cuts'][-1])
+            barrier.wait()  # novas faixas publicadas
+        barrier.wait()      # fases 1 e 2 concluídas
+        cpu = a['cpu']
+        self.ticks += 1
+        self.critical += cpu.max()
+        self.shard_cpu += cpu
+
+        # Faixas em ordem de chave: concatenar mantém a ordem de célula...
+        counts = a['win_count']
+        ids, xs, ys = (np.concatenate([a[name][k, :counts[k]] for k in range(len(self.processes))])
+                       for name in ('win_id', 'win_x', 'win_y'))
+        # ...exceto pelas células divididas entre faixas, decididas aqui
+        border = a['border_id']
+        found = border >= 0
+        if found.any():
+            cells, candidates = a['border_cell'][found], border[found]
+            cell_list = np.unique(cells)
+            extra_ids = np.array([candidates[cells == cell].min() for cell in cell_list], dtype=np.int64)
+            extra_y, extra_x = np.divmod(cell_list, self.width)
+            a['world_collected'][extra_y, extra_x] = True
+            ids, xs, ys = (np.concatenate(pair) for pair in ((ids, extra_ids), (xs, extra_x), (ys, extra_y)))
+            order = np.argsort(ys * self.width + xs, kind='stable')
+            ids, xs, ys = ids[order], xs[order], ys[order]
+        return ids, xs, ys
+
+    def close(self):
+        """Encerra os trabalhadores e libera a memória (os vetores deixam de valer)."""
+        if self.processes:
+            self.arrays['control'][CMD] = STOP
+            try:
+                self.barrier.wait()
+            except Exception:
+                pass        # barreira quebrada: algum trabalhador já caiu
+            for proc in self.processes:
+                proc.join()
+            self.processes = []
+        self.arrays.clear()
+        for mem in self.memory.values():
+            try:
+                mem.close()
+            except BufferError:
+                pass        # ainda há uma vista para o vetor; o unlink libera ao fim dela
+            mem.unlink()
+        self.memory.clear()
+
+
+def _open(spec, memory):
+    arrays = {}
+    for name, (mem_name, shape, dtype) in spec.items():
+        mem = memory[name] = shared_memory.SharedMemory(name=mem_name)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=mem.buf)
+    return arrays
+
+
+def _shard_worker(k, spec, barrier, inner, base_x, base_y):
+    memory = {}
+    try:
+        _shard_loop(k, _open(spec, memory), barrier, inner, base_x, base_y)
+    except Exception:
+        barrier.abort()     # o coordenador recebe BrokenBarrierError em vez de travar
+        inner.abort()
+        raise
+    finally:
+        for mem in memory.values():
+            try:
+                mem.close()
+            except BufferError:
+                pass
+
+
+def _shard_loop(k, a, barrier, inner, base_x, base_y):
+    types, collected, obstacles, next_home = a['types'], a['world_collected'], a['obstacles'], a['next_home']
+    control, cuts, load, cpu = a['control'], a['cuts'], a['load'], a['cpu']
+    sample, sample_weight = a['sample'], a['sample_weight']
+    out_id, out_x, out_y, out_dest = a['out_id'], a['out_x'], a['out_y'], a['out_dest']
+    out_returning, out_walking, out_count = a['out_returning'], a['out_walking'], a['out_count']
+    win_id, win_x, win_y, win_count = a['win_id'], a['win_x'], a['win_y'], a['win_count']
+    border_id, border_cell = a['border_id'], a['border_cell']
+    shards = len(out_count)
+    width = obstacles.shape[1]
+    size = len(a['xs'])
+    crystal = RESOURCE_CODES['cristal']
+    dx = np.asarray(_DX, dtype=np.int64)
+    dy = np.asarray(_DY, dtype=np.int64)
+    # Agentes da faixa (sem ordem): id global, posição e se está voltando
+    ids = np.zeros(0, dtype=np.int64)
+    xs = np.zeros(0, dtype=np.int64)
+    ys = np.zeros(0, dtype=np.int64)
+    returning = np.zeros(0, dtype=bool)
+    while True:
+        barrier.wait()
+        cmd = control[CMD]
+        if cmd == STOP:
+            return
+        lo, hi = int(cuts[k]), int(cuts[k + 1])
+        if cmd == LOAD:
+            keys = agent_keys(a['xs'], a['ys'], np.arange(size), width, size)
+            ids = np.flatnonzero((keys >= lo) & (keys < hi))
+            xs, ys, returning = a['xs'][ids], a['ys'][ids], a['returning'][ids]
+            load[k] = ids.size
+            barrier.wait()
+            continue
+        if cmd == EXPORT:
+            a['xs'][ids], a['ys'][ids], a['returning'][ids] = xs, ys, returning
+            barrier.wait()
+            continue
+
+        start = time.process_time()
+        if control[BALANCE]:
+            keys = np.sort(agent_keys(xs, ys, ids, width, size))
+            if keys.size:
+                sample[k] = keys[((np.arange(SAMPLES) + 0.5) * keys.size / SAMPLES).astype(np.int64)]
+            sample_weight[k] = keys.size / SAMPLES
+            spent = time.process_time() - start
+            barrier.wait()
+            barrier.wait()  # o coordenador redividiu as faixas
+            start = time.process_time() - spent
+            lo, hi = int(cuts[k]), int(cuts[k + 1])
+        if control[STORM]:
+            returning[:] = True
+
+        # Fase 1: move os agentes da faixa e despacha quem saiu dela
+        d = directions(int(control[KEY]), int(control[TICK]), ids)
+        walking = move_agents(xs, ys, returning, d, obstacles, next_home, base_x, base_y, dx, dy)
+        keys = agent_keys(xs, ys, ids, width, size)
+        leave = (keys < lo) | (keys >= hi)
+        n = int(np.count_nonzero(leave))
+        out_count[k] = n
+        if n:
+            gone = np.flatnonzero(leave)
+            out_id[k, :n], out_x[k, :n], out_y[k, :n] = ids[gone], xs[gone], ys[gone]
+            out_returning[k, :n], out_walking[k, :n] = returning[gone], walking[gone]
+            out_dest[k, :n] = np.searchsorted(cuts, keys[gone], side='right') - 1
+            stay = np.flatnonzero(~leave)
+            ids, xs, ys, returning, walking = (v.take(stay) for v in (ids, xs, ys, returning, walking))
+        spent = time.process_time() - start
+        inner.wait()
+
+        # Fase 2: recebe quem entrou e coleta
+        start = time.process_time()
+        arrivals = []
+        for j in range(shards):
+            n = out_count[j]
+            if j != k and n:
+                mine = np.flatnonzero(out_dest[j, :n] == k)
+                if mine.size:
+                    arrivals.append((out_id[j, mine], out_x[j, mine], out_y[j, mine],
+                                     out_returning[j, mine], out_walking[j, mine]))
+        if arrivals:
+            ids, xs, ys, returning, walking = (np.concatenate([old] + [arr[f] for arr in arrivals])
+                                               for f, old in enumerate((ids, xs, ys, returning, walking)))
+        cand = np.flatnonzero(walking)
+        cand = cand[(types[ys[cand], xs[cand]] == crystal) & ~collected[ys[cand], xs[cand]]]
+        # Células divididas com a faixa vizinha (a primeira e a última, se a
+        # fronteira cai no meio delas): o menor id candidato vai ao coordenador
+        border_id[k] = -1
+        shared = []
+        if lo % size:
+            shared.append(lo // size)
+        if hi % size and (hi - 1) // size not in shared:
+            shared.append((hi - 1) // size)
+        if shared and cand.size:
+            cells = ys[cand] * width + xs[cand]
+            for slot, cell in enumerate(shared):
+                here = cand[cells == cell]
+                if here.size:
+                    border_id[k, slot] = ids[here].min()
+                    border_cell[k, slot] = cell
+            cand = cand[~np.isin(cells, shared)]
+        winners = collect_crystals(xs, ys, cand, types, collected, ids)
+        n = winners.size
+        win_id[k, :n], win_x[k, :n], win_y[k, :n] = ids[winners], xs[winners], ys[winners]
+        win_count[k] = n
+        load[k] = ids.size
+        cpu[k] = spent + time.process_time() - start
+        barrier.wait()
+
+
+class ShardedSwarm(ReactiveSwarm):
+    """
+    ReactiveSwarm com o estado repartido entre `shards` processos. `xs`,
+    `ys` e `returning` só valem depois de `sync()`; `collected` (por
+    agente) fica sempre no coordenador. Depois de `close`, o enxame segue
+    num processo só (ex.: para salvar um ponto de salvamento).
+    """
+    def __init__(self, env, size, world, base_x, base_y, home, index=None, seed=None, shards=2):
+        super().__init__(env, size, world, base_x, base_y, home, index, seed)
+        self.shards = shards
+        self.pool = None
+        self.share()
+
+    @property
+    def in_storm(self):
+        return self._in_storm
+
+    @in_storm.setter
+    def in_storm(self, value):
+        self._in_storm = value
+        if value:
+            self.returning[:] = True
+            if self.pool is not None:
+                self.pool.arrays['control'][STORM] = 1     # aplicado pelas faixas no próximo passo
+
+    def share(self):
+        """Reparte o estado atual entre as faixas (processos novos)."""
+        if self.pool is not None:
+            self.close()
+        world = self.world
+        size, shards = self.size, self.shards
+        pool = ShardPool(world.width)
+        world.collected = pool.share('world_collected', world.collected)
+        pool.share('types', world.types)
+        pool.share('obstacles', world.obstacles)
+        pool.share('next_home', self.next_home)
+        # Vetores globais (por id): só para carregar e exportar as faixas
+        pool.share('xs', self.xs)
+        pool.share('ys', self.ys)
+        pool.share('returning', self.returning)
+        keys = agent_keys(self.xs, self.ys, np.arange(size), world.width, size)
+        pool.share('cuts', cut_points(keys, np.ones(size), shards, world.width * world.height * size))
+        pool.share('sample', np.zeros((shards, SAMPLES), dtype=np.int64))
+        pool.share('sample_weight', np.zeros(shards))
+        pool.share('load', np.zeros(shards, dtype=np.int64))
+        pool.share('cpu', np.zeros(shards))
+        control = pool.share('control', np.zeros(5, dtype=np.uint64))
+        control[KEY] = self.key
+        # Caixas de saída e vencedores, uma linha por faixa (cabe o enxame todo)
+        for name, dtype in (('out_id', np.int64), ('out_x', np.int64), ('out_y', np.int64),
+                            ('out_dest', np.int64), ('out_returning', bool), ('out_walking', bool),
+                            ('win_id', np.int64), ('win_x', np.int64), ('win_y', np.int64)):
+            pool.share(name, np.zeros((shards, size), dtype=dtype))
+        pool.share('out_count', np.zeros(shards, dtype=np.int64))
+        pool.share('win_count', np.zeros(shards, dtype=np.int64))
+        pool.share('border_id', np.full((shards, 2), -1, dtype=np.int64))
+        pool.share('border_cell', np.zeros((shards, 2), dtype=np.int64))
+        pool.start(shards, self.base_x, self.base_y)
+        pool.command(LOAD)
+        self.pool = pool
+        self.synced = True
+        self.next_balance = self.env.now + BALANCE_INTERVAL
+
+    def sync(self):
+        """Traz `xs`, `ys` e `returning` das faixas para o coordenador."""
+        pool = self.pool
+        if pool is None or self.synced:
+            return
+        pool.command(EXPORT)
+        a = pool.arrays
+        self.xs, self.ys, self.returning = a['xs'].copy(), a['ys'].copy(), a['returning'].copy()
+        if a['control'][STORM]:
+            self.returning[:] = True
+        self.synced = True
+
+    def load_state(self, state):
+        """Estado de um ponto de salvamento (utils.snapshot); o número de faixas é o atual."""
+        shards = self.shards
+        self.__dict__.update(state)
+        self.shards = shards
+        self.share()
+
+    def step(self):
+        pool = self.pool
+        if pool is None:
+            return super().step()
+        control = pool.arrays['control']
+        control[TICK] = self.env.now
+        control[KEY] = self.key
+        balance = False
+        if self.env.now >= self.next_balance:
+            self.next_balance = self.env.now + BALANCE_INTERVAL
+            balance = pool.arrays['load'].max() > BALANCE_SLACK * self.size / self.shards
+        ids, xs, ys = pool.step(balance)
+        control[STORM] = 0
+        self.synced = False
+        if ids.size:
+            self.collected[ids] += 1
+            self._register(xs, ys)
+
+    def draw(self, screen):
+        self.sync()
+        super().draw(screen)
+
+    def close(self):
+        """Encerra as faixas e traz o estado de volta para este processo."""
+        pool = self.pool
+        if pool is None:
+            return
+        self.sync()
+        self.pool = None
+        self.world.collected = self.world.collected.copy()
+        pool.close()
@@ -1,117 +1,174 @@
 import random
 import pygame
+from collections import deque
 import constantes
+from utils.navigation import get_home_field
+from utils.shared_panel import SharedPanel
+from utils.pathfinding import find_path, get_obstacle_map
+from utils.metrics import metrics_for
+from utils.trace import get_trace
+from utils.perception import get_perception
+from utils.blackboard import get_blackboard
+from utils.frontier import get_frontier
 
 class StateBasedAgent:
     '''
     Agente baseado em estados:
-    - Anda pelo ambiente evitando áreas já visitadas.
+    - Explora indo até a fronteira (utils.frontier) mais próxima: células
+      livres vizinhas do que os exploradores já viram, dividida entre eles.
     - Coleta recurso, retorna à base e compartilha informação com o BDI.
     - Prioriza explorar áreas que nem ele nem o BDI conhecem.
+    - Com `sensor_range` > 0, vai até o cristal ou metal percebido mais
+      próximo em vez de explorar.
     '''
+    sensor_range = 0    # alcance da percepção (Manhattan); 0 = só a própria célula
+    use_frontier = True # False = só olha os 4 vizinhos (passo aleatório se todos vistos)
+
     def __init__(self, env, x, y, grid, base_x, base_y, obstacles):
         self.env = env
+        self.metrics = metrics_for(env)
+        self.trace = get_trace(env)
         self.x, self.y = x, y
         self.name = "Baseado em Estado"
         self.grid = grid
         self.coperating = False
         self.base_x, self.base_y = base_x, base_y
         self.obstacles = obstacles
+        self.obstacle_map = get_obstacle_map(env, obstacles)
+        self.home = get_home_field(env, (base_x, base_y), self.obstacle_map)
+        self.board = get_blackboard(env)
+        self.frontiers = get_frontier(env, self.obstacle_map)
+        self.frontiers.visit(x, y)
         self.color = constantes.STATEBASED_COLOR
         self.resources_collected = 0
         self.visited = set()
-        self.shared_info = {}
+        self.shared_info = SharedPanel()
         self.in_storm = False
         self.carrying = None
         self.target = None
+        self.plan = deque()
+        self.route = deque()    # caminho até a fronteira reservada
         self.process = env.process(self.run())
 
+    def step(self, nx, ny):
+        """Anda para (nx, ny) e marca a célula como explorada."""
+        self.x, self.y = nx, ny
+        if self.trace is not None:
+            self.trace.move(self.id, self.x, self.y)
+        self.visited.add((nx, ny))
+        self.frontiers.visit(nx, ny)
+
     def move_to_unvisited(self):
+        """
+        Um passo rumo à célula de fronteira mais próxima que nenhum outro
+        explorador reservou. A reserva é refeita quando o alvo já foi
+        explorado (por qualquer um) ou o agente saiu do caminho (coleta,
+        tempestade). Sem fronteira alcançável, explora só a vizinhança.
+        """
+        if not self.use_frontier:
+            self.move_to_neighbor()
+            return
+        route, goal = self.route, self.frontiers.goal(self.id)
+        if (not route or goal is None or self.frontiers.is_explored(*goal)
+                or abs(route[0][0] - self.x) + abs(route[0][1] - self.y) != 1):
+            route = self.route = self.frontiers.claim((self.x, self.y), self.id) or deque()
+        if not route:
+            self.move_to_neighbor()
+            return
+        self.step(*route.popleft())
+        if not route:
+            self.frontiers.release(self.id)
+
+    def move_to_neighbor(self):
         neighbors = [(self.x+dx, self.y+dy) for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]]
         random.shuffle(neighbors)
-        bdi_knowledge = getattr(self.env, 'bdi_agent', None)
-        known = bdi_knowledge.beliefs.keys() if bdi_knowledge else set()
 
         for nx, ny in neighbors:
             if (0 <= nx < constantes.GRID_WIDTH and
                 0 <= ny < constantes.GRID_HEIGHT and
                 (nx, ny) not in self.visited and
-                (nx, ny) not in known and
-                (nx, ny) not in [(o.x, o.y) for o in self.obstacles]):
-                self.x, self.y = nx, ny
-                self.visited.add((nx, ny))
+                self.board.get((nx, ny)) is None and   # o BDI ainda não conhece
+                not self.obstacle_map.is_blocked(nx, ny)):
+                self.step(nx, ny)
                 return
 
        # fallback aleatório
         for nx, ny in neighbors:
             if (0 <= nx < constantes.GRID_WIDTH and
                 0 <= ny < constantes.GRID_HEIGHT and
-                (nx, ny) not in [(o.x, o.y) for o in self.obstacles]):
-                self.x, self.y = nx, ny
+                not self.obstacle_map.is_blocked(nx, ny)):
+                self.step(nx, ny)
                 return
 
+    def approach_sensed(self):
+        """
+        Segue até o recurso coletável percebido mais próximo (self.target).
+        Devolve False se não há nenhum ao alcance (ou caminho até ele).
+        """
+        if self.sensor_range <= 0:
+            return False
+        if self.target is None or not self.grid.is_available(self.target) or not self.plan:
+            res = get_perception(self.env, self.grid).nearest(
+                self.x, self.y, ('cristal', 'metal'), self.sensor_range)
+            if res is None:
+                self.target = None
+                return False
+            self.target = (res.x, res.y)
+            self.plan = self.find_path((self.x, self.y), self.target)
+            if not self.plan:
+                self.target = None
+                return False
+        self.step(*self.plan.popleft())
+        return True
+
     def collect_here(self):
-        for res in self.grid:
-            if not res.collected and (res.x, res.y) == (self.x, self.y) and self.carrying is None and res.type != "estrutura":
-                res.collected = True
-                self.resources_collected += res.value
-                self.shared_info[(self.x, self.y)] = res.type
-                self.carrying = res.type
-                self.target = (self.base_x, self.base_y)
-                self.plan = self.find_path((self.x, self.y), self.target)
-                break
+        if self.carrying is not None:
+            return
+        res = self.grid.at((self.x, self.y))
+        if res is not None and res.type != "estrutura":
+            self.grid.collect(res)
+            if self.trace is not None:
+                self.trace.collect(self.id, res)
+            self.resources_collected += res.value
+            self.shared_info[(self.x, self.y)] = res.type
+            self.carrying = res.type
+            self.frontiers.release(self.id)
+            self.target = (self.base_x, self.base_y)
+            self.plan = self.home.path_home((self.x, self.y))
 
     def return_to_base(self):
         while (self.x, self.y) != (self.base_x, self.base_y):
-            dx = self.base_x - self.x; dy = self.base_y - self.y
-            self.x += 1 if dx > 0 else -1 if dx < 0 else 0
-            self.y += 1 if dy > 0 else -1 if dy < 0 else 0
+            step = self.home.next_step((self.x, self.y))
+            if step is None:
+                break  # sem caminho até a base
+            self.step(*step)
             yield self.env.timeout(1)
 
     def find_path(self, start, goal):
-        from collections import deque
-        queue = deque([start])
-        visited = {start: None}
-        dirs = [(1,0),(-1,0),(0,1),(0,-1)]
-        while queue:
-            cx, cy = queue.popleft()
-            if (cx, cy) == goal:
-                break
-            for dx, dy in dirs:
-                nx, ny = cx + dx, cy + dy
-                if (0 <= nx < constantes.GRID_WIDTH and
-                    0 <= ny < constantes.GRID_HEIGHT and
-                    (nx, ny) not in visited and
-                    (nx, ny) not in [(o.x, o.y) for o in self.obstacles]):
-                    visited[(nx, ny)] = (cx, cy)
-                    queue.append((nx, ny))
-        path, node = [], goal
-        while node and node != start:
-            path.append(node)
-            node = visited[node]
-        path.reverse()
-        return path
+        """Busca caminho com A* sobre o bitmap de obstáculos."""
+        return find_path(start, goal, self.obstacle_map)
 
     def run(self):
         while True:
             if self.in_storm:
+                self.frontiers.release(self.id)
                 yield from self.return_to_base()
                 self.in_storm = False
             elif self.carrying:
                 if (self.x, self.y) == (self.base_x, self.base_y):
-                    from utils.resource_manager import register_delivery
-                    register_delivery(self.name, self.carrying)
+                    self.metrics.record_delivery(self.name, self.carrying)
+                    if self.trace is not None:
+                        self.trace.deliver(self.id, self.x, self.y, self.carrying)
                     self.carrying = None
                     self.target = None
-                    self.plan = []
+                    self.plan = deque()
                 elif self.plan:
-                    nx, ny = self.plan.pop(0)
-                    self.x, self.y = nx, ny
+                    self.step(*self.plan.popleft())
                 else:
-                    self.plan = self.find_path((self.x, self.y), (self.base_x, self.base_y))
+                    self.plan = self.home.path_home((self.x, self.y))
             else:
                 self.collect_here()
-                if not self.carrying:
+                if not self.carrying and not self.approach_sensed():
                     self.move_to_unvisited()
             yield self.env.timeout(1)
 
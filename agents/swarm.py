@@ -0,0 +1,181 @@
+import random
+import constantes
+from mundo import RESOURCE_CODES, np
+from utils.metrics import metrics_for
+from utils.trace import get_trace
+
+# Deslocamentos na mesma ordem de ReactiveAgent.move_randomly
+_DX = [1, -1, 0, 0]
+_DY = [0, 0, 1, -1]
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def _mix(z):
+    """Finalizador do splitmix64, num inteiro ou num vetor uint64."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def directions(key, tick, ids):
+    """
+    Direção (0..3, índice em _DX/_DY) de cada agente `ids` no passo
+    `tick`. Gerador por contador: o resultado depende só de (chave, passo,
+    agente), não de quem sorteia nem em que ordem; assim o enxame repartido
+    sorteia nas faixas e continua idêntico ao de um processo.
+    """
+    start = _mix((key + (int(tick) + 1) * _GOLDEN) & _MASK)
+    z = ids.astype(np.uint64) * np.uint64(_GOLDEN) + np.uint64(start)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(62)).astype(np.intp)
+
+
+def move_agents(xs, ys, returning, d, obstacles, next_home, base_x, base_y, dx, dy):
+    """
+    Um passo de movimento, no lugar, para os agentes dados (vetores de
+    mesmo tamanho): passo aleatório `d` para quem não está voltando, um
+    passo no campo da base para quem está. Devolve a máscara de quem
+    estava andando (só esses coletam neste passo).
+    """
+    height, width = obstacles.shape
+    returning &= ~((xs == base_x) & (ys == base_y))
+    walking = ~returning
+
+    # Passo aleatório para quem não está voltando
+    nx = np.clip(xs + dx[d], 0, width - 1)
+    ny = np.clip(ys + dy[d], 0, height - 1)
+    move = walking & ~obstacles[ny, nx]
+
+    # Um passo no campo da base para quem está voltando
+    home = np.nonzero(returning)[0]
+    if home.size:
+        nxt = next_home[ys[home] * width + xs[home]]
+        ok = nxt >= 0
+        returning[home[~ok]] = False  # sem caminho até a base
+        home = home[ok]
+        nx[home] = nxt[ok] % width
+        ny[home] = nxt[ok] // width
+        move[home] = True
+        returning[home] &= ~((nx[home] == base_x) & (ny[home] == base_y))
+
+    xs[move] = nx[move]
+    ys[move] = ny[move]
+    return walking
+
+
+def collect_crystals(xs, ys, cand, types, collected, ids=None):
+    """
+    Coleta os cristais sob os agentes `cand` (índices em ordem crescente):
+    marca as células em `collected` e devolve os índices dos vencedores,
+    em ordem de célula. Com vários agentes no mesmo cristal, o de menor
+    índice coleta; com `ids`, o de menor `ids[i]` (e `cand` pode vir em
+    qualquer ordem).
+    """
+    width = types.shape[1]
+    on_crystal = ((types[ys[cand], xs[cand]] == RESOURCE_CODES['cristal']) &
+                  ~collected[ys[cand], xs[cand]])
+    cand = cand[on_crystal]
+    if not cand.size:
+        return cand
+    if ids is not None:
+        cand = cand[np.argsort(ids[cand], kind='stable')]
+    cells, first = np.unique(ys[cand] * width + xs[cand], return_index=True)
+    collected.ravel()[cells] = True
+    return cand[first]
+
+
+class ReactiveSwarm:
+    """
+    Enxame de agentes reativos avançado de uma vez com NumPy, num único
+    processo SimPy. Cada agente segue as regras de ReactiveAgent: passo
+    aleatório (limitado à grade e bloqueado por obstáculos), coleta de
+    cristal na célula e volta à base pelo campo de distâncias durante a
+    tempestade. Quando vários agentes caem no mesmo cristal no mesmo passo,
+    o de menor índice coleta, como na ordem de execução dos processos
+    individuais.
+    """
+    def __init__(self, env, size, world, base_x, base_y, home, index=None, seed=None):
+        if np is None:
+            raise ImportError("agents.swarm.ReactiveSwarm requer numpy (pip install numpy)")
+        self.env = env
+        self.name = "Enxame Reativo"
+        self.id = 0                     # id no trace (definido pela Simulation)
+        self.color = constantes.REACTIVE_COLOR
+        self.size = size
+        self.world = world              # mundo.WorldArrays
+        self.index = index              # recursos.ResourceIndex opcional, mantido em dia
+        self.base_x, self.base_y = base_x, base_y
+        self.xs = np.full(size, base_x, dtype=np.int64)
+        self.ys = np.full(size, base_y, dtype=np.int64)
+        self.returning = np.zeros(size, dtype=bool)
+        self.collected = np.zeros(size, dtype=np.int64)   # cristais por agente
+        self.next_home = np.asarray(home.next_index, dtype=np.int64)
+        self.dx = np.asarray(_DX, dtype=np.int64)
+        self.dy = np.asarray(_DY, dtype=np.int64)
+        self.reseed(seed)
+        self._in_storm = False
+        self.process = env.process(self.run())
+
+    def reseed(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)  # reprodutível sob random.seed
+        self.key = seed & _MASK         # chave do gerador `directions`
+
+    @property
+    def in_storm(self):
+        return self._in_storm
+
+    @in_storm.setter
+    def in_storm(self, value):
+        # Como em ReactiveAgent: o início da tempestade manda todos para a
+        # base; o fim não interrompe quem já está voltando.
+        self._in_storm = value
+        if value:
+            self.returning[:] = True
+
+    @property
+    def resources_collected(self):
+        return int(self.collected.sum()) * constantes.RESOURCE_VALUES['cristal']
+
+    def step(self):
+        """Avança todos os agentes um passo de simulação."""
+        world = self.world
+        d = directions(self.key, self.env.now, np.arange(self.size))
+        walking = move_agents(self.xs, self.ys, self.returning, d, world.obstacles, self.next_home,
+                              self.base_x, self.base_y, self.dx, self.dy)
+        winners = collect_crystals(self.xs, self.ys, np.nonzero(walking)[0], world.types, world.collected)
+        if winners.size:
+            self.collected[winners] += 1
+            self._register(self.xs[winners], self.ys[winners])
+
+    def _register(self, xs, ys):
+        # No trace, o enxame registra coletas e entregas como um agente só;
+        # os passos individuais ficariam maiores que o resto do episódio.
+        metrics = metrics_for(self.env)
+        trace = get_trace(self.env)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            if self.index is not None:
+                res = self.index.at((x, y))
+                if res is not None:
+                    self.index.collect(res)
+                    if trace is not None:
+                        trace.collect(self.id, res)
+            metrics.record_delivery(self.name, 'cristal')
+            if trace is not None:
+                trace.deliver(self.id, x, y, 'cristal')
+
+    def run(self):
+        while True:
+            self.step()
+            yield self.env.timeout(1)
+
+    def draw(self, screen):
+        """Desenha cada agente do enxame como um quadrado (como ReactiveAgent)."""
+        import pygame
+        size = constantes.cell_size
+        for x, y in zip(self.xs.tolist(), self.ys.tolist()):
+            pygame.draw.rect(screen, self.color, (x * size + 2, y * size + 2, size - 4, size - 4))
@@ -0,0 +1,121 @@
+# batch.py
+#
+# Roda muitos episódios headless em paralelo (um processo por núcleo),
+# variando sementes e densidades de recursos. Cada episódio concluído é
+# emitido imediatamente como uma linha JSON.
+#
+#   python batch.py --seeds 200 --densities 25:25:15,100:100:60 --ticks 5000
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulation import Simulation, AGENT_TYPES
+
+
+def _silence_worker():
+    # Os agentes imprimem em caminhos quentes; nos workers isso só custa I/O
+    sys.stdout = open(os.devnull, 'w')
+
+
+def parse_density(text):
+    """'cristais:metais:estruturas' -> dict de config."""
+    crystals, metal, structures = (int(v) for v in text.split(':'))
+    return {'num_crystals': crystals, 'num_metal': metal, 'num_structures': structures}
+
+
+def parse_agents(text):
+    return [AGENT_TYPES[name.strip()] for name in text.split(',')]
+
+
+def run_episode(task):
+    """Roda um episódio a partir de `task` e devolve o resultado como dict."""
+    config = dict(task['config'], seed=task['seed'])
+    inicio = time.perf_counter()
+    if task.get('trace_dir'):
+        name = f"{task['density'].replace(':', '-')}_seed{task['seed']}.trace"
+        config['trace'] = os.path.join(task['trace_dir'], name)
+    sim = Simulation(config)
+    metrics = sim.run(task['ticks'])
+    sim.close()
+    return {
+        'seed': task['seed'],
+        'density': task['density'],
+        'ticks': task['ticks'],
+        'wall_time': time.perf_counter() - inicio,
+        'agents': metrics,
+    }
+
+
+def build_tasks(seeds, seed_start, densities, ticks, agent_classes=None, trace_dir=None):
+    tasks = []
+    for density in densities:
+        config = parse_density(density)
+        if agent_classes:
+            config['agent_classes'] = agent_classes
+        for seed in range(seed_start, seed_start + seeds):
+            tasks.append({'seed': seed, 'density': density, 'ticks': ticks, 'config': config,
+                          'trace_dir': trace_dir})
+    return tasks
+
+
+def run_batch(tasks, workers=None):
+    """Gera os resultados à medida que os episódios terminam."""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+        futures = [pool.submit(run_episode, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results):
+    """Média de pontos por densidade e agente."""
+    totals = {}
+    for result in results:
+        for name, data in result['agents'].items():
+            key = (result['density'], name)
+            acc = totals.setdefault(key, [0, 0])
+            acc[0] += data['val']
+            acc[1] += 1
+    return {key: val / n for key, (val, n) in totals.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Experimentos em lote (headless, multiprocesso)")
+    parser.add_argument("--seeds", type=int, default=100, help="episódios por densidade")
+    parser.add_argument("--seed-start", type=int, default=0, help="primeira semente")
+    parser.add_argument("--densities", default="25:25:15",
+                        help="lista cristais:metais:estruturas separada por vírgula")
+    parser.add_argument("--agents", default=None,
+                        help=f"elenco de agentes, ex.: reactive,state,bdi ({', '.join(AGENT_TYPES)})")
+    parser.add_argument("--ticks", type=int, default=5000, help="passos por episódio")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos (padrão: núcleos)")
+    parser.add_argument("--output", default=None, help="arquivo JSONL para os resultados")
+    parser.add_argument("--trace-dir", default=None,
+                        help="grava o trace binário de cada episódio neste diretório")
+    args = parser.parse_args()
+
+    agent_classes = parse_agents(args.agents) if args.agents else None
+    if args.trace_dir:
+        os.makedirs(args.trace_dir, exist_ok=True)
+    tasks = build_tasks(args.seeds, args.seed_start, args.densities.split(','), args.ticks,
+                        agent_classes, args.trace_dir)
+
+    out = open(args.output, 'w') if args.output else None
+    results = []
+    inicio = time.perf_counter()
+    for result in run_batch(tasks, args.workers):
+        results.append(result)
+        line = json.dumps(result, ensure_ascii=False)
+        print(line, flush=True)
+        if out:
+            out.write(line + "\n")
+    if out:
+        out.close()
+
+    elapsed = time.perf_counter() - inicio
+    print(f"\n=== {len(results)} episódios em {elapsed:.1f}s com {args.workers} processos ===", file=sys.stderr)
+    for (density, name), mean in sorted(summarize(results).items()):
+        print(f"  {density:>12}  {name:<22} {mean:8.1f} pontos", file=sys.stderr)
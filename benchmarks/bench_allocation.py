@@ -0,0 +1,73 @@
+# benchmarks/bench_allocation.py
+#
+# Alocação de estruturas (utils.allocation) com cada vez mais equipes:
+# N cooperativos (líderes) e N baseados em objetivo (parceiros), com
+# reativos explorando e o BDI publicando o que eles veem. Mede estruturas
+# coletadas, pontos das estruturas por passo e o tempo gasto pelo alocador
+# (total e por rodada), na média das sementes.
+#
+#   python benchmarks/bench_allocation.py [--teams 1 2 4 8 16 32 64] [--structures 150]
+
+import os
+import sys
+import time
+import argparse
+import contextlib
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import constantes
+from simulation import Simulation
+from agents.reactive import ReactiveAgent
+from agents.goalBased import GoalBasedAgent
+from agents.cooperative import CooperativeAgent
+from agents.bdi import BDIAgent
+
+
+def episode(teams, ticks, seed, structures, scouts, sensor_range):
+    config = {
+        'seed': seed,
+        'num_structures': structures,
+        'agent_classes': ([ReactiveAgent] * scouts + [CooperativeAgent] * teams
+                          + [GoalBasedAgent] * teams + [BDIAgent]),
+        'sensor_range': sensor_range,
+    }
+    # As entregas imprimem uma linha cada; aqui só interessa o resumo
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        sim = Simulation(config)
+        inicio = time.perf_counter()
+        sim.run(ticks)
+        elapsed = time.perf_counter() - inicio
+    collected = sum(1 for res in sim.resources if res.type == 'estrutura' and res.collected)
+    return collected, sim.env.allocator.stats(), elapsed
+
+
+def scale(team_counts, ticks, seeds, structures, scouts, sensor_range):
+    value = constantes.RESOURCE_VALUES['estrutura']
+    print(f"--- {structures} estruturas, {scouts} batedores, {seeds} sementes de {ticks} passos ---")
+    print(f"{'equipes':>7} {'estruturas':>10} {'pontos/passo':>12} {'rodadas':>8} "
+          f"{'alocação ms':>11} {'µs/rodada':>10} {'replanej.':>9} {'passos/s':>9}")
+    for teams in team_counts:
+        results = [episode(teams, ticks, seed, structures, scouts, sensor_range) for seed in range(seeds)]
+        collected = statistics.mean(c for c, _, _ in results)
+        rounds = statistics.mean(s['rodadas'] for _, s, _ in results)
+        alloc_ms = statistics.mean(s['tempo_ms'] for _, s, _ in results)
+        replanned = statistics.mean(s['replanejadas'] for _, s, _ in results)
+        elapsed = sum(t for _, _, t in results)
+        per_round = alloc_ms * 1000 / rounds if rounds else 0.0
+        print(f"{teams:>7} {collected:>10.1f} {collected * value / ticks:>12.3f} {rounds:>8.0f} "
+              f"{alloc_ms:>11.2f} {per_round:>10.1f} {replanned:>9.1f} {ticks * seeds / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alocação de tarefas cooperativas x número de equipes")
+    parser.add_argument("--teams", type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--structures", type=int, default=150)
+    parser.add_argument("--scouts", type=int, default=8, help="agentes reativos explorando")
+    parser.add_argument("--sensor-range", type=int, default=3)
+    args = parser.parse_args()
+
+    scale(args.teams, args.ticks, args.seeds, args.structures, args.scouts, args.sensor_range)
@@ -0,0 +1,76 @@
+# benchmarks/bench_coverage.py
+#
+# Cobertura da exploração do StateBasedAgent: passos até os exploradores
+# pisarem em 90% das células livres, com a fronteira compartilhada
+# (utils.frontier) e com a exploração antiga (vizinho não visitado, senão
+# passo aleatório). Média e desvio entre sementes; episódios que não
+# chegam lá contam como o limite de passos.
+#
+#   python benchmarks/bench_coverage.py [--explorers 1 2 4 8] [--seeds 10] [--terrain 0.15:2]
+
+import os
+import sys
+import argparse
+import contextlib
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import Simulation
+from agents.stateBased import StateBasedAgent
+
+
+def coverage_monitor(env, agents, goal, result):
+    """Marca, a cada passo, as células em que os agentes estão; para ao atingir `goal` células."""
+    seen = set()
+    while len(seen) < goal:
+        for ag in agents:
+            seen.add((ag.x, ag.y))
+        yield env.timeout(1)
+    result.append(env.now)
+
+
+def ticks_to_coverage(explorers, frontier, seed, limit, fraction, terrain):
+    config = {'seed': seed, 'agent_classes': [StateBasedAgent] * explorers, 'terrain': terrain}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        sim = Simulation(config)
+        for ag in sim.agents:
+            ag.use_frontier = frontier
+        grid = sim.env.obstacle_map
+        free = grid.width * grid.height - len(grid)
+        result = []
+        sim.env.process(coverage_monitor(sim.env, sim.agents, fraction * free, result))
+        sim.run(limit)
+    return result[0] if result else limit
+
+
+def compare(explorer_counts, seeds, limit, fraction, terrain):
+    print(f"--- passos até {fraction:.0%} de cobertura ({seeds} sementes, limite {limit}) ---")
+    print(f"{'exploradores':>12} {'vizinhos':>18} {'fronteira':>18}")
+    for explorers in explorer_counts:
+        cells = []
+        for frontier in (False, True):
+            ticks = [ticks_to_coverage(explorers, frontier, seed, limit, fraction, terrain)
+                     for seed in range(seeds)]
+            spread = statistics.stdev(ticks) if len(ticks) > 1 else 0.0
+            missed = sum(1 for t in ticks if t >= limit)
+            cells.append(f"{statistics.mean(ticks):8.0f} ± {spread:6.0f}" + ("*" if missed else " "))
+        print(f"{explorers:>12} {cells[0]:>18} {cells[1]:>18}")
+    print("(* algum episódio não atingiu a cobertura dentro do limite)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cobertura: fronteira x vizinhos")
+    parser.add_argument("--explorers", type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20000)
+    parser.add_argument("--fraction", type=float, default=0.9)
+    parser.add_argument("--terrain", metavar="MONTANHAS:RIOS", default=None,
+                        help="terreno procedural (ex.: 0.15:2)")
+    args = parser.parse_args()
+
+    terrain = None
+    if args.terrain:
+        mountains, rivers = args.terrain.split(':')
+        terrain = {'mountains': float(mountains), 'rivers': int(rivers)}
+    compare(args.explorers, args.seeds, args.limit, args.fraction, terrain)
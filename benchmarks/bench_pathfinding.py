@@ -0,0 +1,124 @@
+# benchmarks/bench_pathfinding.py
+#
+# Compara a BFS original dos agentes (que reconstrói a lista de obstáculos a
+# cada vizinho expandido) com o A* e o A* + pontos de salto de
+# utils/pathfinding, em grades de 40x30 até 1000x1000. As tabelas de salto
+# do JPS são montadas uma vez por bitmap, antes das buscas; o tempo de
+# montagem aparece à parte.
+#
+#   python benchmarks/bench_pathfinding.py [--density 0.2] [--queries 5]
+
+import os
+import sys
+import time
+import random
+import argparse
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recursos import Obstacle
+from utils.pathfinding import ObstacleMap, SearchStats, find_path, jump_tables
+
+SIZES = [(40, 30), (100, 100), (250, 250), (500, 500), (1000, 1000)]
+# A BFS original é O(células x obstáculos); acima disso ela é só estimada
+LEGACY_BUDGET = 5e7
+
+
+def legacy_find_path(start, goal, obstacles, width, height, stats):
+    """Cópia da BFS que existia em goalBased/stateBased/cooperative."""
+    queue = deque([start])
+    visited = {start: None}
+    dirs = [(1,0),(-1,0),(0,1),(0,-1)]
+    while queue:
+        cx, cy = queue.popleft()
+        stats.expansions += 1
+        if (cx, cy) == goal:
+            break
+        for dx, dy in dirs:
+            nx, ny = cx + dx, cy + dy
+            if (0 <= nx < width and
+                0 <= ny < height and
+                (nx, ny) not in visited and
+                (nx, ny) not in [(o.x, o.y) for o in obstacles]):
+                visited[(nx, ny)] = (cx, cy)
+                queue.append((nx, ny))
+    path, node = [], goal
+    while node and node != start:
+        path.append(node)
+        node = visited[node]
+    path.reverse()
+    return path
+
+
+def make_grid(width, height, density, rng):
+    blocked = bytearray(1 if rng.random() < density else 0 for _ in range(width * height))
+    return ObstacleMap(width, height, blocked)
+
+
+def pick_queries(grid, count, rng):
+    """Pares (origem, destino) livres e conectados, em cantos opostos."""
+    queries = []
+    while len(queries) < count:
+        start = (rng.randrange(grid.width // 4), rng.randrange(grid.height // 4))
+        goal = (grid.width - 1 - rng.randrange(grid.width // 4),
+                grid.height - 1 - rng.randrange(grid.height // 4))
+        if not grid.passable(*start) or not grid.passable(*goal):
+            continue
+        if find_path(start, goal, grid):
+            queries.append((start, goal))
+    return queries
+
+
+def bench(label, fn, queries):
+    stats = SearchStats()
+    inicio = time.perf_counter()
+    lengths = [len(fn(start, goal, stats)) for start, goal in queries]
+    elapsed = time.perf_counter() - inicio
+    return {
+        'method': label,
+        'expansions': stats.expansions / len(queries),
+        'ms': elapsed * 1000 / len(queries),
+        'length': sum(lengths) / len(lengths),
+    }
+
+
+def run(density, queries_per_size, seed):
+    rng = random.Random(seed)
+    rows = []
+    for width, height in SIZES:
+        grid = make_grid(width, height, density, rng)
+        queries = pick_queries(grid, queries_per_size, rng)
+        obstacles = [Obstacle(i, i % width, i // width) for i, b in enumerate(grid.blocked) if b]
+
+        legacy_cost = width * height * len(obstacles)
+        methods = [
+            ('A*', lambda s, g, st: find_path(s, g, grid, stats=st)),
+            ('A* + JPS', lambda s, g, st: find_path(s, g, grid, jps=True, stats=st)),
+        ]
+        if legacy_cost <= LEGACY_BUDGET:
+            methods.insert(0, ('BFS original', lambda s, g, st: legacy_find_path(
+                s, g, obstacles, width, height, st)))
+        else:
+            print(f"{width}x{height}".rjust(10) + "  BFS original  omitida "
+                  f"(~{legacy_cost:.1e} comparações por busca)")
+        inicio = time.perf_counter()
+        jump_tables(grid)
+        print(f"{width}x{height}".rjust(10) + f"  tabelas JPS  {(time.perf_counter() - inicio) * 1000:.1f} ms "
+              "(uma vez por bitmap)")
+        for label, fn in methods:
+            row = bench(label, fn, queries)
+            row['grid'] = f"{width}x{height}"
+            rows.append(row)
+            print(f"{row['grid']:>10}  {label:<13} {row['expansions']:>11.0f} expansões "
+                  f"{row['ms']:>11.2f} ms  (caminho {row['length']:.0f})", flush=True)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de busca de caminhos")
+    parser.add_argument("--density", type=float, default=0.2, help="fração de células bloqueadas")
+    parser.add_argument("--queries", type=int, default=5, help="buscas por tamanho de grade")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.density, args.queries, args.seed)
@@ -0,0 +1,129 @@
+# benchmarks/bench_swarm.py
+#
+# Compara ReactiveSwarm (vetorizado) com ReactiveAgent (um processo por
+# agente): cristais coletados em N passos (média e desvio entre sementes)
+# e vazão em agentes-passo por segundo. Com --shards, roda em vez disso o enxame
+# repartido (agents.sharded) num mundo grande, confere que o episódio é
+# idêntico ao de um processo e mede a vazão por número de processos.
+#
+# A vazão medida só mostra o ganho com pelo menos shards + 1 núcleos
+# livres. Por isso cada execução repartida também mede o tempo de CPU do
+# coordenador e, a cada passo, o da faixa mais lenta; a soma dos dois é o
+# tempo do episódio com um núcleo por processo, sem contar a latência das
+# barreiras. Num processo só, o tempo de CPU é o próprio tempo do episódio.
+#
+#   python benchmarks/bench_swarm.py [--agents 20] [--episodes 30] [--ticks 500]
+#   python benchmarks/bench_swarm.py --shards 2 4 [--world 1000] [--swarm-size 100000]
+
+import os
+import sys
+import time
+import argparse
+import contextlib
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import constantes
+from simulation import Simulation
+from agents.reactive import ReactiveAgent
+
+
+def crystals_collected(sim):
+    return sum(1 for res in sim.resources if res.type == 'cristal' and res.collected)
+
+
+def episode(agents, ticks, seed, swarm):
+    if swarm:
+        config = {'seed': seed, 'agent_classes': [], 'swarm_size': agents}
+    else:
+        config = {'seed': seed, 'agent_classes': [ReactiveAgent] * agents}
+    # As entregas imprimem uma linha cada; aqui só interessa o resumo
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        sim = Simulation(config)
+        inicio = time.perf_counter()
+        sim.run(ticks)
+    return crystals_collected(sim), time.perf_counter() - inicio
+
+
+def compare(agents, episodes, ticks):
+    print(f"--- {agents} agentes, {episodes} episódios de {ticks} passos ---")
+    for label, swarm in (("ReactiveAgent", False), ("ReactiveSwarm", True)):
+        results = [episode(agents, ticks, seed, swarm) for seed in range(episodes)]
+        counts = [c for c, _ in results]
+        elapsed = sum(t for _, t in results)
+        print(f"{label:<14} cristais {statistics.mean(counts):6.2f} ± {statistics.stdev(counts):5.2f}"
+              f"   {agents * ticks * episodes / elapsed:12.0f} agentes-passo/s")
+
+
+def throughput(agents, ticks):
+    _, elapsed = episode(agents, ticks, 0, swarm=True)
+    print(f"ReactiveSwarm com {agents} agentes: {agents * ticks / elapsed:,.0f} agentes-passo/s")
+
+
+def big_world(side):
+    """Grade side x side com a base no centro (os módulos leem `constantes` a cada episódio)."""
+    constantes.GRID_WIDTH = constantes.GRID_HEIGHT = side
+    constantes.BASE_POS = (side // 2, side // 2)
+
+
+def sharded_episode(agents, crystals, ticks, shards, seed=0):
+    """
+    Um episódio do enxame; devolve (estado final, segundos, segundos
+    projetados com um núcleo por processo).
+    """
+    config = {'seed': seed, 'agent_classes': [], 'swarm_size': agents, 'swarm_shards': shards,
+              'num_crystals': crystals, 'num_metal': 0, 'num_structures': 0}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        sim = Simulation(config)
+        inicio = time.perf_counter()
+        cpu = time.process_time()
+        sim.run(ticks)
+        elapsed = time.perf_counter() - inicio
+        cpu = time.process_time() - cpu     # só o coordenador: as faixas são outros processos
+        swarm = sim.swarm
+        pool = getattr(swarm, 'pool', None)
+        projected = elapsed if pool is None else cpu + pool.critical
+        sim.close()
+        state = (swarm.xs.tobytes(), swarm.ys.tobytes(), swarm.collected.tobytes(),
+                 sim.world.collected.tobytes())
+    return state, elapsed, projected
+
+
+def sharded(agents, side, crystals, ticks, shard_counts):
+    big_world(side)
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    print(f"--- enxame de {agents} em {side}x{side} com {crystals} cristais, {ticks} passos,"
+          f" {cores} núcleo(s) ---")
+    print(f"{'':<12} {'medido':>14} {'1 núcleo/processo':>20} {'ganho':>7}   (agentes-passo/s)")
+    reference = base = None
+    for shards in [1] + shard_counts:
+        state, elapsed, projected = sharded_episode(agents, crystals, ticks, shards)
+        if reference is None:
+            reference, base = state, elapsed
+        label = "1 processo" if shards == 1 else f"{shards} faixas"
+        print(f"{label:<12} {agents * ticks / elapsed:14,.0f} {agents * ticks / projected:20,.0f}"
+              f" {base / projected:6.2f}x   {'idêntico' if state == reference else 'DIFERENTE'}")
+    if cores < max(shard_counts) + 1:
+        print(f"aviso: menos de {max(shard_counts) + 1} núcleos; a vazão medida inclui a disputa"
+              " pela CPU e só a projeção indica o ganho")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ReactiveSwarm x ReactiveAgent")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--episodes", type=int, default=30)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--swarm-size", type=int, default=10000,
+                        help="tamanho do enxame no teste de vazão")
+    parser.add_argument("--shards", type=int, nargs='*', default=None,
+                        help="processos do enxame repartido (ex.: 2 4); sem a opção, não roda")
+    parser.add_argument("--world", type=int, default=1000, help="lado da grade do enxame repartido")
+    parser.add_argument("--crystals", type=int, default=200000, help="cristais no mundo grande")
+    args = parser.parse_args()
+
+    if args.shards:
+        sharded(args.swarm_size, args.world, args.crystals, args.ticks, args.shards)
+    else:
+        compare(args.agents, args.episodes, args.ticks)
+        throughput(args.swarm_size, args.ticks)
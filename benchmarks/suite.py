@@ -0,0 +1,344 @@
+# benchmarks/suite.py
+#
+# Suíte de benchmarks dos caminhos quentes e de episódios completos:
+#   - find_path em vários tamanhos de grade e densidades de obstáculos
+#   - collect_here / is_resource_available com cada vez mais recursos
+#   - uma iteração do BDIAgent.run com muitas crenças
+#   - create_resources em densidade alta
+#   - geração de cenários grandes (utils.scenario)
+#   - consultas de percepção (raio, k mais próximos, melhor alvo)
+#   - rodadas do alocador de estruturas com cada vez mais equipes
+#   - passos até 90% de cobertura na exploração (fronteira x vizinhos)
+#   - passos/s de um episódio headless
+#   - vazão do enxame num mundo grande, em 1, 2 e 4 processos (agents.sharded)
+# Os resultados vão para um JSON; --compare mostra a variação contra uma
+# execução anterior e sai com código 1 se algo piorou além da tolerância.
+#
+#   python benchmarks/suite.py [--quick] [--only find_path] [--output atual.json]
+#   python benchmarks/suite.py --compare base.json [--tolerance 0.1]
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simpy
+
+import constantes
+import recursos
+from simulation import Simulation
+from agents.bdi import BDIAgent
+from agents.goalBased import GoalBasedAgent
+from utils.metrics import MetricsRecorder
+from utils.pathfinding import find_path
+from utils.scenario import generate
+from utils.perception import PerceptionGrid
+from bench_pathfinding import make_grid, pick_queries
+import bench_allocation
+import bench_coverage
+import bench_swarm
+
+
+def timed(fn, repeat=5, setup=None, number=1):
+    """
+    Melhor tempo (s) por chamada de `fn(estado)` em `repeat` rodadas de
+    `number` chamadas; `setup()` prepara cada rodada.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup() if setup else None
+        inicio = time.perf_counter()
+        for _ in range(number):
+            fn(state)
+        best = min(best, (time.perf_counter() - inicio) / number)
+    return best
+
+
+def result(value, unit, better='lower', **extra):
+    return dict(value=value, unit=unit, better=better, **extra)
+
+
+# --------- Benchmarks ---------
+def bench_find_path(quick):
+    sizes = [(40, 30), (100, 100)] if quick else [(40, 30), (100, 100), (250, 250)]
+    rng = random.Random(0)
+    results = {}
+    for width, height in sizes:
+        for density in (0.0, 0.1, 0.3):
+            grid = make_grid(width, height, density, rng)
+            queries = pick_queries(grid, 5, rng)
+            for label, jps in (('astar', False), ('jps', True)):
+                elapsed = timed(lambda _: [find_path(s, g, grid, jps=jps) for s, g in queries], 3)
+                results[f"find_path/{label}/{width}x{height}/d{density}"] = result(
+                    elapsed / len(queries) * 1000, 'ms/busca')
+    return results
+
+
+def make_index(count, rng):
+    """ResourceIndex com `count` recursos espalhados numa grade grande o bastante."""
+    side = max(40, int((count * 4) ** 0.5))
+    cells = rng.sample(range(side * side), count)
+    kinds = list(constantes.RESOURCE_VALUES)
+    resources = [recursos.Resource(i + 1, kinds[i % len(kinds)], c % side, c // side)
+                 for i, c in enumerate(cells)]
+    return recursos.ResourceIndex(resources), side
+
+
+def make_goal_agent(index):
+    env = simpy.Environment()
+    env.metrics = MetricsRecorder()  # sem log de entregas
+    bx, by = constantes.BASE_POS
+    return GoalBasedAgent(env, bx, by, index, bx, by, [])
+
+
+def bench_resources(quick):
+    counts = [100, 1000, 10000] if quick else [100, 1000, 10000, 100000]
+    rng = random.Random(1)
+    results = {}
+    for count in counts:
+        index, side = make_index(count, rng)
+        agent = make_goal_agent(index)
+        probes = [(rng.randrange(side), rng.randrange(side)) for _ in range(10000)]
+        elapsed = timed(lambda _: [agent.is_resource_available(p) for p in probes])
+        results[f"is_resource_available/{count}"] = result(elapsed / len(probes) * 1e6, 'µs/chamada')
+
+        targets = [(res.x, res.y) for res in index.resources if res.type != 'estrutura'][:2000]
+
+        def setup():
+            for res in index.resources:
+                res.collected = False
+            index.rebuild()
+            return targets
+
+        def collect_all(cells):
+            for x, y in cells:
+                agent.x, agent.y = x, y
+                agent.carrying = None
+                agent.collect_here()
+
+        elapsed = timed(collect_all, 3, setup)
+        results[f"collect_here/{count}"] = result(elapsed / len(targets) * 1e6, 'µs/chamada')
+    return results
+
+
+def bench_bdi(quick):
+    counts = [1000, 10000] if quick else [1000, 10000, 50000]
+    rng = random.Random(2)
+    results = {}
+    for count in counts:
+        index, side = make_index(count, rng)
+        sim = Simulation({'seed': 0, 'agent_classes': [GoalBasedAgent] * 4 + [BDIAgent]})
+        bdi = sim.agents[-1]
+        bdi.grid = index
+        # Metade dos recursos já é crença; a outra metade chega pelos painéis
+        known, pending = index.resources[:count // 2], index.resources[count // 2:]
+        bdi.beliefs = {(res.x, res.y): res.type for res in known}
+        scouts = sim.agents[:-1]
+
+        # Iteração sem novidades nos painéis (o caso comum)
+        elapsed = timed(lambda _: bdi.update_beliefs_from_agents(), 5, number=1000)
+        results[f"bdi_iteration/idle/{count}"] = result(elapsed * 1e6, 'µs/iteração')
+
+        # Iteração com 10 anotações novas por agente na base
+        def setup():
+            for ag in scouts:
+                for _ in range(10):
+                    res = pending.pop()
+                    ag.shared_info[(res.x, res.y)] = res.type
+        elapsed = timed(lambda _: bdi.update_beliefs_from_agents(), 5, setup)
+        results[f"bdi_iteration/delta/{count}"] = result(elapsed * 1e6, 'µs/iteração')
+
+        # Varredura completa (validate_beliefs), para comparação
+        elapsed = timed(lambda _: bdi.validate_beliefs(), 3)
+        results[f"bdi_validate_beliefs/{count}"] = result(elapsed * 1000, 'ms/chamada')
+    return results
+
+
+def bench_create_resources(quick):
+    cells = constantes.GRID_WIDTH * constantes.GRID_HEIGHT - 1
+    results = {}
+    for fraction in (0.5, 0.9, 0.99):
+        total = int(cells * fraction)
+        split = (total // 3, total // 3, total - 2 * (total // 3))
+
+        def setup():
+            random.seed(3)
+        elapsed = timed(lambda _: recursos.create_resources(*split), 3 if quick else 5, setup)
+        results[f"create_resources/{int(fraction * 100)}pct"] = result(
+            elapsed * 1000, 'ms/chamada', total=total)
+    return results
+
+
+def bench_scenario(quick):
+    side, count = (500, 25000) if quick else (1000, 100000)
+    split = (count * 2 // 5, count * 2 // 5, count - 4 * (count // 5))
+    results = {}
+    for label, terrain in (('plano', None), ('terreno', {'mountains': 0.2, 'rivers': 3})):
+        def setup():
+            random.seed(5)
+        elapsed = timed(lambda _: generate(side, side, *split, terrain=terrain), 3, setup)
+        results[f"scenario/{label}/{side}x{side}/{count}"] = result(elapsed * 1000, 'ms/cenário')
+    return results
+
+
+def bench_perception(quick):
+    counts = [10000] if quick else [10000, 100000]
+    side = 1000
+    results = {}
+    for count in counts:
+        random.seed(6)
+        resources, _ = generate(side, side, count // 2, count // 3, count - count // 2 - count // 3)
+        grid = PerceptionGrid(recursos.ResourceIndex(resources), side, side)
+        rng = random.Random(6)
+        probes = [(rng.randrange(side), rng.randrange(side)) for _ in range(500)]
+        for label, query in (
+                ('within_radius', lambda x, y: grid.within_radius(x, y, 10, 'cristal')),
+                ('k_nearest', lambda x, y: grid.k_nearest(x, y, 5)),
+                ('best_target', lambda x, y: grid.best_target(x, y))):
+            elapsed = timed(lambda _: [query(x, y) for x, y in probes], 3)
+            results[f"perception/{label}/{count}"] = result(elapsed / len(probes) * 1e6, 'µs/consulta')
+    return results
+
+
+def bench_allocation_scale(quick):
+    teams = [4, 16] if quick else [4, 16, 64]
+    results = {}
+    for count in teams:
+        collected, stats, _ = bench_allocation.episode(count, 1000, 0, 150, 8, 3)
+        results[f"allocation/{count}/rodada"] = result(
+            stats['tempo_ms'] * 1000 / max(1, stats['rodadas']), 'µs/rodada')
+        results[f"allocation/{count}/estruturas"] = result(collected, 'estruturas', better='higher')
+    return results
+
+
+def bench_coverage_ticks(quick):
+    results = {}
+    for explorers in ([4] if quick else [1, 4]):
+        for label, frontier in (('vizinhos', False), ('fronteira', True)):
+            ticks = [bench_coverage.ticks_to_coverage(explorers, frontier, seed, 20000, 0.9, None)
+                     for seed in range(3)]
+            results[f"coverage/{label}/{explorers}"] = result(sum(ticks) / len(ticks), 'passos')
+    return results
+
+
+def bench_episode(quick):
+    ticks = 2000 if quick else 10000
+    results = {}
+    for label, config in (('default', {}), ('swarm1000', {'swarm_size': 1000})):
+        def setup():
+            return Simulation(dict(config, seed=4))
+        elapsed = timed(lambda sim: sim.run(ticks), 3, setup)
+        results[f"episode/{label}"] = result(ticks / elapsed, 'passos/s', better='higher')
+    return results
+
+
+def bench_sharded(quick):
+    agents, side, ticks = (20000, 300, 100) if quick else (100000, 1000, 200)
+    saved = constantes.GRID_WIDTH, constantes.GRID_HEIGHT, constantes.BASE_POS
+    bench_swarm.big_world(side)
+    results = {}
+    try:
+        for shards in (1, 2, 4):
+            _, elapsed, projected = bench_swarm.sharded_episode(agents, side * side // 5, ticks, shards)
+            results[f"sharded/{shards}/{agents}"] = result(agents * ticks / elapsed, 'agentes-passo/s',
+                                                           better='higher')
+            if shards > 1:
+                # Com um núcleo por processo (ver bench_swarm.sharded)
+                results[f"sharded/{shards}/{agents}/projetado"] = result(
+                    agents * ticks / projected, 'agentes-passo/s', better='higher')
+    finally:
+        constantes.GRID_WIDTH, constantes.GRID_HEIGHT, constantes.BASE_POS = saved
+    return results
+
+
+BENCHMARKS = {
+    'find_path': bench_find_path,
+    'resources': bench_resources,
+    'bdi': bench_bdi,
+    'create_resources': bench_create_resources,
+    'scenario': bench_scenario,
+    'perception': bench_perception,
+    'allocation': bench_allocation_scale,
+    'coverage': bench_coverage_ticks,
+    'episode': bench_episode,
+    'sharded': bench_sharded,
+}
+
+
+# --------- Execução e comparação ---------
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return None
+
+
+def run(names, quick):
+    results = {}
+    for name in names:
+        inicio = time.perf_counter()
+        part = BENCHMARKS[name](quick)
+        for key, row in part.items():
+            print(f"{key:<44} {row['value']:>12.3f} {row['unit']}", flush=True)
+        print(f"  ({name}: {time.perf_counter() - inicio:.1f}s)", file=sys.stderr)
+        results.update(part)
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Imprime a variação de cada medida; devolve as que pioraram além de `tolerance`."""
+    regressions = []
+    print(f"\n{'medida':<44} {'base':>12} {'atual':>12}  variação")
+    for key, row in current['results'].items():
+        old = baseline['results'].get(key)
+        if old is None or not old['value']:
+            continue
+        change = row['value'] / old['value'] - 1
+        worse = change > tolerance if row['better'] == 'lower' else change < -tolerance
+        flag = '  PIOROU' if worse else ''
+        print(f"{key:<44} {old['value']:>12.3f} {row['value']:>12.3f}  {change:+7.1%}{flag}")
+        if worse:
+            regressions.append(key)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks da simulação")
+    parser.add_argument("--only", default=None,
+                        help=f"lista de benchmarks separada por vírgula ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--quick", action="store_true", help="tamanhos menores, para conferência rápida")
+    parser.add_argument("--output", default=None, help="arquivo JSON para os resultados")
+    parser.add_argument("--compare", default=None, metavar="BASE.json",
+                        help="compara com uma execução anterior")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="piora relativa tolerada no --compare (padrão 10%%)")
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    current = run(names, args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} medida(s) pioraram além de {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
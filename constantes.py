@@ -34,6 +34,16 @@ BASE_SIZE = 3
 
 TEMPO_EXPERIMENTO = 60 #Em segundos
 
+# Modo interativo: passos de simulação por segundo na velocidade 1x e
+# multiplicadores disponíveis (None = o mais rápido possível)
+SIM_TICKS_PER_SECOND = 10
+SIM_SPEEDS = [1, 10, 100, None]
+MAX_FRAME_SKIP = 5  # quadros seguidos que podem ser pulados quando atrasado
+
+# Tempestades (em passos de simulação)
+STORM_INTERVAL = 100  # passos até próxima tempestade
+STORM_DURATION = 10  # duração da tempestade em passos
+
 # Valores e agentes necessários por tipo
 RESOURCE_VALUES = {
     'cristal': 10,
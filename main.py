@@ -1,223 +1,221 @@
 import sys
-import random
+import argparse
 import pygame
-import simpy
 import time
 
 import constantes
-import recursos
-from utils.resource_manager import register_delivery
-from agents.reactive import ReactiveAgent
-from agents.stateBased import StateBasedAgent
-from agents.goalBased import GoalBasedAgent
-from agents.cooperative import CooperativeAgent
-from agents.bdi import BDIAgent
+from render import Renderer
+from simulation import Simulation
+from utils.metrics import LOG_INFO
+from utils.snapshot import Snapshot
+from utils.stream import StreamServer
 
 # --------- Configurações iniciais ---------
 FPS = 60
-STORM_INTERVAL = 100  # passos até próxima tempestade
-STORM_DURATION = 10  # duração da tempestade em passos
-env = simpy.Environment()
-env.is_storm = False  # Estado inicial sem tempestade
-
-# --------- Função para controlar tempestades ---------
-def storm_controller(env, agents):
-    while True:
-        yield env.timeout(STORM_INTERVAL)
-        print("[STORM] Tempestade iniciada! Agentes voltam à base.")
-        # Ativa tempestade para todos os agentes E no ambiente
-        for ag in agents:
-            ag.in_storm = True
-        env.is_storm = True  # Novo atributo para controlar o estado global
-        
-        yield env.timeout(STORM_DURATION)
-        print("[STORM] Tempestade encerrada. Agentes retornam à coleta.")
-        # Desativa tempestade
-        for ag in agents:
-            ag.in_storm = False
-        env.is_storm = False
-
-def draw_lightning(screen):
-    if random.random() < 0.1:  # 10% de chance de desenhar um raio por frame
-        start_x = random.randint(0, constantes.GRID_WIDTH * constantes.CELL_SIZE)
-        points = []
-        y = 0
-        while y < constantes.GRID_HEIGHT * constantes.CELL_SIZE:
-            points.append((start_x, y))
-            start_x += random.randint(-20, 20)
-            y += random.randint(10, 30)
-        pygame.draw.lines(screen, (255, 255, 200), False, points, 2)
-
-# --------- Inicialização do ambiente SimPy ---------
-env = simpy.Environment()
-
-# --------- Criar recursos e obstáculos ---------
-all_resources = recursos.create_resources()
-obstacles = recursos.create_obstacles()
-
-# Mostrar recursos no terminal
-print("Recursos disponíveis:")
-for res in all_resources:
-    print(f"  ID={res.id}, tipo={res.type}, posição=({res.x},{res.y}), requer={res.required_agents}")
-
-# --------- Criar agentes na base ---------
-base_x, base_y = constantes.BASE_POS
-agents = []
-
-agent_classes = [ReactiveAgent, StateBasedAgent, GoalBasedAgent, CooperativeAgent, BDIAgent]
-for idx, cls in enumerate(agent_classes, start=1):
-    if cls == BDIAgent:
-        ag = cls(env, base_x, base_y, base_x, base_y, all_resources)  # Parâmetros específicos para BDI
+
+
+def print_metrics(metrics):
+    print("\n=== Métricas de Coleta ===")
+    for name, data in metrics.items():
+        print(f"Agente {name}: Conseguiu {data['val']} Pontos. Coletou {data['resources'] or '()'}")
+
+
+def export_metrics(sim, prefix):
+    """Grava <prefix>_entregas.csv e, se houver séries, <prefix>_series.csv."""
+    series_path = f"{prefix}_series.csv" if sim.config['series'] else None
+    sim.recorder.export_csv(f"{prefix}_entregas.csv", series_path)
+
+
+def make_simulation(config=None, restore=None):
+    """Episódio novo, ou retomado do ponto de salvamento `restore`."""
+    if restore:
+        return Snapshot.load(restore).restore(**(config or {}))
+    return Simulation(config)
+
+
+def report_profile(sim, path=None):
+    """Imprime a tabela do perfil e, com `path`, grava as pilhas para flamegraph."""
+    if sim.profiler is None:
+        return
+    print("\n=== Perfil ===")
+    print(sim.profiler.summary())
+    if path:
+        sim.profiler.export_collapsed(path)
+        print(f"Pilhas (formato collapsed) gravadas em {path}")
+
+
+def run_headless(ticks, config=None, csv_prefix=None, restore=None, snapshot=None, profile_path=None,
+                 serve=None):
+    """
+    Roda `ticks` passos de simulação o mais rápido possível, sem pygame
+    nem display, e devolve as métricas de coleta. `snapshot` grava um
+    ponto de salvamento ao final; `serve` transmite o episódio nesse
+    endereço (utils.stream) para visualizadores externos.
+    """
+    sim = make_simulation(config, restore)
+    server = None
+    if serve:
+        server = StreamServer(sim, serve).start()
+        print(f"Transmitindo em {server.address}")
+    metrics = sim.run(ticks)
+    if server is not None:
+        server.stop()
+        stats = server.stats()
+        print(f"Transmissão: {stats['quadros']} quadros, {stats['descartados']} descartados")
+    sim.close()
+    if csv_prefix:
+        export_metrics(sim, csv_prefix)
+    if snapshot:
+        Snapshot.capture(sim).save(snapshot)
+    report_profile(sim, profile_path)
+    return metrics
+
+
+# --------- Modo interativo (pygame) ---------
+def run_interactive(config=None, speed=1, csv_prefix=None, restore=None, profile_path=None):
+    """
+    Janela pygame com passo fixo de simulação: `speed` multiplica
+    SIM_TICKS_PER_SECOND (None = máximo). Teclas: +/- mudam a velocidade,
+    espaço pausa e, com o perfil ligado, P imprime a tabela parcial.
+    """
+    sim = make_simulation(dict({'verbose': True, 'log_level': LOG_INFO}, **(config or {})), restore)
+    env = sim.env
+
+    pygame.init()
+
+    total_width = constantes.GRID_WIDTH * constantes.CELL_SIZE + constantes.LEGEND_WIDTH
+    screen = pygame.display.set_mode((total_width, constantes.GRID_HEIGHT * constantes.CELL_SIZE))
+    renderer = Renderer(screen, sim.resource_index, sim.agents,
+                        getattr(env, 'obstacle_map', None), sim.swarm)
+    if sim.profiler is not None:
+        renderer.draw = sim.profiler.wrap(renderer.draw, 'render')
+
+    clock = pygame.time.Clock()
+    frame_budget = 1.0 / FPS
+    speed_idx = constantes.SIM_SPEEDS.index(speed)
+
+    # --------- Loop principal ---------
+    # O tempo de simulação anda em passos inteiros, desacoplado dos quadros:
+    # a cada quadro roda quantos passos a velocidade escolhida pede.
+    running = True
+    paused = False
+    acumulado = 0.0
+    skipped = 0
+    time_inicio = time.perf_counter()
+    anterior = time_inicio
+    janela_inicio, janela_passos, passos_por_s = time_inicio, env.now, 0.0
+    limite = constantes.TEMPO_EXPERIMENTO
+    while running and anterior - time_inicio < limite:
+        agora = time.perf_counter()
+        decorrido, anterior = agora - anterior, agora
+
+        # Eventos Pygame
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    speed_idx = min(speed_idx + 1, len(constantes.SIM_SPEEDS) - 1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    speed_idx = max(speed_idx - 1, 0)
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_p and sim.profiler is not None:
+                    print(sim.profiler.summary(limit=15))
+                acumulado = 0.0
+        speed = constantes.SIM_SPEEDS[speed_idx]
+
+        # Processamento do SimPy
+        if not paused:
+            if speed is None:
+                # "max": usa todo o orçamento do quadro simulando
+                prazo = agora + frame_budget
+                while time.perf_counter() < prazo:
+                    env.run(until=env.now + 1)
+            else:
+                taxa = constantes.SIM_TICKS_PER_SECOND * speed
+                acumulado = min(acumulado + decorrido * taxa, taxa * 0.25)  # no máximo 1/4 s de atraso
+                passos = int(acumulado)
+                if passos:
+                    acumulado -= passos
+                    env.run(until=env.now + passos)
+
+        if agora - janela_inicio >= 0.5:
+            passos_por_s = (env.now - janela_passos) / (agora - janela_inicio)
+            janela_inicio, janela_passos = agora, env.now
+
+        # Atrasado: pula o desenho (até MAX_FRAME_SKIP quadros seguidos)
+        if speed is not None and time.perf_counter() - agora > frame_budget and skipped < constantes.MAX_FRAME_SKIP:
+            skipped += 1
+            continue
+        skipped = 0
+
+        # Desenha só o que mudou desde o quadro anterior
+        status = [
+            f"Velocidade: {'máx' if speed is None else f'{speed}x'}{' (pausa)' if paused else ''}",
+            f"Passo: {int(env.now)}",
+            f"Passos/s: {passos_por_s:.0f}",
+        ]
+        renderer.draw(getattr(env, 'is_storm', False), status)
+        if speed is not None:
+            clock.tick(FPS)
+
+    # Ao fechar, exibir métricas finais
+    print_metrics(sim.metrics())
+    sim.close()
+    if csv_prefix:
+        export_metrics(sim, csv_prefix)
+    report_profile(sim, profile_path)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulação de coleta de recursos")
+    parser.add_argument("--headless", action="store_true",
+                        help="roda sem display, o mais rápido possível")
+    parser.add_argument("--ticks", type=int, default=10000,
+                        help="passos de simulação no modo headless")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="semente do gerador aleatório")
+    parser.add_argument("--speed", default="1", choices=["1", "10", "100", "max"],
+                        help="multiplicador de velocidade no modo interativo")
+    parser.add_argument("--verbose", action="store_true",
+                        help="mostra recursos e agentes criados no modo headless")
+    parser.add_argument("--log-level", type=int, choices=[0, 1, 2], default=None,
+                        help="0 = silencioso, 1 = entregas e tempestades, 2 = depuração "
+                             "(padrão: 0 headless, 1 interativo)")
+    parser.add_argument("--csv", metavar="PREFIXO", default=None,
+                        help="exporta entregas e séries por passo para PREFIXO_*.csv")
+    parser.add_argument("--trace", metavar="ARQUIVO", default=None,
+                        help="grava o trace binário de eventos (utils.trace)")
+    parser.add_argument("--snapshot", metavar="ARQUIVO", default=None,
+                        help="grava um ponto de salvamento ao fim do modo headless")
+    parser.add_argument("--restore", metavar="ARQUIVO", default=None,
+                        help="retoma o episódio de um ponto de salvamento")
+    parser.add_argument("--terrain", metavar="MONTANHAS:RIOS", default=None,
+                        help="obstáculos procedurais: fração de montanhas e número de rios "
+                             "(ex.: 0.15:2)")
+    parser.add_argument("--profile", metavar="ARQUIVO", nargs="?", const="", default=None,
+                        help="mede tempo por agente e por função; com ARQUIVO grava as "
+                             "pilhas para flamegraph (formato collapsed)")
+    parser.add_argument("--serve", metavar="ENDERECO", nargs="?", const="127.0.0.1:8765", default=None,
+                        help="no modo headless, transmite o episódio para visualizadores "
+                             "(host:porta em localhost ou unix:CAMINHO; ver replay.py --connect)")
+    args = parser.parse_args()
+
+    config = {'seed': args.seed, 'series': args.csv is not None, 'trace': args.trace,
+              'profile': args.profile is not None}
+    if args.terrain:
+        mountains, rivers = args.terrain.split(':')
+        config['terrain'] = {'mountains': float(mountains), 'rivers': int(rivers)}
+    if args.log_level is not None:
+        config['log_level'] = args.log_level
+    if args.headless:
+        config['verbose'] = args.verbose
+        print_metrics(run_headless(args.ticks, config, args.csv, args.restore, args.snapshot,
+                                   args.profile, args.serve))
     else:
-        ag = cls(env, base_x, base_y, all_resources, base_x, base_y, obstacles)
-    ag.id = idx
-    agents.append(ag)
-    print(f"Agente {idx}: {cls.__name__} criado na base ({base_x},{base_y})")
-
-# --- Vincular agentes ao ambiente para uso interno (shared_info) ---
-env.agents = agents
-
-# Registrar tempestade
-env.process(storm_controller(env, agents))
-
-# Desenha legenda
-def draw_legend(screen, agents):
-    # Calcula a posição inicial da legenda
-    legend_x = constantes.GRID_WIDTH * constantes.CELL_SIZE
-    legend_width = constantes.LEGEND_WIDTH
-    
-    # Desenha o fundo da legenda
-    pygame.draw.rect(screen, constantes.LEGEND_BG_COLOR, 
-                    (legend_x, 0, legend_width, constantes.GRID_HEIGHT * constantes.CELL_SIZE))
-    
-    # Prepara a fonte
-    font = pygame.font.SysFont('Arial', 16)
-    y_pos = constantes.LEGEND_MARGIN
-    
-    # Título
-    title = font.render("Legenda:", True, constantes.LEGEND_TEXT_COLOR)
-    screen.blit(title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
-    y_pos += constantes.LEGEND_LINE_HEIGHT
-    
-    # Agentes
-    agent_title = font.render("Agentes:", True, constantes.LEGEND_TEXT_COLOR)
-    screen.blit(agent_title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
-    y_pos += constantes.LEGEND_LINE_HEIGHT
-    
-    for agent in agents:
-        # Quadrado de cor
-        pygame.draw.rect(screen, agent.color, 
-                        (legend_x + constantes.LEGEND_MARGIN, y_pos, 20, 20))
-        
-        # Nome do agente
-        agent_name = font.render(agent.name, True, constantes.LEGEND_TEXT_COLOR)
-        screen.blit(agent_name, (legend_x + constantes.LEGEND_MARGIN + 25, y_pos + 2))
-        y_pos += constantes.LEGEND_LINE_HEIGHT
-    
-    # Recursos
-    y_pos += constantes.LEGEND_LINE_HEIGHT  # Espaço extra
-    resources_title = font.render("Recursos:", True, constantes.LEGEND_TEXT_COLOR)
-    screen.blit(resources_title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
-    y_pos += constantes.LEGEND_LINE_HEIGHT
-    
-    # Adicione aqui os tipos de recursos com suas cores
-    resource_types = [
-        ("Cristal Energético", constantes.CRYSTAL_COLOR),
-        ("Bloco de Metal", constantes.METAL_COLOR),
-        ("Estrutura Antiga", constantes.STRUCTURE_COLOR)
-    ]
-    
-    for name, color in resource_types:
-        
-        pygame.draw.rect(screen, color, 
-                        (legend_x + constantes.LEGEND_MARGIN, y_pos, 20, 20))
-        res_name = font.render(name, True, constantes.LEGEND_TEXT_COLOR)
-        screen.blit(res_name, (legend_x + constantes.LEGEND_MARGIN + 25, y_pos + 2))
-        y_pos += constantes.LEGEND_LINE_HEIGHT
-    
-    # # Obstáculos
-    # y_pos += constantes.LEGEND_LINE_HEIGHT  # Espaço extra
-    # obs_title = font.render("Obstáculos:", True, constantes.LEGEND_TEXT_COLOR)
-    # screen.blit(obs_title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
-    # y_pos += constantes.LEGEND_LINE_HEIGHT
-    
-    # pygame.draw.rect(screen, constantes.OBSTACLE_COLOR, 
-    #                 (legend_x + constantes.LEGEND_MARGIN, y_pos, 20, 20))
-    # obs_name = font.render("Montanhas/Rios", True, constantes.LEGEND_TEXT_COLOR)
-    # screen.blit(obs_name, (legend_x + constantes.LEGEND_MARGIN + 25, y_pos + 2))
-
-
-# --------- Iniciar Pygame ---------
-pygame.init()
-
-total_width = constantes.GRID_WIDTH * constantes.CELL_SIZE + constantes.LEGEND_WIDTH
-screen = pygame.display.set_mode((total_width, constantes.GRID_HEIGHT * constantes.CELL_SIZE))
-
-clock = pygame.time.Clock()
-
-# --------- Loop principal ---------
-running = True
-time_inicio = time.time()
-time_atual = time_inicio
-limite = constantes.TEMPO_EXPERIMENTO
-while time_atual - time_inicio < limite and running:
-    time_atual = time.time()
-    # Processamento do SimPy (um passo)
-    env.step()
-
-    # Eventos Pygame
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # Preencher fundo
-    bg_color = constantes.STORM_BG_COLOR if getattr(env, 'is_storm', False) else constantes.NORMAL_BG_COLOR
-    screen.fill(bg_color)
-    
-    if getattr(env, 'is_storm', False):
-        draw_lightning(screen)
-
-    # Desenhar recursos ainda não coletados
-    for res in all_resources:
-        if not res.collected:
-            res.draw(screen)
-
-    # Desenhar base
-    half = constantes.BASE_SIZE // 2
-    rect = pygame.Rect(
-        (base_x - half) * constantes.CELL_SIZE,
-        (base_y - half) * constantes.CELL_SIZE,
-        constantes.BASE_SIZE * constantes.CELL_SIZE,
-        constantes.BASE_SIZE * constantes.CELL_SIZE
-    )
-    pygame.draw.rect(screen, constantes.BASE_COLOR, rect)
-
-    # Desenhar e atualizar agentes
-    for ag in agents:
-        if ag.name != "BDI":
-            ag.draw(screen)
-        if hasattr(ag, "shared_info"):
-            #print(f"Agente: {ag.name} Tem {ag.shared_info} Recursos\n")
-            pass
-
-
-    # Desenhar legenda
-    draw_legend(screen, agents)
-
-    pygame.display.flip()
-    clock.tick(FPS)
-
-# Ao fechar, exibir métricas finais
-print("\n=== Métricas de Coleta ===")
-for ag in agents:
-    if ag.name != "BDI":
-        delivered_dict = register_delivery(ag.name)
-        if delivered_dict != 0:
-            print(f"Agente {ag.name}: Conseguiu {delivered_dict["val"]} Pontos. Coletou {delivered_dict["resources"]}")
-        else:
-            print(f"Agente {ag.name}: Conseguiu {0} Pontos. Coletou ()")
-
-
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        run_interactive(config, None if args.speed == "max" else int(args.speed), args.csv, args.restore,
+                        args.profile)
+    sys.exit()
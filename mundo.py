@@ -0,0 +1,173 @@
+# mundo.py
+#
+# Modelo opcional do mundo em vetores NumPy, ao lado de recursos.py: grade
+# de tipos (int8), máscara de coletados, máscara de obstáculos e mapas de
+# células visitadas por agente. Consultas em lote ("todos os cristais não
+# coletados", "% de cobertura", "recursos num raio") viram operações
+# vetorizadas. Índices sempre [y, x].
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional; só este módulo depende dele
+    np = None
+
+import constantes
+
+EMPTY = 0
+RESOURCE_CODES = {'cristal': 1, 'metal': 2, 'estrutura': 3}
+RESOURCE_NAMES = {code: name for name, code in RESOURCE_CODES.items()}
+
+
+class WorldArrays:
+    def __init__(self, width=None, height=None):
+        if np is None:
+            raise ImportError("mundo.WorldArrays requer numpy (pip install numpy)")
+        self.width = constantes.GRID_WIDTH if width is None else width
+        self.height = constantes.GRID_HEIGHT if height is None else height
+        shape = (self.height, self.width)
+        self.types = np.zeros(shape, dtype=np.int8)
+        self.ids = np.zeros(shape, dtype=np.int32)       # id do Resource (0 = nenhum)
+        self.collected = np.zeros(shape, dtype=bool)
+        self.obstacles = np.zeros(shape, dtype=bool)
+        self.visited = {}                                # id do agente -> máscara bool
+        self.swarm_visited = None                        # máscaras do enxame, [agente, y, x]
+
+    @classmethod
+    def from_resources(cls, resources, obstacles=(), width=None, height=None):
+        """Monta os vetores a partir da lista de Resource e dos obstáculos."""
+        world = cls(width, height)
+        world.add_resources(resources)
+        world.set_obstacles(obstacles)
+        return world
+
+    def add_resources(self, resources):
+        resources = list(resources)
+        if not resources:
+            return
+        xs = np.fromiter((r.x for r in resources), dtype=np.intp, count=len(resources))
+        ys = np.fromiter((r.y for r in resources), dtype=np.intp, count=len(resources))
+        self.types[ys, xs] = [RESOURCE_CODES[r.type] for r in resources]
+        self.ids[ys, xs] = [r.id for r in resources]
+        self.collected[ys, xs] = [r.collected for r in resources]
+
+    def set_obstacles(self, obstacles):
+        """Aceita uma lista de Obstacle ou um ObstacleMap."""
+        blocked = getattr(obstacles, 'blocked', None)
+        if blocked is not None:
+            self.obstacles = np.frombuffer(bytes(blocked), dtype=np.uint8).reshape(
+                self.height, self.width).astype(bool)
+            return
+        self.obstacles[:] = False
+        for o in obstacles:
+            self.obstacles[o.y, o.x] = True
+
+    def attach(self, index):
+        """Mantém a máscara de coletados em dia com um recursos.ResourceIndex."""
+        index.subscribe(lambda res: self.mark_collected(res.x, res.y))
+
+    # --------- Atualizações ---------
+    def mark_collected(self, x, y):
+        self.collected[y, x] = True
+
+    def visited_map(self, agent_key):
+        mask = self.visited.get(agent_key)
+        if mask is None:
+            mask = self.visited[agent_key] = np.zeros((self.height, self.width), dtype=bool)
+        return mask
+
+    def mark_visited(self, agent_key, x, y):
+        self.visited_map(agent_key)[y, x] = True
+
+    def tracker(self, env, agents):
+        """
+        Processo SimPy que marca, uma vez por passo, a célula de cada agente
+        no seu mapa de visitados (chave = `ag.id`). Os agentes andam no
+        máximo uma célula por passo, então nenhuma fica de fora.
+        """
+        while True:
+            for ag in agents:
+                self.mark_visited(ag.id, ag.x, ag.y)
+            yield env.timeout(1)
+
+    def swarm_tracker(self, env, swarm):
+        """
+        Como `tracker`, para um agents.swarm.ReactiveSwarm: uma máscara por
+        índice de agente em `swarm_visited` (memória: tamanho x células).
+        """
+        size = swarm.size
+        if self.swarm_visited is None:    # um ponto de salvamento restaurado já as traz
+            self.swarm_visited = np.zeros((size, self.height, self.width), dtype=bool)
+        agents = np.arange(size)
+        sync = getattr(swarm, 'sync', None)     # enxame repartido: posições nas faixas
+        while True:
+            if sync is not None:
+                sync()
+            self.swarm_visited[agents, swarm.ys, swarm.xs] = True
+            yield env.timeout(1)
+
+    def sync_visited(self, agent_key, cells):
+        """Copia em lote um conjunto de células (ex.: `agent.visited`)."""
+        mask = self.visited_map(agent_key)
+        if cells:
+            flat = np.fromiter((y * self.width + x for x, y in cells), dtype=np.intp, count=len(cells))
+            mask.ravel()[flat] = True
+        return mask
+
+    # --------- Consultas em lote ---------
+    def live_mask(self, type=None):
+        """Células com recurso ainda não coletado (opcionalmente de um tipo)."""
+        if type is None:
+            mask = self.types != EMPTY
+        else:
+            mask = self.types == RESOURCE_CODES[type]
+        return mask & ~self.collected
+
+    def uncollected(self, type=None):
+        """Coordenadas (xs, ys) dos recursos não coletados."""
+        ys, xs = np.nonzero(self.live_mask(type))
+        return xs, ys
+
+    def count_uncollected(self, type=None):
+        return int(np.count_nonzero(self.live_mask(type)))
+
+    def coverage(self, agent_key=None, swarm_index=None):
+        """
+        Fração das células livres já visitadas pelo agente de id `agent_key`
+        ou pelo agente `swarm_index` do enxame (união de todos se ambos None).
+        """
+        if swarm_index is not None:
+            seen = self.swarm_visited[swarm_index]
+        elif agent_key is not None:
+            seen = self.visited_map(agent_key)
+        else:
+            masks = list(self.visited.values())
+            if self.swarm_visited is not None:
+                masks.append(self.swarm_visited.any(axis=0))
+            if not masks:
+                return 0.0
+            seen = np.logical_or.reduce(masks)
+        free = ~self.obstacles
+        total = np.count_nonzero(free)
+        return float(np.count_nonzero(seen & free)) / total if total else 0.0
+
+    def within_radius(self, x, y, r, type=None, metric='manhattan'):
+        """
+        Recursos não coletados a até `r` células de (x, y), como (xs, ys).
+        Só a janela (2r+1)x(2r+1) ao redor do ponto é examinada.
+        """
+        x0, x1 = max(0, x - r), min(self.width, x + r + 1)
+        y0, y1 = max(0, y - r), min(self.height, y + r + 1)
+        types = self.types[y0:y1, x0:x1]
+        if type is None:
+            window = types != EMPTY
+        else:
+            window = types == RESOURCE_CODES[type]
+        window &= ~self.collected[y0:y1, x0:x1]
+        ys, xs = np.nonzero(window)
+        xs = xs + x0
+        ys = ys + y0
+        if metric == 'manhattan':
+            keep = np.abs(xs - x) + np.abs(ys - y) <= r
+        else:
+            keep = (xs - x) ** 2 + (ys - y) ** 2 <= r * r
+        return xs[keep], ys[keep]
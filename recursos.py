@@ -3,6 +3,7 @@
 import random
 import pygame
 import constantes
+from utils.scenario import excluded_cells, sample_cells, generate_obstacles
 
 class Resource:
     def __init__(self, id, type, x, y):
@@ -33,38 +34,100 @@ class Obstacle:
 
     def draw(self, screen):
         cell = constantes.CELL_SIZE
-        px = self.x * cell + cell // 2
-        py = self.y * cell + cell // 2
-        color = {
-            'cristal': constantes.CRYSTAL_COLOR,
-            'metal':   constantes.METAL_COLOR,
-            'estrutura': constantes.STRUCTURE_COLOR
-        }[self.type]
-        radius = cell // 4    # era `cell // 2 - 2`
-        pygame.draw.circle(screen, color, (px, py), radius)
+        pygame.draw.rect(screen, constantes.OBSTACLE_COLOR, (self.x * cell, self.y * cell, cell, cell))
+
+
+class ResourceIndex:
+    """
+    Índice espacial dos recursos: mapa célula -> recurso e conjuntos vivos
+    por tipo. Toda coleta deve passar por `collect` para manter o índice
+    consistente; consultas pontuais e de disponibilidade ficam O(1).
+    Iterar o índice percorre todos os recursos (coletados ou não), como a
+    lista original.
+    """
+    def __init__(self, resources):
+        self.resources = resources
+        self.by_cell = {}
+        self.live = {kind: set() for kind in constantes.RESOURCE_VALUES}
+        self.listeners = []  # chamados com o recurso a cada coleta
+        self.rebuild()
+
+    def rebuild(self):
+        """Reconstrói o índice a partir do estado `collected` dos recursos."""
+        self.by_cell.clear()
+        for live in self.live.values():
+            live.clear()
+        for res in self.resources:
+            if not res.collected:
+                self.by_cell[(res.x, res.y)] = res
+                self.live[res.type].add(res)
+
+    def at(self, pos):
+        """Recurso ainda não coletado na célula `pos` (ou None)."""
+        res = self.by_cell.get(pos)
+        if res is not None and res.collected:
+            # coletado por fora do índice: corrige preguiçosamente
+            self.collect(res)
+            return None
+        return res
+
+    def is_available(self, pos, type=None):
+        res = self.at(pos)
+        return res is not None and (type is None or res.type == type)
+
+    def collect(self, res):
+        """Marca o recurso como coletado e o remove do índice."""
+        res.collected = True
+        if self.by_cell.get((res.x, res.y)) is res:
+            del self.by_cell[(res.x, res.y)]
+        self.live[res.type].discard(res)
+        for callback in self.listeners:
+            callback(res)
+
+    def subscribe(self, callback):
+        """Registra `callback(res)` para ser chamado a cada coleta."""
+        self.listeners.append(callback)
+
+    def __iter__(self):
+        return iter(self.resources)
+
+    def __len__(self):
+        return len(self.resources)
 
 
-def create_resources():
+def create_resources(num_crystals=None, num_metal=None, num_structures=None,
+                     width=None, height=None, obstacles=None, base=None, rng=random):
+    """
+    Recursos em células distintas, fora do quadrado da base e dos
+    obstáculos (lista de Obstacle ou ObstacleMap). O sorteio é sem
+    reposição (utils.scenario.sample_cells), então o custo não cresce com
+    a densidade.
+    """
+    width = constantes.GRID_WIDTH if width is None else width
+    height = constantes.GRID_HEIGHT if height is None else height
+    kinds = [
+        ('cristal', constantes.NUM_CRYSTALS if num_crystals is None else num_crystals),
+        ('metal', constantes.NUM_METAL if num_metal is None else num_metal),
+        ('estrutura', constantes.NUM_STRUCTURES if num_structures is None else num_structures)
+    ]
+    cells = iter(sample_cells(sum(count for _, count in kinds), width, height,
+                              excluded_cells(width, height, base, obstacles), rng))
     resources = []
-    positions = set()
     id_counter = 1
-    for kind, count in [
-        ('cristal', constantes.NUM_CRYSTALS),
-        ('metal', constantes.NUM_METAL),
-        ('estrutura', constantes.NUM_STRUCTURES)
-    ]:
+    for kind, count in kinds:
         for _ in range(count):
-            while True:
-                x = random.randrange(constantes.grid_width)
-                y = random.randrange(constantes.grid_height)
-                if (x, y) != constantes.BASE_POS and (x, y) not in positions:
-                    positions.add((x, y))
-                    break
-            resources.append(Resource(id_counter, kind, x, y))
+            cell = next(cells)
+            resources.append(Resource(id_counter, kind, cell % width, cell // width))
             id_counter += 1
     return resources
 
 
-def create_obstacles():
-    # Se desejar obstáculos estáticos, instancie aqui; senão, retorna lista vazia
-    return []
+def create_obstacles(terrain=None, width=None, height=None, rng=random):
+    """
+    Sem `terrain`, nenhum obstáculo (lista vazia). Com `terrain` (dict de
+    argumentos de utils.scenario.generate_obstacles, ex.
+    {'mountains': 0.15, 'rivers': 2}), um ObstacleMap procedural.
+    """
+    if terrain is None:
+        return []
+    return generate_obstacles(width, height, rng=rng, **terrain)
@@ -0,0 +1,241 @@
+# render.py
+#
+# Desenho da simulação com pygame. O Renderer pré-desenha uma vez as camadas
+# estáticas (fundo, base, obstáculos e legenda) e, a cada quadro, redesenha
+# só as células cujo recurso ou ocupação por agentes mudou, atualizando a
+# tela com display.update(retângulos sujos).
+
+import time
+import random
+import pygame
+
+import constantes
+
+LIGHTNING_COLOR = (255, 255, 200)
+
+
+def draw_lightning(screen, rng=random):
+    """Desenha um raio (10% de chance) e devolve o retângulo afetado, ou None."""
+    if rng.random() < 0.1:  # 10% de chance de desenhar um raio por frame
+        start_x = rng.randint(0, constantes.GRID_WIDTH * constantes.CELL_SIZE)
+        points = []
+        y = 0
+        while y < constantes.GRID_HEIGHT * constantes.CELL_SIZE:
+            points.append((start_x, y))
+            start_x += rng.randint(-20, 20)
+            y += rng.randint(10, 30)
+        return pygame.draw.lines(screen, LIGHTNING_COLOR, False, points, 2)
+    return None
+
+
+# Desenha legenda
+def draw_legend(screen, agents, font=None):
+    # Calcula a posição inicial da legenda
+    legend_x = constantes.GRID_WIDTH * constantes.CELL_SIZE
+    legend_width = constantes.LEGEND_WIDTH
+    
+    # Desenha o fundo da legenda
+    pygame.draw.rect(screen, constantes.LEGEND_BG_COLOR, 
+                    (legend_x, 0, legend_width, constantes.GRID_HEIGHT * constantes.CELL_SIZE))
+    
+    # Prepara a fonte
+    if font is None:
+        font = pygame.font.SysFont('Arial', 16)
+    y_pos = constantes.LEGEND_MARGIN
+    
+    # Título
+    title = font.render("Legenda:", True, constantes.LEGEND_TEXT_COLOR)
+    screen.blit(title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
+    y_pos += constantes.LEGEND_LINE_HEIGHT
+    
+    # Agentes
+    agent_title = font.render("Agentes:", True, constantes.LEGEND_TEXT_COLOR)
+    screen.blit(agent_title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
+    y_pos += constantes.LEGEND_LINE_HEIGHT
+    
+    for agent in agents:
+        # Quadrado de cor
+        pygame.draw.rect(screen, agent.color, 
+                        (legend_x + constantes.LEGEND_MARGIN, y_pos, 20, 20))
+        
+        # Nome do agente
+        agent_name = font.render(agent.name, True, constantes.LEGEND_TEXT_COLOR)
+        screen.blit(agent_name, (legend_x + constantes.LEGEND_MARGIN + 25, y_pos + 2))
+        y_pos += constantes.LEGEND_LINE_HEIGHT
+    
+    # Recursos
+    y_pos += constantes.LEGEND_LINE_HEIGHT  # Espaço extra
+    resources_title = font.render("Recursos:", True, constantes.LEGEND_TEXT_COLOR)
+    screen.blit(resources_title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
+    y_pos += constantes.LEGEND_LINE_HEIGHT
+    
+    # Adicione aqui os tipos de recursos com suas cores
+    resource_types = [
+        ("Cristal Energético", constantes.CRYSTAL_COLOR),
+        ("Bloco de Metal", constantes.METAL_COLOR),
+        ("Estrutura Antiga", constantes.STRUCTURE_COLOR)
+    ]
+    
+    for name, color in resource_types:
+        
+        pygame.draw.rect(screen, color, 
+                        (legend_x + constantes.LEGEND_MARGIN, y_pos, 20, 20))
+        res_name = font.render(name, True, constantes.LEGEND_TEXT_COLOR)
+        screen.blit(res_name, (legend_x + constantes.LEGEND_MARGIN + 25, y_pos + 2))
+        y_pos += constantes.LEGEND_LINE_HEIGHT
+    
+    # # Obstáculos
+    # y_pos += constantes.LEGEND_LINE_HEIGHT  # Espaço extra
+    # obs_title = font.render("Obstáculos:", True, constantes.LEGEND_TEXT_COLOR)
+    # screen.blit(obs_title, (legend_x + constantes.LEGEND_MARGIN, y_pos))
+    # y_pos += constantes.LEGEND_LINE_HEIGHT
+    
+    # pygame.draw.rect(screen, constantes.OBSTACLE_COLOR, 
+    #                 (legend_x + constantes.LEGEND_MARGIN, y_pos, 20, 20))
+    # obs_name = font.render("Montanhas/Rios", True, constantes.LEGEND_TEXT_COLOR)
+    # screen.blit(obs_name, (legend_x + constantes.LEGEND_MARGIN + 25, y_pos + 2))
+    return y_pos
+
+
+def draw_base(screen, base_x, base_y):
+    half = constantes.BASE_SIZE // 2
+    rect = pygame.Rect(
+        (base_x - half) * constantes.CELL_SIZE,
+        (base_y - half) * constantes.CELL_SIZE,
+        constantes.BASE_SIZE * constantes.CELL_SIZE,
+        constantes.BASE_SIZE * constantes.CELL_SIZE
+    )
+    pygame.draw.rect(screen, constantes.BASE_COLOR, rect)
+    return rect
+
+
+class Renderer:
+    """
+    Renderização incremental: camadas estáticas pré-desenhadas (uma para o
+    tempo normal, outra para a tempestade) e redesenho apenas das células
+    sujas. Recursos coletados chegam pela assinatura do ResourceIndex; as
+    células de agentes são comparadas com as do quadro anterior.
+    `frame_ms` guarda o tempo de desenho do último quadro.
+    """
+    def __init__(self, screen, resource_index, agents, obstacle_map=None, swarm=None,
+                 base=constantes.BASE_POS):
+        self.screen = screen
+        self.resource_index = resource_index
+        self.agents = [ag for ag in agents if ag.name != "BDI"]
+        self.swarm = swarm
+        self.base_rect = pygame.Rect(0, 0, 0, 0)
+        self.font = pygame.font.SysFont('Arial', 16)
+        self.rng = random.Random()  # raios não consomem o random da simulação
+
+        self.layers = {
+            storm: self._static_layer(storm, agents, obstacle_map, base)
+            for storm in (False, True)
+        }
+
+        self.dirty_cells = set()
+        resource_index.subscribe(lambda res: self.dirty_cells.add((res.x, res.y)))
+        self.occupancy = {}
+        self.swarm_cells = set()
+        self.storm = None
+        self.lightning_rect = None
+        self.status_text = None
+        self.frame_ms = 0.0
+
+    def _static_layer(self, storm, agents, obstacle_map, base):
+        layer = pygame.Surface(self.screen.get_size())
+        layer.fill(constantes.STORM_BG_COLOR if storm else constantes.NORMAL_BG_COLOR)
+        if obstacle_map is not None:
+            cell = constantes.CELL_SIZE
+            for i, blocked in enumerate(obstacle_map.blocked):
+                if blocked:
+                    x, y = i % obstacle_map.width, i // obstacle_map.width
+                    pygame.draw.rect(layer, constantes.OBSTACLE_COLOR, (x * cell, y * cell, cell, cell))
+        self.base_rect = draw_base(layer, *base)
+        self.status_y = draw_legend(layer, agents, self.font) + constantes.LEGEND_LINE_HEIGHT
+        return layer
+
+    def _cell_rect(self, cell):
+        size = constantes.CELL_SIZE
+        return pygame.Rect(cell[0] * size, cell[1] * size, size, size)
+
+    def _draw_cell(self, cell, layer):
+        rect = self._cell_rect(cell)
+        self.screen.blit(layer, rect, rect)
+        if not self.base_rect.colliderect(rect):  # a base cobre recursos embaixo dela
+            res = self.resource_index.at(cell)
+            if res is not None:
+                res.draw(self.screen)
+        for ag in self.occupancy.get(cell, ()):
+            ag.draw(self.screen)
+        if cell in self.swarm_cells:
+            size = constantes.CELL_SIZE
+            pygame.draw.rect(self.screen, self.swarm.color,
+                             (cell[0] * size + 2, cell[1] * size + 2, size - 4, size - 4))
+        return rect
+
+    def _cells_in(self, rect):
+        size = constantes.CELL_SIZE
+        for cy in range(max(0, rect.top // size), min(constantes.GRID_HEIGHT, rect.bottom // size + 1)):
+            for cx in range(max(0, rect.left // size), min(constantes.GRID_WIDTH, rect.right // size + 1)):
+                yield (cx, cy)
+
+    def draw(self, storm, status=()):
+        """Desenha um quadro e atualiza só as regiões alteradas da tela."""
+        inicio = time.perf_counter()
+        layer = self.layers[storm]
+
+        occupancy = {}
+        for ag in self.agents:
+            occupancy.setdefault((ag.x, ag.y), []).append(ag)
+        swarm_cells = set(zip(self.swarm.xs.tolist(), self.swarm.ys.tolist())) if self.swarm else set()
+
+        if storm != self.storm:
+            # Troca de fundo: quadro completo
+            self.occupancy, self.swarm_cells = occupancy, swarm_cells
+            self.screen.blit(layer, (0, 0))
+            for res in self.resource_index.by_cell.values():
+                if not self.base_rect.colliderect(self._cell_rect((res.x, res.y))):
+                    res.draw(self.screen)
+            for ag in self.agents:
+                ag.draw(self.screen)
+            if self.swarm:
+                self.swarm.draw(self.screen)
+            rects = [self.screen.get_rect()]
+            self.storm = storm
+            self.status_text = None
+        else:
+            dirty = self.dirty_cells
+            for cell in occupancy.keys() | self.occupancy.keys():
+                if occupancy.get(cell) != self.occupancy.get(cell):
+                    dirty.add(cell)
+            dirty |= swarm_cells ^ self.swarm_cells
+            if self.lightning_rect is not None:
+                dirty.update(self._cells_in(self.lightning_rect))
+            self.occupancy, self.swarm_cells = occupancy, swarm_cells
+            rects = [self._draw_cell(cell, layer) for cell in dirty]
+        self.dirty_cells = set()
+
+        self.lightning_rect = draw_lightning(self.screen, self.rng) if storm else None
+        if self.lightning_rect is not None:
+            rects.append(self.lightning_rect)
+
+        status = list(status) + [f"Quadro: {self.frame_ms:.1f} ms"]
+        rects.extend(self._draw_status(status, layer))
+
+        pygame.display.update(rects)
+        self.frame_ms = (time.perf_counter() - inicio) * 1000
+        return self.frame_ms
+
+    def _draw_status(self, lines, layer):
+        """Linhas de estado no rodapé da legenda, renderizadas só quando mudam."""
+        if lines == self.status_text:
+            return []
+        self.status_text = lines
+        x = constantes.GRID_WIDTH * constantes.CELL_SIZE
+        rect = pygame.Rect(x, self.status_y, constantes.LEGEND_WIDTH,
+                           constantes.LEGEND_LINE_HEIGHT * len(lines))
+        self.screen.blit(layer, rect, rect)
+        for i, line in enumerate(lines):
+            text = self.font.render(line, True, constantes.LEGEND_TEXT_COLOR)
+            self.screen.blit(text, (x + constantes.LEGEND_MARGIN, self.status_y + i * constantes.LEGEND_LINE_HEIGHT))
+        return [rect]
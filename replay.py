@@ -0,0 +1,356 @@
+# replay.py
+#
+# Reproduz um episódio gravado com utils.trace, sem simular de novo: o
+# arquivo é mapeado em memória, uma passada inicial monta quadros-chave a
+# cada K passos e o desenho usa os próprios métodos `draw` dos agentes e
+# recursos, pelo Renderer de render.py.
+#
+#   python replay.py episodio.trace [--speed 10] [--keyframe 500]
+#   python replay.py --connect 127.0.0.1:8765    (episódio ao vivo, main.py --serve)
+#
+# Teclas: espaço pausa, +/- mudam a velocidade, setas andam 100 passos
+# (com shift, 1000), Home/End vão ao início/fim, 0-9 saltam para 0-90%.
+
+import sys
+import time
+import queue
+import asyncio
+import argparse
+import threading
+from bisect import bisect_right
+
+import constantes
+import recursos
+from mundo import RESOURCE_NAMES
+from utils.pathfinding import ObstacleMap
+from utils.stream import StreamState, open_stream, messages
+from utils.trace import (TraceReader, EV_SPAWN_RESOURCE, EV_SPAWN_OBSTACLE, EV_MOVE,
+                         EV_COLLECT, EV_DELIVER, EV_STORM_ON, EV_STORM_OFF)
+from agents.reactive import ReactiveAgent
+from agents.stateBased import StateBasedAgent
+from agents.goalBased import GoalBasedAgent
+from agents.cooperative import CooperativeAgent
+from agents.bdi import BDIAgent
+
+FPS = 60
+PLAYBACK_SPEEDS = [1, 10, 100, 1000, 10000]    # passos por segundo
+
+# Classe -> cor; os agentes do replay são criados sem __init__ (sem SimPy)
+AGENT_CLASSES = {
+    'ReactiveAgent': (ReactiveAgent, constantes.REACTIVE_COLOR),
+    'StateBasedAgent': (StateBasedAgent, constantes.STATEBASED_COLOR),
+    'GoalBasedAgent': (GoalBasedAgent, constantes.GOALBASED_COLOR),
+    'CooperativeAgent': (CooperativeAgent, constantes.COOPERATIVE_COLOR),
+    'BDIAgent': (BDIAgent, constantes.BDI_COLOR),
+}
+
+
+def make_proxy(info):
+    """Instância "vazia" da classe original do agente, só para desenhar."""
+    cls, color = AGENT_CLASSES[info['class']]
+    ag = cls.__new__(cls)
+    ag.id = info['id']
+    ag.name = info['name']
+    ag.color = color
+    ag.x, ag.y = constantes.BASE_POS
+    return ag
+
+
+class ReplayState:
+    """
+    Estado do episódio reconstruído a partir do trace. `seek(tick)` parte do
+    quadro-chave anterior e aplica só os registros até `tick`; andar para a
+    frente aplica apenas os registros novos.
+    """
+    def __init__(self, reader, keyframe_interval=500):
+        self.reader = reader
+        meta = reader.meta
+        # Agentes registrados no cabeçalho (o enxame vetorizado não grava passos)
+        self.agents = [make_proxy(info) for info in meta.get('agents', ())
+                       if info['class'] in AGENT_CLASSES]
+        self.by_id = {ag.id: ag for ag in self.agents}
+        self.resources = []
+        self.resource_by_id = {}
+        obstacles = []
+        width = meta.get('width', constantes.GRID_WIDTH)
+        height = meta.get('height', constantes.GRID_HEIGHT)
+
+        # Estado inicial: registros de criação no primeiro passo (0, ou o
+        # passo em que um episódio salvo foi retomado)
+        self.first_tick = reader.tick_at(0) if len(reader) else 0
+        start = 0
+        for tick, event, agent, x, y, arg in reader.records():
+            if tick != self.first_tick or event not in (EV_SPAWN_RESOURCE, EV_SPAWN_OBSTACLE):
+                break
+            if event == EV_SPAWN_RESOURCE:
+                res = recursos.Resource(arg, RESOURCE_NAMES[agent], x, y)
+                self.resources.append(res)
+                self.resource_by_id[arg] = res
+            else:
+                obstacles.append(recursos.Obstacle(len(obstacles), x, y))
+            start += 1
+        self.start = start
+        self.obstacle_map = ObstacleMap.from_obstacles(obstacles, width, height)
+        self.index = recursos.ResourceIndex(self.resources)
+        self.base = tuple(meta.get('base', constantes.BASE_POS))
+        self.end_tick = reader.last_tick()
+
+        self.keyframe_interval = keyframe_interval
+        self._reset()
+        self._build_keyframes()
+
+    def _reset(self):
+        self.cursor = self.start          # próximo registro a aplicar
+        self.tick = self.first_tick - 1
+        self.storm = False
+        self.collect_order = []           # ids na ordem de coleta (trace inteiro)
+        self.n_collected = 0
+        self.scores = {}
+        for ag in self.agents:
+            ag.x, ag.y = self.base
+        for res in self.resources:
+            res.collected = False
+        self.index.rebuild()
+
+    def _snapshot(self):
+        return (self.tick, self.cursor, {ag.id: (ag.x, ag.y) for ag in self.agents},
+                self.n_collected, self.storm, dict(self.scores))
+
+    def _build_keyframes(self):
+        """Uma passada pelo trace inteiro, guardando o estado a cada K passos."""
+        self.keyframes = [self._snapshot()]
+        next_key = self.first_tick + self.keyframe_interval
+        while next_key <= self.end_tick:
+            self.advance(next_key - 1)
+            self.keyframes.append(self._snapshot())
+            next_key += self.keyframe_interval
+        self.keyframe_ticks = [key[0] for key in self.keyframes]
+        self.seek(self.first_tick)
+
+    def _restore(self, key):
+        tick, cursor, positions, n_collected, storm, scores = key
+        for ag in self.agents:
+            ag.x, ag.y = positions[ag.id]
+        # só marca as flags e reconstrói o índice, sem avisar os assinantes
+        for res in self.resources:
+            res.collected = False
+        for res_id in self.collect_order[:n_collected]:
+            self.resource_by_id[res_id].collected = True
+        self.index.rebuild()
+        self.n_collected = n_collected
+        self.tick, self.cursor, self.storm, self.scores = tick, cursor, storm, dict(scores)
+
+    def advance(self, tick):
+        """Aplica os registros até o fim do passo `tick` (só para frente)."""
+        if tick <= self.tick:
+            return
+        stop = self.reader.index_of_tick(tick + 1)
+        for _, event, agent, x, y, arg in self.reader.records(self.cursor, stop):
+            if event == EV_MOVE:
+                ag = self.by_id.get(agent)
+                if ag is not None:
+                    ag.x, ag.y = x, y
+            elif event == EV_COLLECT:
+                res = self.resource_by_id.get(arg)
+                if res is not None and not res.collected:
+                    self.index.collect(res)
+                    if self.n_collected == len(self.collect_order):
+                        self.collect_order.append(arg)
+                    self.n_collected += 1
+            elif event == EV_DELIVER:
+                self.scores[agent] = self.scores.get(agent, 0) + constantes.RESOURCE_VALUES[RESOURCE_NAMES[arg]]
+            elif event == EV_STORM_ON:
+                self.storm = True
+            elif event == EV_STORM_OFF:
+                self.storm = False
+        self.cursor = max(self.cursor, stop)
+        self.tick = tick
+
+    def seek(self, tick):
+        """
+        Vai para o fim do passo `tick`, a partir do quadro-chave anterior se
+        ele estiver mais perto. Devolve True se o estado foi restaurado de
+        um quadro-chave (recursos podem ter mudado sem aviso ao índice).
+        """
+        tick = max(self.first_tick, min(tick, self.end_tick))
+        key = self.keyframes[bisect_right(self.keyframe_ticks, tick) - 1]
+        restored = tick < self.tick or key[0] > self.tick
+        if restored:
+            self._restore(key)
+        self.advance(tick)
+        return restored
+
+    def total_score(self):
+        return sum(self.scores.values())
+
+
+def run_viewer(path, speed=10, keyframe_interval=500):
+    import pygame
+    from render import Renderer
+
+    reader = TraceReader(path)
+    inicio = time.perf_counter()
+    state = ReplayState(reader, keyframe_interval)
+    print(f"{path}: {len(reader)} registros, {state.end_tick + 1} passos, "
+          f"{len(state.keyframes)} quadros-chave em {time.perf_counter() - inicio:.2f}s")
+
+    pygame.init()
+    total_width = constantes.GRID_WIDTH * constantes.CELL_SIZE + constantes.LEGEND_WIDTH
+    screen = pygame.display.set_mode((total_width, constantes.GRID_HEIGHT * constantes.CELL_SIZE))
+    pygame.display.set_caption(f"Replay: {path}")
+    renderer = Renderer(screen, state.index, state.agents, state.obstacle_map, base=state.base)
+    clock = pygame.time.Clock()
+
+    speed_idx = PLAYBACK_SPEEDS.index(speed) if speed in PLAYBACK_SPEEDS else 1
+    paused = False
+    position = float(state.first_tick)  # passo atual (fracionário entre quadros)
+    anterior = time.perf_counter()
+    running = True
+    while running:
+        agora = time.perf_counter()
+        decorrido, anterior = agora - anterior, agora
+        seek_to = None
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                step = 1000 if event.mod & pygame.KMOD_SHIFT else 100
+                if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    speed_idx = min(speed_idx + 1, len(PLAYBACK_SPEEDS) - 1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    speed_idx = max(speed_idx - 1, 0)
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    seek_to = state.tick + step
+                elif event.key == pygame.K_LEFT:
+                    seek_to = state.tick - step
+                elif event.key == pygame.K_HOME:
+                    seek_to = state.first_tick
+                elif event.key == pygame.K_END:
+                    seek_to = state.end_tick
+                elif pygame.K_0 <= event.key <= pygame.K_9:
+                    seek_to = state.first_tick + (state.end_tick - state.first_tick) * (event.key - pygame.K_0) // 10
+
+        if seek_to is not None:
+            position = float(max(state.first_tick, min(seek_to, state.end_tick)))
+        elif not paused:
+            position = min(position + decorrido * PLAYBACK_SPEEDS[speed_idx], state.end_tick)
+        if int(position) != state.tick and state.seek(int(position)):
+            renderer.storm = None       # estado restaurado: quadro completo
+
+        status = [
+            f"Replay: {PLAYBACK_SPEEDS[speed_idx]} passos/s{' (pausa)' if paused else ''}",
+            f"Passo: {state.tick} / {state.end_tick}",
+            f"Pontos: {state.total_score()}",
+        ]
+        renderer.draw(state.storm, status)
+        clock.tick(FPS)
+
+    pygame.quit()
+    reader.close()
+
+
+def _receive(address, inbox):
+    """Thread de rede: mensagens da transmissão para `inbox` (None no fim)."""
+    async def receive():
+        reader, writer = await open_stream(address)
+        async for message in messages(reader):
+            inbox.put(message)
+        writer.close()
+    try:
+        asyncio.run(receive())
+    finally:
+        inbox.put(None)
+
+
+def run_live(address):
+    """Assiste a um episódio transmitido por utils.stream (main.py --headless --serve)."""
+    import pygame
+    from render import Renderer
+
+    inbox = queue.Queue()
+    threading.Thread(target=_receive, args=(address, inbox), daemon=True).start()
+    state = StreamState()
+    # Espera o cabeçalho e o primeiro quadro-chave para montar a cena
+    while True:
+        message = inbox.get()
+        if message is None:
+            print(f"{address}: transmissão encerrada antes do primeiro quadro")
+            return
+        if state.apply(message) is not None and message['kind'] == 'keyframe':
+            break
+    info = state.info
+    agents = [make_proxy(agent) for agent in info['agents'] if agent['class'] in AGENT_CLASSES]
+    by_id = {ag.id: ag for ag in agents}
+    resources = [recursos.Resource(res_id, rtype, x, y) for res_id, (rtype, x, y) in state.resources.items()]
+    resource_by_id = {res.id: res for res in resources}
+    index = recursos.ResourceIndex(resources)
+    obstacle_map = ObstacleMap(info['width'], info['height'], info['obstacles']) if info['obstacles'] else None
+
+    pygame.init()
+    total_width = constantes.GRID_WIDTH * constantes.CELL_SIZE + constantes.LEGEND_WIDTH
+    screen = pygame.display.set_mode((total_width, constantes.GRID_HEIGHT * constantes.CELL_SIZE))
+    pygame.display.set_caption(f"Ao vivo: {address}")
+    renderer = Renderer(screen, index, agents, obstacle_map, base=tuple(info['base']))
+    clock = pygame.time.Clock()
+    live = True
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        # Aplica tudo o que chegou desde o último quadro
+        while live:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                live = False
+            elif state.apply(message) is not None and message['kind'] == 'keyframe':
+                # Quadro-chave (ex.: depois de quadros perdidos): acerta as flags e redesenha tudo
+                for res in resources:
+                    res.collected = res.id not in state.resources
+                index.rebuild()
+                renderer.storm = None
+            elif message['kind'] == 'delta' and state.keyframes:
+                for res_id in message['collected']:
+                    res = resource_by_id.get(res_id)
+                    if res is not None and not res.collected:
+                        index.collect(res)
+        for agent_id, (x, y) in state.positions.items():
+            ag = by_id.get(agent_id)
+            if ag is not None:
+                ag.x, ag.y = x, y
+
+        status = [
+            f"Ao vivo{'' if live else ' (encerrado)'}: {address}",
+            f"Passo: {state.tick}",
+            f"Recursos: {len(state.resources)}",
+        ]
+        renderer.draw(state.storm, status)
+        clock.tick(FPS)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reproduz um trace gravado (utils.trace)")
+    parser.add_argument("trace", nargs="?", help="arquivo gravado com --trace")
+    parser.add_argument("--connect", metavar="ENDERECO", default=None,
+                        help="assiste a um episódio transmitido (main.py --headless --serve)")
+    parser.add_argument("--speed", type=int, default=10, choices=PLAYBACK_SPEEDS,
+                        help="passos de simulação por segundo")
+    parser.add_argument("--keyframe", type=int, default=500,
+                        help="intervalo entre quadros-chave, em passos")
+    args = parser.parse_args()
+    if args.connect:
+        run_live(args.connect)
+    elif args.trace:
+        run_viewer(args.trace, args.speed, args.keyframe)
+    else:
+        parser.error("informe um trace ou --connect ENDERECO")
+    sys.exit()
@@ -0,0 +1,255 @@
+# simulation.py
+
+import random
+import simpy
+
+import constantes
+import recursos
+from utils.metrics import MetricsRecorder, metrics_for, LOG_OFF, LOG_INFO
+from utils.trace import TraceWriter, get_trace, agent_meta
+from utils.profiling import ProfiledEnvironment
+from agents.reactive import ReactiveAgent
+from agents.stateBased import StateBasedAgent
+from agents.goalBased import GoalBasedAgent
+from agents.cooperative import CooperativeAgent
+from agents.bdi import BDIAgent
+
+# Nome -> classe, para montar o elenco de agentes a partir de texto (CLI)
+AGENT_TYPES = {
+    'reactive': ReactiveAgent,
+    'state': StateBasedAgent,
+    'goal': GoalBasedAgent,
+    'cooperative': CooperativeAgent,
+    'bdi': BDIAgent,
+}
+
+DEFAULT_CONFIG = {
+    'seed': None,
+    'num_crystals': constantes.NUM_CRYSTALS,
+    'num_metal': constantes.NUM_METAL,
+    'num_structures': constantes.NUM_STRUCTURES,
+    'storm_interval': constantes.STORM_INTERVAL,
+    'storm_duration': constantes.STORM_DURATION,
+    'agent_classes': [ReactiveAgent, StateBasedAgent, GoalBasedAgent, CooperativeAgent, BDIAgent],
+    'world_arrays': False,  # mantém também um mundo.WorldArrays (requer numpy)
+    'swarm_size': 0,        # agentes reativos extras num agents.swarm.ReactiveSwarm
+    'swarm_shards': 0,      # > 1: o enxame roda em tantos processos (agents.sharded, experimental)
+    'verbose': False,
+    'log_level': LOG_OFF,   # utils.metrics: LOG_OFF, LOG_INFO ou LOG_DEBUG
+    'series': False,        # amostra pontuação/carga/tempestade a cada passo
+    'trace': None,          # caminho do trace binário de eventos (utils.trace)
+    'profile': False,       # mede processos e funções quentes (utils.profiling)
+    'terrain': None,        # dict para utils.scenario.generate_obstacles (None = sem obstáculos)
+    'sensor_range': None,   # alcance de percepção de todos os agentes (None = padrão de cada classe)
+}
+
+
+# --------- Função para controlar tempestades ---------
+def set_storm(env, agents, active):
+    """Liga/desliga a tempestade para todos os agentes E no ambiente."""
+    if active:
+        metrics_for(env).log(LOG_INFO, "[STORM] Tempestade iniciada! Agentes voltam à base.")
+    else:
+        metrics_for(env).log(LOG_INFO, "[STORM] Tempestade encerrada. Agentes retornam à coleta.")
+    trace = get_trace(env)
+    if trace is not None:
+        trace.storm(active)
+    for ag in agents:
+        ag.in_storm = active
+    env.is_storm = active  # Novo atributo para controlar o estado global
+
+
+def storm_controller(env, agents, interval=constantes.STORM_INTERVAL, duration=constantes.STORM_DURATION,
+                     elapsed=0):
+    """
+    Ciclo de `interval` passos de calma e `duration` de tempestade.
+    `elapsed` é o tempo já decorrido no ciclo (ao retomar um episódio
+    salvo); uma troca que vence agora acontece antes de qualquer agente
+    agir, como no episódio original.
+    """
+    cycle = interval + duration
+    elapsed %= cycle
+    if env.is_storm:
+        # Retomado no meio de uma tempestade: só falta encerrá-la
+        if elapsed:
+            yield env.timeout(cycle - elapsed)
+        set_storm(env, agents, False)
+        elapsed = 0
+    while True:
+        if elapsed < interval:
+            yield env.timeout(interval - elapsed)
+        set_storm(env, agents, True)
+        yield env.timeout(duration)
+        set_storm(env, agents, False)
+        elapsed = 0
+
+
+class Simulation:
+    """
+    Um episódio completo: ambiente SimPy, recursos, agentes, tempestade e
+    registro de entregas próprios. Pode ser reiniciado com `reset` para
+    rodar vários episódios seguidos no mesmo processo.
+    """
+    def __init__(self, config=None, **reset_args):
+        self.config = dict(DEFAULT_CONFIG)
+        self.config.update(config or {})
+        self.trace = None
+        self.reset(**reset_args)
+
+    def reset(self, seed=None, start=0, resources=None, obstacles=None, storm_phase=0, is_storm=False):
+        """
+        Descarta o episódio atual e monta um novo a partir da config. Os
+        demais argumentos servem para retomar um episódio salvo
+        (utils.snapshot): passo inicial, recursos e obstáculos prontos e
+        fase do ciclo de tempestades.
+        """
+        if seed is not None:
+            self.config['seed'] = seed
+        if self.config['seed'] is not None:
+            random.seed(self.config['seed'])
+
+        if self.config['profile']:
+            self.env = ProfiledEnvironment(initial_time=start)
+        else:
+            self.env = simpy.Environment(initial_time=start)
+        self.profiler = getattr(self.env, 'profiler', None)
+        self.env.is_storm = is_storm  # Estado inicial da tempestade (False num episódio novo)
+        self.storm_origin = start - storm_phase  # início do ciclo de tempestades
+        self.recorder = MetricsRecorder(self.config['log_level'], self.config['series'])
+        self.env.metrics = self.recorder
+        self.ledger = self.recorder  # nome antigo
+        self.close()
+        if self.config['trace']:
+            self.trace = TraceWriter(self.env, self.config['trace'], {
+                'width': constantes.GRID_WIDTH,
+                'height': constantes.GRID_HEIGHT,
+                'base': list(constantes.BASE_POS),
+                'seed': self.config['seed'],
+                'storm_interval': self.config['storm_interval'],
+                'storm_duration': self.config['storm_duration'],
+            })
+            self.env.trace = self.trace
+
+        # --------- Criar obstáculos e recursos ---------
+        if obstacles is None:
+            obstacles = recursos.create_obstacles(self.config['terrain'])
+        self.obstacles = obstacles
+        if resources is None:
+            resources = recursos.create_resources(
+                self.config['num_crystals'],
+                self.config['num_metal'],
+                self.config['num_structures'],
+                obstacles=self.obstacles,
+            )
+        self.resources = resources
+        self.resource_index = recursos.ResourceIndex(self.resources)
+        self.world = None
+        if self.config['world_arrays'] or self.config['swarm_size']:
+            from mundo import WorldArrays
+            self.world = WorldArrays.from_resources(self.resources, self.obstacles)
+            self.world.attach(self.resource_index)
+
+        verbose = self.config['verbose']
+        if verbose:
+            print("Recursos disponíveis:")
+            for res in self.resources:
+                print(f"  ID={res.id}, tipo={res.type}, posição=({res.x},{res.y}), requer={res.required_agents}")
+
+        # Tempestade antes dos agentes: quando uma troca vence no mesmo passo
+        # que eles agem, ela vem primeiro (também ao retomar um episódio)
+        self.storm_targets = []
+        self.storm = self.env.process(storm_controller(
+            self.env, self.storm_targets,
+            self.config['storm_interval'], self.config['storm_duration'],
+            storm_phase,
+        ))
+
+        # --------- Criar agentes na base ---------
+        self.base_x, self.base_y = constantes.BASE_POS
+        self.agents = []
+        for idx, cls in enumerate(self.config['agent_classes'], start=1):
+            self.agents.append(self.create_agent(idx, cls))
+            if verbose:
+                print(f"Agente {idx}: {cls.__name__} criado na base ({self.base_x},{self.base_y})")
+
+        if self.config['sensor_range'] is not None:
+            for ag in self.agents:
+                if hasattr(ag, 'sensor_range'):
+                    ag.sensor_range = self.config['sensor_range']
+
+        # --- Vincular agentes ao ambiente para uso interno (shared_info) ---
+        self.env.agents = self.agents
+
+        # Enxame vetorizado: fora de env.agents (não troca shared_info)
+        self.swarm = None
+        if self.config['swarm_size']:
+            from agents.swarm import ReactiveSwarm
+            from utils.navigation import get_home_field
+            home = get_home_field(self.env, (self.base_x, self.base_y), self.obstacles)
+            if self.config['swarm_shards'] > 1:
+                from agents.sharded import ShardedSwarm
+                self.swarm = ShardedSwarm(self.env, self.config['swarm_size'], self.world,
+                                          self.base_x, self.base_y, home, self.resource_index,
+                                          shards=self.config['swarm_shards'])
+            else:
+                self.swarm = ReactiveSwarm(self.env, self.config['swarm_size'], self.world,
+                                           self.base_x, self.base_y, home, self.resource_index)
+
+        if self.swarm:
+            self.swarm.id = len(self.agents) + 1
+        if self.trace is not None:
+            self.trace.meta['agents'] = agent_meta(self.agents + ([self.swarm] if self.swarm else []))
+            self.trace.spawn(self.resources, self.obstacles, self.agents)
+
+        if self.profiler is not None:
+            for ag in self.agents:
+                self.profiler.instrument(ag)
+
+        # Slots de métricas pré-alocados para todo o elenco
+        for ag in self.agents + ([self.swarm] if self.swarm else []):
+            self.recorder.register_agent(ag.name)
+        if self.config['series']:
+            self.env.process(self.recorder.sampler(self.env, self.agents))
+
+        if self.config['world_arrays']:
+            # Mapas de visitados por agente, para as consultas de cobertura
+            self.env.process(self.world.tracker(self.env, self.agents))
+            if self.swarm is not None:
+                self.env.process(self.world.swarm_tracker(self.env, self.swarm))
+
+        # Registrar tempestade
+        self.storm_targets.extend(self.agents + ([self.swarm] if self.swarm else []))
+        return self
+
+    def create_agent(self, idx, cls):
+        base_x, base_y = self.base_x, self.base_y
+        if cls == BDIAgent:
+            ag = cls(self.env, base_x, base_y, base_x, base_y, self.resource_index)  # Parâmetros específicos para BDI
+        else:
+            ag = cls(self.env, base_x, base_y, self.resource_index, base_x, base_y, self.obstacles)
+        ag.id = idx
+        return ag
+
+    def run(self, ticks):
+        """Avança `ticks` passos de simulação sem renderização."""
+        self.env.run(until=self.env.now + ticks)
+        if self.trace is not None:
+            self.trace.flush()
+        return self.metrics()
+
+    def close(self):
+        """Fecha o trace do episódio (se houver) e encerra os processos do enxame repartido."""
+        close_swarm = getattr(getattr(self, 'swarm', None), 'close', None)
+        if close_swarm is not None:
+            close_swarm()
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def metrics(self):
+        """Entregas por agente (exceto BDI): {nome: {"val", "resources"}}."""
+        metrics = {}
+        for ag in self.agents + ([self.swarm] if self.swarm else []):
+            if ag.name != "BDI":
+                metrics[ag.name] = self.recorder.summary(ag.name)
+        return metrics
@@ -0,0 +1,241 @@
+# sweep.py
+#
+# Varredura adaptativa de configurações (tempestade, densidade de recursos,
+# elenco de agentes). Os episódios rodam em rodadas, com as mesmas sementes
+# para todas as configurações de uma rodada; a cada rodada a pontuação de
+# cada configuração ganha média e intervalo de confiança (Welford), e
+# configurações deixam de rodar quando:
+#   - convergem: o intervalo ficou mais estreito que --precision da média;
+#   - são dominadas: o limite superior fica abaixo do limite inferior da
+#     melhor;
+#   - são cortadas na divisão sucessiva (successive halving): a cada
+#     degrau (--min-episodes, depois o dobro...) só a fração 1/--eta
+#     melhor, pela média, continua.
+# No fim, imprime a tabela ordenada e quantos episódios foram usados
+# contra uma varredura fixa de --max-episodes por configuração (--fixed
+# roda a varredura fixa, para comparar as conclusões).
+#
+#   python sweep.py --storm-interval 50,100,200 --storm-duration 10,30 \
+#       --densities 25:25:15,50:50:30 --ticks 3000
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import itertools
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import constantes
+from batch import run_episode, parse_density, parse_agents, _silence_worker
+
+# Estados de uma configuração
+ACTIVE = 'ativa'
+CONVERGED = 'convergiu'
+DOMINATED = 'dominada'
+HALVED = 'cortada'
+BUDGET = 'limite'
+
+
+class RunningStats:
+    """Média e variância incrementais (Welford)."""
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def half_width(self, confidence=0.95):
+        """Meia largura do intervalo de confiança da média (t de Student)."""
+        if self.n < 2:
+            return math.inf
+        return t_quantile(confidence, self.n - 1) * math.sqrt(self.variance() / self.n)
+
+
+def t_quantile(confidence, df):
+    """
+    Quantil bilateral da t de Student, pela expansão de Cornish-Fisher em
+    torno da normal (erro < 1% a partir de 3 graus de liberdade).
+    """
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    z3, z5 = z ** 3, z ** 5
+    return (z + (z3 + z) / (4 * df) + (5 * z5 + 16 * z3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * df ** 3))
+
+
+class Setting:
+    """Uma configuração da varredura: config da Simulation, pontuações e estado."""
+    def __init__(self, label, density, config):
+        self.label = label
+        self.density = density
+        self.config = config
+        self.score = RunningStats()        # objetivo por episódio
+        self.agents = {}                   # nome -> RunningStats dos pontos
+        self.status = ACTIVE
+
+    def record(self, result, objective):
+        for name, data in result['agents'].items():
+            self.agents.setdefault(name, RunningStats()).push(data['val'])
+        if objective == 'total':
+            value = sum(data['val'] for data in result['agents'].values())
+        else:
+            value = result['agents'].get(objective, {'val': 0})['val']
+        self.score.push(value)
+
+    def bounds(self, confidence):
+        half = self.score.half_width(confidence)
+        return self.score.mean - half, self.score.mean + half
+
+
+def build_settings(storm_intervals, storm_durations, densities, mixes):
+    settings = []
+    for interval, duration, density, mix in itertools.product(storm_intervals, storm_durations,
+                                                               densities, mixes):
+        config = dict(parse_density(density), storm_interval=interval, storm_duration=duration)
+        label = f"tempestade {interval}/{duration}  recursos {density}"
+        if mix:
+            config['agent_classes'] = parse_agents(mix)
+            label += f"  agentes {mix}"
+        settings.append(Setting(label, density, config))
+    return settings
+
+
+def prune(settings, confidence, precision, eta, rung, fixed):
+    """Atualiza o estado das configurações ativas depois de uma rodada."""
+    active = [s for s in settings if s.status == ACTIVE]
+    if fixed or not active:
+        return
+    best_low = max(s.bounds(confidence)[0] for s in settings)
+    for s in active:
+        low, high = s.bounds(confidence)
+        if high < best_low:
+            s.status = DOMINATED
+        elif s.score.half_width(confidence) <= precision * abs(s.score.mean):
+            s.status = CONVERGED
+    if rung:
+        active = [s for s in settings if s.status == ACTIVE]
+        keep = math.ceil(len(active) / eta)
+        ranked = sorted(active, key=lambda s: s.score.mean, reverse=True)
+        for s in ranked[keep:]:
+            s.status = HALVED
+
+
+def sweep(settings, ticks, batch=4, min_episodes=8, max_episodes=64, confidence=0.95,
+          precision=0.05, eta=2, objective='total', seed_start=0, workers=None, fixed=False,
+          out=None):
+    """
+    Roda rodadas de `batch` episódios por configuração ativa até nenhuma
+    sobrar. Devolve o total de episódios rodados.
+    """
+    episodes = 0
+    next_rung = min_episodes
+    seed = seed_start
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+        while True:
+            active = [s for s in settings if s.status == ACTIVE]
+            if not active:
+                break
+            seeds = list(range(seed, seed + batch))
+            seed += batch
+            tasks = [(s, {'seed': k, 'density': s.density, 'ticks': ticks, 'config': s.config})
+                     for s in active for k in seeds]
+            # pool.map devolve na ordem das tarefas: mesmas somas em qualquer número de processos
+            for (s, _), result in zip(tasks, pool.map(run_episode, [task for _, task in tasks])):
+                s.record(result, objective)
+                if out is not None:
+                    out.write(json.dumps(dict(result, setting=s.label), ensure_ascii=False) + "\n")
+            episodes += len(tasks)
+
+            done = seed - seed_start
+            if done >= min_episodes:
+                rung = done >= next_rung
+                if rung:
+                    next_rung *= 2
+                # No último degrau todas já esgotaram o limite: nada a cortar
+                rung = rung and done < max_episodes
+                prune(settings, confidence, precision, eta, rung, fixed)
+            for s in settings:
+                if s.status == ACTIVE and s.score.n >= max_episodes:
+                    s.status = BUDGET
+            print(f"rodada com sementes {seeds[0]}-{seeds[-1]}: {len(active)} configurações, "
+                  f"{episodes} episódios até agora", file=sys.stderr, flush=True)
+    return episodes
+
+
+# Ordem da tabela: primeiro as que chegaram ao fim, depois as eliminadas
+_STATUS_ORDER = {BUDGET: 0, CONVERGED: 0, ACTIVE: 0, HALVED: 1, DOMINATED: 2}
+
+
+def ranked_table(settings, confidence):
+    """
+    Linhas de texto, da melhor para a pior configuração: as que chegaram
+    ao fim (limite/convergiu) por média, depois as cortadas e as
+    dominadas, cada grupo por média (com menos episódios, menos confiável).
+    """
+    ranked = sorted(settings, key=lambda s: (_STATUS_ORDER[s.status], -s.score.mean))
+    lines = [f"{'#':>3} {'pontos':>9} {'± IC':>8} {'epis.':>6} {'estado':<10} configuração"]
+    for i, s in enumerate(ranked, start=1):
+        half = s.score.half_width(confidence)
+        lines.append(f"{i:>3} {s.score.mean:>9.1f} {half:>8.1f} {s.score.n:>6} {s.status:<10} {s.label}")
+        agents = "  ".join(f"{name} {stats.mean:.0f}" for name, stats in s.agents.items())
+        lines.append(f"{'':>40}{agents}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varredura adaptativa de configurações")
+    parser.add_argument("--storm-interval", default=str(constantes.STORM_INTERVAL),
+                        help="intervalos entre tempestades, separados por vírgula")
+    parser.add_argument("--storm-duration", default=str(constantes.STORM_DURATION),
+                        help="durações das tempestades, separadas por vírgula")
+    parser.add_argument("--densities", default="25:25:15",
+                        help="lista cristais:metais:estruturas separada por vírgula")
+    parser.add_argument("--agents", default=None,
+                        help="elencos separados por ';', ex.: 'reactive,state,bdi;state,state,bdi'")
+    parser.add_argument("--ticks", type=int, default=3000, help="passos por episódio")
+    parser.add_argument("--objective", default="total",
+                        help="pontuação a maximizar: 'total' ou o nome de um agente")
+    parser.add_argument("--batch", type=int, default=4, help="episódios por configuração em cada rodada")
+    parser.add_argument("--min-episodes", type=int, default=8,
+                        help="episódios antes de qualquer corte (primeiro degrau)")
+    parser.add_argument("--max-episodes", type=int, default=64, help="limite por configuração")
+    parser.add_argument("--confidence", type=float, default=0.95, help="nível dos intervalos")
+    parser.add_argument("--precision", type=float, default=0.05,
+                        help="convergiu quando a meia largura do IC for menor que esta fração da média")
+    parser.add_argument("--eta", type=float, default=2,
+                        help="em cada degrau continua só 1/eta das configurações")
+    parser.add_argument("--fixed", action="store_true",
+                        help="sem cortes: --max-episodes para todas (para comparar)")
+    parser.add_argument("--seed-start", type=int, default=0, help="primeira semente")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos (padrão: núcleos)")
+    parser.add_argument("--output", default=None, help="arquivo JSONL com todos os episódios")
+    args = parser.parse_args()
+
+    settings = build_settings(
+        [int(v) for v in args.storm_interval.split(',')],
+        [int(v) for v in args.storm_duration.split(',')],
+        args.densities.split(','),
+        args.agents.split(';') if args.agents else [None],
+    )
+    out = open(args.output, 'w') if args.output else None
+    inicio = time.perf_counter()
+    episodes = sweep(settings, args.ticks, args.batch, args.min_episodes, args.max_episodes,
+                     args.confidence, args.precision, args.eta, args.objective, args.seed_start,
+                     args.workers, args.fixed, out)
+    if out:
+        out.close()
+
+    print("\n".join(ranked_table(settings, args.confidence)))
+    budget = len(settings) * args.max_episodes
+    print(f"\n{episodes} episódios ({episodes / budget:.0%} de uma varredura fixa de {budget}) "
+          f"em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
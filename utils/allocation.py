@@ -0,0 +1,236 @@
+# utils/allocation.py
+
+# Alocação de tarefas cooperativas: recursos que exigem mais de um agente
+# (constantes.REQUIRED_AGENTS, hoje só a estrutura) viram tarefas, e
+# equipes (um líder cooperativo + parceiros livres na base) são montadas
+# por leilão guloso de utilidade valor / (distância + 1).
+#
+# As tarefas chegam pelo quadro (tópicos publicados pelo BDI) e saem pela
+# assinatura do ResourceIndex, então nada é varrido a cada passo. Uma
+# tarefa que some com a equipe a caminho é trocada, ali mesmo, pela melhor
+# tarefa aberta a partir da posição do líder.
+import time
+from bisect import bisect_left, insort
+
+import constantes
+from utils.blackboard import get_blackboard
+from utils.pathfinding import find_path
+
+# Tipos que exigem equipe
+TEAM_TYPES = tuple(kind for kind, required in constantes.REQUIRED_AGENTS.items() if required > 1)
+
+
+class Task:
+    """
+    Um recurso que exige `required` agentes. `members` guarda os ids da
+    equipe (o primeiro é o líder); `done` marca tarefa concluída ou
+    cancelada (recurso sumiu).
+    """
+    def __init__(self, pos, rtype, utility):
+        self.pos = pos
+        self.type = rtype
+        self.value = constantes.RESOURCE_VALUES[rtype]
+        self.required = constantes.REQUIRED_AGENTS[rtype]
+        self.utility = utility   # valor / (distância da base + 1)
+        self.members = []
+        self.done = False
+
+
+class TaskAllocator:
+    """
+    Tarefas abertas (conhecidas e sem equipe) e ativas (com equipe). Líderes
+    pedem tarefa com `request` quando estão livres na base; uma rodada por
+    passo atende todos os líderes em espera. Como as equipes partem da base,
+    dar a cada equipe, em ordem, a tarefa aberta de maior utilidade
+    maximiza a soma das utilidades.
+
+    Parceiros se registram com `register` e informam se estão livres por
+    `available_for_task()`; líderes e parceiros recebem tarefa (ou None =
+    voltar à base) por `assign_task(task, plan)`.
+    """
+    def __init__(self, env, index, home):
+        self.env = env
+        self.index = index
+        self.home = home
+        self.open = {}          # pos -> Task sem equipe
+        self.active = {}        # pos -> Task com equipe
+        self.ranking = []       # (-utilidade, pos) das tarefas abertas, em ordem
+        self.waiting = []       # líderes à espera de equipe, em ordem de pedido
+        self.partners = []      # agentes que aceitam ser parceiros
+        self.agents = {}        # id -> agente (líderes e parceiros)
+        self.last_round = None
+        # Estatísticas
+        self.rounds = 0
+        self.seconds = 0.0
+        self.assigned = 0
+        self.replanned = 0
+        self.completed = 0
+
+        board = get_blackboard(env)
+        for rtype in TEAM_TYPES:
+            board.subscribe(rtype, self.on_board)
+        for key, (_, topic, value) in board.entries.items():
+            if topic in TEAM_TYPES and value is not None:
+                self.add(key, value)
+        index.subscribe(self.on_collect)
+
+    # --------- Tarefas ---------
+    def add(self, pos, rtype):
+        """Nova tarefa em `pos` (ignorada se já existe, se o recurso sumiu ou se é inalcançável)."""
+        if pos in self.open or pos in self.active or not self.index.is_available(pos, rtype):
+            return
+        distance = self.home.distance(pos)
+        if distance is None:
+            return
+        task = self.open[pos] = Task(pos, rtype, constantes.RESOURCE_VALUES[rtype] / (distance + 1))
+        insort(self.ranking, (-task.utility, pos))
+
+    def on_board(self, key, value):
+        if value is None:
+            self.drop(key)
+        else:
+            self.add(key, value)
+
+    def on_collect(self, res):
+        if res.type in TEAM_TYPES:
+            self.drop((res.x, res.y))
+
+    def drop(self, pos):
+        """O recurso em `pos` sumiu: fecha a tarefa e replaneja a equipe, se houver."""
+        task = self.open.pop(pos, None)
+        if task is not None:
+            self._unrank(task)
+        task = self.active.pop(pos, None)
+        if task is not None and not task.done:
+            task.done = True
+            self.replan(task)
+
+    def _unrank(self, task):
+        key = (-task.utility, task.pos)
+        i = bisect_left(self.ranking, key)
+        if i < len(self.ranking) and self.ranking[i] == key:
+            del self.ranking[i]
+
+    # --------- Equipes ---------
+    def register(self, agent):
+        """Registra um parceiro (deve ter `available_for_task` e `assign_task`)."""
+        self.partners.append(agent)
+
+    def member(self, agent_id):
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            # parceiros se registram antes de receber id; o mapa é feito sob demanda
+            self.agents.update((ag.id, ag) for ag in self.partners)
+            agent = self.agents[agent_id]
+        return agent
+
+    def request(self, leader):
+        """
+        Pedido de tarefa de um líder livre na base. Devolve a tarefa se ele
+        recebeu uma nesta chamada (o plano chega por `assign_task`), senão None.
+        """
+        if leader not in self.waiting:
+            self.waiting.append(leader)
+        if self.last_round != self.env.now:
+            self.last_round = self.env.now
+            self.allocate()
+        return getattr(leader, 'task', None) if leader not in self.waiting else None
+
+    def allocate(self):
+        """Uma rodada: as melhores tarefas abertas para os líderes em espera."""
+        if not self.waiting or not self.open:
+            return
+        inicio = time.perf_counter()
+        free = [ag for ag in self.partners if ag.available_for_task()]
+        served = 0
+        for leader, (_, pos) in zip(self.waiting, self.ranking):
+            task = self.open[pos]
+            if len(free) < task.required - 1:
+                break
+            team = [leader] + free[:task.required - 1]
+            del free[:task.required - 1]
+            self._assign(task, team, (leader.x, leader.y))
+            served += 1
+        # as tarefas atendidas são as primeiras do ranking
+        del self.waiting[:served]
+        del self.ranking[:served]
+        self.rounds += 1
+        self.seconds += time.perf_counter() - inicio
+
+    def _assign(self, task, team, start):
+        del self.open[task.pos]
+        self.active[task.pos] = task
+        task.members = [ag.id for ag in team]
+        for ag in team:
+            self.agents[ag.id] = ag
+        grid = self.home.grid
+        path = find_path(start, task.pos, grid)
+        for ag in team:
+            plan = path.copy() if (ag.x, ag.y) == start else find_path((ag.x, ag.y), task.pos, grid)
+            ag.assign_task(task, plan)
+        self.assigned += 1
+
+    def replan(self, task):
+        """
+        A tarefa da equipe sumiu: a equipe segue para a tarefa aberta de
+        maior valor / (distância do líder + 1), ou volta à base.
+        """
+        team = [self.member(agent_id) for agent_id in task.members]
+        leader = team[0]
+        best, best_key = None, None
+        for candidate in self.open.values():
+            if len(team) < candidate.required:
+                continue
+            distance = abs(candidate.pos[0] - leader.x) + abs(candidate.pos[1] - leader.y)
+            key = (candidate.value / (distance + 1), candidate.pos)
+            if best_key is None or key > best_key:
+                best, best_key = candidate, key
+        if best is not None:
+            self._unrank(best)
+            self._assign(best, team, (leader.x, leader.y))
+            self.replanned += 1
+        else:
+            for ag in team:
+                ag.assign_task(None, None)
+
+    def ready(self, task):
+        """Toda a equipe está na célula da tarefa?"""
+        return all((ag.x, ag.y) == task.pos for ag in map(self.member, task.members))
+
+    def complete(self, task):
+        """A equipe coletou o recurso da tarefa."""
+        task.done = True
+        self.active.pop(task.pos, None)
+        self.completed += 1
+
+    # --------- Estado (utils.snapshot) ---------
+    def state(self):
+        state = {key: getattr(self, key) for key in
+                 ('open', 'active', 'ranking', 'last_round', 'rounds', 'seconds',
+                  'assigned', 'replanned', 'completed')}
+        state['waiting'] = [ag.id for ag in self.waiting]
+        return state
+
+    def load_state(self, state, agents):
+        self.agents = {ag.id: ag for ag in agents}
+        state = dict(state)
+        self.waiting = [self.agents[agent_id] for agent_id in state.pop('waiting')]
+        self.__dict__.update(state)
+
+    def stats(self):
+        return {
+            'rodadas': self.rounds,
+            'tempo_ms': self.seconds * 1000,
+            'equipes': self.assigned,
+            'replanejadas': self.replanned,
+            'concluidas': self.completed,
+            'abertas': len(self.open),
+        }
+
+
+def get_allocator(env, index=None, home=None):
+    """Alocador de tarefas compartilhado pelos agentes do ambiente `env`."""
+    allocator = getattr(env, 'allocator', None)
+    if allocator is None:
+        allocator = env.allocator = TaskAllocator(env, index, home)
+    return allocator
@@ -0,0 +1,84 @@
+# utils/blackboard.py
+
+# Quadro central de conhecimento compartilhado, com entradas versionadas.
+# Quem publica é o BDI; os agentes puxam da base só o que mudou desde a
+# última versão que viram, em vez de receber cópias do dicionário inteiro.
+
+
+class Blackboard:
+    """
+    Entradas chave -> (versão, tópico, valor), com versão global
+    monotônica. Retirar uma entrada publica um valor None (lápide), para
+    que quem sincroniza por delta também apague sua cópia. Os tópicos são
+    os tipos de recurso ('cristal', 'metal', 'estrutura').
+    """
+    def __init__(self):
+        self.version = 0
+        self.entries = {}
+        self.log = []           # chave alterada em cada versão (log[v - 1])
+        self.subscribers = {}   # tópico -> [callback(chave, valor)]
+
+    def publish(self, topic, key, value):
+        self.version += 1
+        self.entries[key] = (self.version, topic, value)
+        self.log.append(key)
+        for callback in self.subscribers.get(topic, ()):
+            callback(key, value)
+        return self.version
+
+    def retract(self, key):
+        """Retira a entrada `key`, se ela existir."""
+        entry = self.entries.get(key)
+        if entry is not None and entry[2] is not None:
+            self.publish(entry[1], key, None)
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None or entry[2] is None:
+            return default
+        return entry[2]
+
+    def subscribe(self, topic, callback):
+        """Registra `callback(chave, valor)` para cada publicação em `topic`."""
+        self.subscribers.setdefault(topic, []).append(callback)
+
+    def changes_since(self, version, topics=None):
+        """
+        Alterações posteriores a `version` como lista de (chave, tópico, valor),
+        só a mais recente de cada chave, e a versão atual. O(alterações).
+        """
+        changes = []
+        for v, key in enumerate(self.log[version:], start=version + 1):
+            entry_version, topic, value = self.entries[key]
+            if entry_version == v and (topics is None or topic in topics):
+                changes.append((key, topic, value))
+        return changes, self.version
+
+
+def get_blackboard(env):
+    """Quadro compartilhado pelos agentes do ambiente `env`."""
+    board = getattr(env, 'blackboard', None)
+    if board is None:
+        board = env.blackboard = Blackboard()
+    return board
+
+
+def pull_updates(board, panel, version, topics=None):
+    """
+    Aplica em `panel` (shared_info) as alterações do quadro desde `version`
+    e devolve a nova versão vista. Entradas retiradas somem do painel.
+    """
+    changes, version = board.changes_since(version, topics)
+    received = {}
+    for key, _, value in changes:
+        if value is None:
+            received.pop(key, None)
+            panel.pop(key, None)
+        else:
+            received[key] = value
+    if received:
+        if hasattr(panel, 'receive'):
+            panel.receive(received)
+        else:
+            panel.update(received)
+    return version
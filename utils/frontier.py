@@ -0,0 +1,132 @@
+# utils/frontier.py
+
+# Exploração por fronteira: o espaço explorado é um bitmap compartilhado
+# pelos exploradores do ambiente, e a fronteira são as células livres
+# ainda não exploradas vizinhas de uma explorada. Cada visita atualiza as
+# duas em O(1); o explorador procura (busca em largura a partir de onde
+# está) a célula de fronteira mais próxima que nenhum outro reservou.
+#
+# Células que o BDI já conhece (publicadas no quadro) contam como
+# exploradas: não vale a pena mandar alguém até lá só para vê-las.
+from collections import deque
+
+import constantes
+from utils.blackboard import get_blackboard
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class FrontierIndex:
+    """
+    `explored`: bytearray de largura * altura (1 = explorada).
+    `frontier`: dict índice da célula -> None, em ordem de descoberta
+    (dict, não set, para não depender de hash na iteração).
+    `claims`: célula reservada -> id do explorador; `goals`, o inverso.
+    """
+    def __init__(self, grid, board=None):
+        self.grid = grid                  # utils.pathfinding.ObstacleMap
+        self.width, self.height = grid.width, grid.height
+        self.explored = bytearray(self.width * self.height)
+        self.frontier = {}
+        self.claims = {}
+        self.goals = {}
+        self.passable_cells = self.width * self.height - len(grid)
+        self.explored_cells = 0
+        if board is not None:
+            for rtype in constantes.RESOURCE_VALUES:
+                board.subscribe(rtype, self.on_board)
+            for key, (_, _, value) in board.entries.items():
+                if value is not None:
+                    self.visit(*key)
+
+    def on_board(self, key, value):
+        if value is not None:
+            self.visit(*key)
+
+    def is_explored(self, x, y):
+        return self.explored[y * self.width + x] == 1
+
+    def visit(self, x, y):
+        """Marca (x, y) como explorada e leva a fronteira para os vizinhos livres."""
+        width = self.width
+        cell = y * width + x
+        if self.explored[cell]:
+            return
+        self.explored[cell] = 1
+        self.explored_cells += 1
+        self.frontier.pop(cell, None)
+        blocked, explored, frontier = self.grid.blocked, self.explored, self.frontier
+        for dx, dy in NEIGHBORS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < self.height:
+                near = ny * width + nx
+                if not explored[near] and not blocked[near]:
+                    frontier[near] = None
+
+    def coverage(self):
+        """Fração das células livres já exploradas."""
+        return self.explored_cells / self.passable_cells if self.passable_cells else 1.0
+
+    def claim(self, start, agent_id):
+        """
+        Reserva para `agent_id` a célula de fronteira livre mais próxima de
+        `start` (em passos, desviando de obstáculos) e devolve o caminho até
+        ela (deque de células, sem `start`). Libera a reserva anterior do
+        mesmo explorador. Devolve None se não há fronteira alcançável.
+        """
+        self.release(agent_id)
+        if not self.frontier:
+            return None
+        width, height = self.width, self.height
+        blocked, frontier, claims = self.grid.blocked, self.frontier, self.claims
+        sx, sy = start
+        origin = sy * width + sx
+        parent = {origin: None}
+        queue = deque([origin])
+        while queue:
+            cell = queue.popleft()
+            if cell in frontier and cell not in claims:
+                break
+            x, y = cell % width, cell // width
+            for dx, dy in NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    near = ny * width + nx
+                    if near not in parent and not blocked[near]:
+                        parent[near] = cell
+                        queue.append(near)
+        else:
+            return None
+        claims[cell] = agent_id
+        self.goals[agent_id] = cell
+        path = deque()
+        while cell != origin:
+            path.appendleft((cell % width, cell // width))
+            cell = parent[cell]
+        return path
+
+    def release(self, agent_id):
+        cell = self.goals.pop(agent_id, None)
+        if cell is not None:
+            self.claims.pop(cell, None)
+
+    def goal(self, agent_id):
+        """Célula reservada por `agent_id` ((x, y)) ou None."""
+        cell = self.goals.get(agent_id)
+        return None if cell is None else (cell % self.width, cell // self.width)
+
+    # --------- Estado (utils.snapshot) ---------
+    def state(self):
+        return {key: getattr(self, key) for key in
+                ('explored', 'frontier', 'claims', 'goals', 'explored_cells')}
+
+    def load_state(self, state):
+        self.__dict__.update(state)
+
+
+def get_frontier(env, grid):
+    """Fronteira de exploração compartilhada pelos agentes do ambiente `env`."""
+    frontier = getattr(env, 'frontier', None)
+    if frontier is None:
+        frontier = env.frontier = FrontierIndex(grid, get_blackboard(env))
+    return frontier
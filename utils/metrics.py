@@ -0,0 +1,169 @@
+# utils/metrics.py
+
+# Registro de métricas de um episódio: contadores por agente pré-alocados,
+# séries por passo (pontuação, itens carregados, tempestade) e log com
+# nível opcional. Desligado, custa uma comparação de inteiros por chamada.
+import csv
+from array import array
+
+import constantes
+
+LOG_OFF = 0     # nada no stdout
+LOG_INFO = 1    # entregas e tempestades
+LOG_DEBUG = 2   # decisões internas dos agentes
+
+RESOURCE_TYPES = list(constantes.RESOURCE_VALUES)
+_TYPE_SLOT = {kind: i for i, kind in enumerate(RESOURCE_TYPES)}
+_VALUES = [constantes.RESOURCE_VALUES[kind] for kind in RESOURCE_TYPES]
+
+
+class MetricsRecorder:
+    """
+    Substitui o antigo registro global de entregas. Cada agente ganha um
+    slot com pontuação e contagem por tipo em vetores planos; `get` mantém
+    o formato {"val", "resources"} (ou 0) de register_delivery.
+    """
+    def __init__(self, log_level=LOG_OFF, series=False, agents=(), capacity=4096):
+        self.log_level = log_level
+        self.series = series
+        self.slots = {}
+        self.names = []
+        self.scores = array('q')
+        self.counts = array('q')        # slot * len(RESOURCE_TYPES) + tipo
+        for name in agents:
+            self.register_agent(name)
+        # Séries por passo, pré-alocadas e dobradas quando enchem
+        self.samples = 0
+        self.ticks = array('q', bytes(8 * capacity))
+        self.score_series = array('q', bytes(8 * capacity))
+        self.carried_series = array('l', bytes(array('l').itemsize * capacity))
+        self.storm_series = array('b', bytes(capacity))
+
+    # --------- Log ---------
+    def log(self, level, msg, *args):
+        """Imprime `msg % args` se `level` estiver habilitado (formatação preguiçosa)."""
+        if level > self.log_level:
+            return
+        print(msg % args if args else msg)
+
+    # --------- Entregas ---------
+    def register_agent(self, agent_id):
+        slot = self.slots.get(agent_id)
+        if slot is None:
+            slot = self.slots[agent_id] = len(self.names)
+            self.names.append(agent_id)
+            self.scores.append(0)
+            self.counts.extend([0] * len(RESOURCE_TYPES))
+        return slot
+
+    def record_delivery(self, agent_id, type_resource):
+        slot = self.slots.get(agent_id)
+        if slot is None:
+            slot = self.register_agent(agent_id)
+        kind = _TYPE_SLOT[type_resource]
+        self.scores[slot] += _VALUES[kind]
+        self.counts[slot * len(RESOURCE_TYPES) + kind] += 1
+        if self.log_level >= LOG_INFO:
+            self.log(LOG_INFO, "[DELIVERY] Agente %s entregou valor %d. Total = %d",
+                     agent_id, _VALUES[kind], self.scores[slot])
+
+    # compatível com DeliveryLedger/register_delivery
+    register = record_delivery
+
+    def summary(self, agent_id):
+        """{"val", "resources"} do agente (vazio se nunca entregou)."""
+        slot = self.slots.get(agent_id)
+        if slot is None:
+            return {"val": 0, "resources": {}}
+        base = slot * len(RESOURCE_TYPES)
+        resources = {
+            kind: self.counts[base + i]
+            for i, kind in enumerate(RESOURCE_TYPES) if self.counts[base + i]
+        }
+        return {"val": self.scores[slot], "resources": resources}
+
+    def get(self, agent_id):
+        """Como o antigo register_delivery(agent_id): dict, ou 0 sem entregas."""
+        data = self.summary(agent_id)
+        return data if data["resources"] else 0
+
+    def total_score(self):
+        return sum(self.scores)
+
+    def reset(self):
+        for i in range(len(self.scores)):
+            self.scores[i] = 0
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.samples = 0
+
+    # --------- Séries por passo ---------
+    def sample(self, tick, carried, storm):
+        if self.samples == len(self.ticks):
+            for series in (self.ticks, self.score_series, self.carried_series, self.storm_series):
+                series.extend(series)  # dobra a capacidade
+        i = self.samples
+        self.ticks[i] = int(tick)
+        self.score_series[i] = sum(self.scores)
+        self.carried_series[i] = carried
+        self.storm_series[i] = 1 if storm else 0
+        self.samples = i + 1
+
+    def sampler(self, env, agents):
+        """Processo SimPy que amostra as séries uma vez por passo."""
+        while True:
+            carried = sum(1 for ag in agents if getattr(ag, 'carrying', None))
+            self.sample(env.now, carried, getattr(env, 'is_storm', False))
+            yield env.timeout(1)
+
+    # --------- Exportação ---------
+    def delivery_rows(self):
+        for slot, name in enumerate(self.names):
+            base = slot * len(RESOURCE_TYPES)
+            yield [name, self.scores[slot]] + list(self.counts[base:base + len(RESOURCE_TYPES)])
+
+    def series_rows(self):
+        for i in range(self.samples):
+            yield [self.ticks[i], self.score_series[i], self.carried_series[i], self.storm_series[i]]
+
+    DELIVERY_COLUMNS = ['agent', 'score'] + RESOURCE_TYPES
+    SERIES_COLUMNS = ['tick', 'score', 'carried', 'storm']
+
+    def export_csv(self, deliveries_path, series_path=None):
+        with open(deliveries_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.DELIVERY_COLUMNS)
+            writer.writerows(self.delivery_rows())
+        if series_path is not None:
+            with open(series_path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.SERIES_COLUMNS)
+                writer.writerows(self.series_rows())
+
+    def export_parquet(self, deliveries_path, series_path=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("export_parquet requer pyarrow (pip install pyarrow)")
+        rows = list(self.delivery_rows())
+        columns = list(zip(*rows)) if rows else [[] for _ in self.DELIVERY_COLUMNS]
+        pq.write_table(pa.table(dict(zip(self.DELIVERY_COLUMNS, map(list, columns)))), deliveries_path)
+        if series_path is not None:
+            n = self.samples
+            pq.write_table(pa.table({
+                'tick': self.ticks[:n].tolist(),
+                'score': self.score_series[:n].tolist(),
+                'carried': self.carried_series[:n].tolist(),
+                'storm': self.storm_series[:n].tolist(),
+            }), series_path)
+
+
+# Registro padrão, usado quando o ambiente não tem um próprio; mantém as
+# mensagens de entrega no stdout como antes
+_default_metrics = MetricsRecorder(log_level=LOG_INFO)
+
+
+def metrics_for(env):
+    """Registro de métricas do ambiente `env` (ou o registro padrão)."""
+    return getattr(env, 'metrics', _default_metrics)
@@ -0,0 +1,83 @@
+# utils/navigation.py
+
+# Serviço de navegação até a base, compartilhado por todos os agentes
+from collections import deque
+from utils.pathfinding import as_obstacle_map
+
+_DIRS = [(1,0),(-1,0),(0,1),(0,-1)]
+
+
+class HomeField:
+    """
+    Campo de distâncias (BFS) calculado uma única vez a partir da base.
+    Como a base não se move, qualquer consulta "próximo passo para casa"
+    é O(1). Deve ser recalculado (`set_obstacles`) só quando os obstáculos
+    mudam. Células guardadas em vetores planos, índice = y * width + x.
+    """
+    def __init__(self, base, obstacles):
+        self.base = base
+        self.set_obstacles(obstacles)
+
+    def set_obstacles(self, obstacles):
+        """Recalcula o campo para um novo conjunto de obstáculos (lista ou ObstacleMap)."""
+        self.grid = as_obstacle_map(obstacles)
+        self.width, self.height = self.grid.width, self.grid.height
+        self.rebuild()
+
+    def rebuild(self):
+        width, height = self.width, self.height
+        blocked = self.grid.blocked
+        size = width * height
+        dist = [-1] * size
+        next_index = [-1] * size
+        bx, by = self.base
+        start = by * width + bx
+        dist[start] = 0
+        queue = deque([(bx, by)])
+        while queue:
+            cx, cy = queue.popleft()
+            ci = cy * width + cx
+            d = dist[ci] + 1
+            for dx, dy in _DIRS:
+                nx, ny = cx + dx, cy + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    ni = ny * width + nx
+                    if dist[ni] < 0 and not blocked[ni]:
+                        dist[ni] = d
+                        next_index[ni] = ci  # vizinho um passo mais perto da base
+                        queue.append((nx, ny))
+        self.dist = dist
+        self.next_index = next_index
+
+    def distance(self, pos):
+        """Passos até a base, ou None se não houver caminho."""
+        d = self.dist[pos[1] * self.width + pos[0]]
+        return d if d >= 0 else None
+
+    def next_step(self, pos):
+        """Próxima célula no caminho mais curto até a base (None na base ou sem caminho)."""
+        ni = self.next_index[pos[1] * self.width + pos[0]]
+        if ni < 0:
+            return None
+        return (ni % self.width, ni // self.width)
+
+    def path_home(self, pos):
+        """Caminho completo até a base (sem a posição atual), no formato de find_path."""
+        width = self.width
+        path = deque()
+        ni = self.next_index[pos[1] * width + pos[0]]
+        while ni >= 0:
+            path.append((ni % width, ni // width))
+            ni = self.next_index[ni]
+        return path
+
+
+def get_home_field(env, base, obstacles):
+    """Campo da base compartilhado pelos agentes do ambiente `env`."""
+    fields = getattr(env, 'home_fields', None)
+    if fields is None:
+        fields = env.home_fields = {}
+    field = fields.get(base)
+    if field is None:
+        field = fields[base] = HomeField(base, obstacles)
+    return field
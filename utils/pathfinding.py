@@ -0,0 +1,331 @@
+# utils/pathfinding.py
+
+# Busca de caminhos compartilhada pelos agentes: A* (heurística Manhattan)
+# sobre um bitmap de obstáculos, com busca por pontos de salto opcional.
+import heapq
+from array import array
+from collections import deque
+from itertools import compress
+import constantes
+
+_DIRS = [(1,0),(-1,0),(0,1),(0,-1)]
+
+
+class ObstacleMap:
+    """
+    Bitmap de obstáculos (1 byte por célula, índice = y * width + x).
+    Substitui a lista de Obstacle nas consultas "esta célula está livre?".
+    """
+    def __init__(self, width=None, height=None, blocked=None):
+        self.width = constantes.GRID_WIDTH if width is None else width
+        self.height = constantes.GRID_HEIGHT if height is None else height
+        if blocked is None:
+            blocked = bytearray(self.width * self.height)
+        self.blocked = blocked
+
+    @classmethod
+    def from_obstacles(cls, obstacles, width=None, height=None):
+        grid = cls(width, height)
+        for o in obstacles:
+            grid.blocked[o.y * grid.width + o.x] = 1
+        return grid
+
+    def is_blocked(self, x, y):
+        return self.blocked[y * self.width + x] != 0
+
+    def passable(self, x, y):
+        """Dentro da grade e sem obstáculo."""
+        return (0 <= x < self.width and 0 <= y < self.height and
+                not self.blocked[y * self.width + x])
+
+    def cells(self):
+        """Células bloqueadas (x, y), em ordem de índice."""
+        width = self.width
+        for i in compress(range(len(self.blocked)), self.blocked):
+            yield i % width, i // width
+
+    def __len__(self):
+        return sum(self.blocked)
+
+
+def as_obstacle_map(obstacles):
+    """Aceita um ObstacleMap ou uma lista de Obstacle."""
+    if isinstance(obstacles, ObstacleMap):
+        return obstacles
+    return ObstacleMap.from_obstacles(obstacles)
+
+
+def get_obstacle_map(env, obstacles):
+    """Bitmap de obstáculos compartilhado pelos agentes do ambiente `env`."""
+    grid = getattr(env, 'obstacle_map', None)
+    if grid is None:
+        grid = env.obstacle_map = as_obstacle_map(obstacles)
+    return grid
+
+
+class SearchStats:
+    """Contadores de uma busca (para benchmarks)."""
+    def __init__(self):
+        self.expansions = 0
+
+
+def find_path(start, goal, grid, jps=False, stats=None):
+    """
+    Caminho mais curto de `start` até `goal` em 4-vizinhança, como deque de
+    células (sem `start`, com `goal`). Deque vazio se já está no objetivo
+    ou se não há caminho. Com `jps`, a primeira busca no bitmap monta as
+    tabelas de salto (O(células)); compensa quando o mesmo bitmap atende
+    muitas buscas, como o compartilhado pelos agentes.
+    """
+    if start == goal:
+        return deque()
+    if jps:
+        return _jump_point_search(start, goal, grid, stats)
+    return _astar(start, goal, grid, stats)
+
+
+def _reconstruct(parent, node, width):
+    path = deque()
+    while node is not None:
+        path.appendleft((node % width, node // width))
+        node = parent[node]
+    path.popleft()  # remove a origem
+    return path
+
+
+def _astar(start, goal, grid, stats):
+    width, height, blocked = grid.width, grid.height, grid.blocked
+    gx, gy = goal
+    si = start[1] * width + start[0]
+    gi = gy * width + gx
+    if blocked[gi]:
+        return deque()
+    g = {si: 0}
+    parent = {si: None}
+    h0 = abs(start[0] - gx) + abs(start[1] - gy)
+    heap = [(h0, h0, si)]
+    closed = set()
+    expansions = 0
+    while heap:
+        _, _, ci = heapq.heappop(heap)
+        if ci == gi:
+            break
+        if ci in closed:
+            continue
+        closed.add(ci)
+        expansions += 1
+        cg = g[ci] + 1
+        cx, cy = ci % width, ci // width
+        for dx, dy in _DIRS:
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                ni = ny * width + nx
+                if not blocked[ni] and cg < g.get(ni, cg + 1):
+                    g[ni] = cg
+                    parent[ni] = ci
+                    h = abs(nx - gx) + abs(ny - gy)
+                    heapq.heappush(heap, (cg + h, h, ni))
+    if stats is not None:
+        stats.expansions += expansions
+    if gi not in parent:
+        return deque()
+    return _reconstruct(parent, gi, width)
+
+
+# --------- Busca por pontos de salto (4-vizinhança) ---------
+# Ordem canônica: caminhos preferem andar na vertical antes de virar para a
+# horizontal. Assim, em movimento vertical as viradas horizontais são
+# naturais, e em movimento horizontal só há virada vertical "forçada"
+# quando a célula equivalente na coluna anterior está bloqueada.
+#
+# Varrer célula a célula a cada salto custa mais que o próprio A* (cada
+# passo vertical faria duas varreduras horizontais). Como o bitmap não
+# muda, o ponto de salto seguinte de cada célula em cada direção é
+# calculado uma vez (JumpTables); cada salto vira uma consulta O(1), mais
+# o teste de o objetivo estar no caminho.
+
+class JumpTables:
+    """
+    Saltos pré-calculados de um ObstacleMap (índice = y * width + x):
+    `right`/`left`: próxima célula na linha com vizinho forçado (-1 se
+    antes vem parede ou a borda); `down`/`up`: próxima célula na coluna de
+    onde um salto horizontal encontra ponto de salto; `row_run`/`col_run`:
+    id do trecho livre horizontal/vertical da célula (-1 se bloqueada),
+    para saber em O(1) se o objetivo está ao alcance em linha reta.
+    """
+    def __init__(self, grid):
+        width, height, blocked = grid.width, grid.height, grid.blocked
+        size = width * height
+        self.right = right = array('i', bytes(4 * size))
+        self.left = left = array('i', bytes(4 * size))
+        self.down = down = array('i', bytes(4 * size))
+        self.up = up = array('i', bytes(4 * size))
+        self.row_run = row_run = array('i', b'\xff' * (4 * size))
+        self.col_run = col_run = array('i', b'\xff' * (4 * size))
+
+        def forced(x, y, dx):
+            i = y * width + x
+            for dy in (width, -width):
+                if 0 <= i + dy < size and not blocked[i + dy] and blocked[i + dy - dx]:
+                    return True
+            return False
+
+        run = 0
+        for y in range(height):
+            row = y * width
+            nxt = -1
+            for x in range(width - 1, -1, -1):
+                i = row + x
+                right[i] = nxt
+                if blocked[i]:
+                    nxt = -1
+                elif x > 0 and forced(x, y, 1):
+                    nxt = i
+            nxt = -1
+            for x in range(width):
+                i = row + x
+                left[i] = nxt
+                if blocked[i]:
+                    nxt = -1
+                    run += 1
+                else:
+                    row_run[i] = run
+                    if x < width - 1 and forced(x, y, -1):
+                        nxt = i
+            run += 1
+
+        for x in range(width):
+            nxt = -1
+            for i in range(x + (height - 1) * width, x - 1, -width):
+                down[i] = nxt
+                if blocked[i]:
+                    nxt = -1
+                elif right[i] >= 0 or left[i] >= 0:
+                    nxt = i
+            nxt = -1
+            for i in range(x, size, width):
+                up[i] = nxt
+                if blocked[i]:
+                    nxt = -1
+                    run += 1
+                else:
+                    col_run[i] = run
+                    if right[i] >= 0 or left[i] >= 0:
+                        nxt = i
+            run += 1
+
+
+def jump_tables(grid):
+    """Tabelas de salto do bitmap, calculadas na primeira busca JPS."""
+    tables = getattr(grid, 'jumps', None)
+    if tables is None:
+        tables = grid.jumps = JumpTables(grid)
+    return tables
+
+
+def _jump_horizontal(x, y, dx, goal, grid, tables):
+    width = grid.width
+    i = y * width + x
+    stop = (tables.right if dx > 0 else tables.left)[i]
+    gx, gy = goal
+    # O objetivo está adiante no mesmo trecho livre, antes do próximo ponto?
+    if gy == y and (gx - x) * dx > 0 and tables.row_run[gy * width + gx] == tables.row_run[i]:
+        if stop < 0 or (stop - i) * dx >= (gx - x) * dx:
+            return goal
+    if stop < 0:
+        return None
+    return stop - y * width, y
+
+
+def _jump_vertical(x, y, dy, goal, grid, tables):
+    width = grid.width
+    i = y * width + x
+    stop = (tables.down if dy > 0 else tables.up)[i]
+    gx, gy = goal
+    # Chega à linha do objetivo com ele ao alcance na horizontal?
+    if (gy - y) * dy > 0:
+        cell = gy * width + x
+        if (tables.col_run[cell] == tables.col_run[i] and
+                tables.row_run[cell] == tables.row_run[gy * width + gx]):
+            if stop < 0 or (stop // width - y) * dy >= (gy - y) * dy:
+                return x, gy
+    if stop < 0:
+        return None
+    return x, stop // width
+
+
+def _jps_directions(x, y, direction, grid):
+    """Direções a explorar a partir de um ponto de salto."""
+    if direction is None:
+        return _DIRS
+    dx, dy = direction
+    if dy:
+        return [(0, dy), (1, 0), (-1, 0)]
+    dirs = [(dx, 0)]
+    for vy in (1, -1):
+        if grid.passable(x, y + vy) and not grid.passable(x - dx, y + vy):
+            dirs.append((0, vy))
+    return dirs
+
+
+def _jump_point_search(start, goal, grid, stats):
+    width = grid.width
+    gx, gy = goal
+    si = start[1] * width + start[0]
+    gi = gy * width + gx
+    if grid.blocked[gi]:
+        return deque()
+    tables = jump_tables(grid)
+    g = {si: 0}
+    parent = {si: None}
+    arrival = {si: None}
+    h0 = abs(start[0] - gx) + abs(start[1] - gy)
+    heap = [(h0, h0, si)]
+    closed = set()
+    expansions = 0
+    while heap:
+        _, _, ci = heapq.heappop(heap)
+        if ci == gi:
+            break
+        if ci in closed:
+            continue
+        closed.add(ci)
+        expansions += 1
+        cx, cy = ci % width, ci // width
+        for dx, dy in _jps_directions(cx, cy, arrival[ci], grid):
+            if dx:
+                point = _jump_horizontal(cx, cy, dx, goal, grid, tables)
+            else:
+                point = _jump_vertical(cx, cy, dy, goal, grid, tables)
+            if point is None:
+                continue
+            nx, ny = point
+            ni = ny * width + nx
+            ng = g[ci] + abs(nx - cx) + abs(ny - cy)
+            if ng < g.get(ni, ng + 1):
+                g[ni] = ng
+                parent[ni] = ci
+                arrival[ni] = (dx, dy)
+                h = abs(nx - gx) + abs(ny - gy)
+                heapq.heappush(heap, (ng + h, h, ni))
+    if stats is not None:
+        stats.expansions += expansions
+    if gi not in parent:
+        return deque()
+
+    # Liga os pontos de salto com segmentos retos
+    points = []
+    node = gi
+    while node is not None:
+        points.append((node % width, node // width))
+        node = parent[node]
+    points.reverse()
+    path = deque()
+    for (ax, ay), (bx, by) in zip(points, points[1:]):
+        sx = (bx > ax) - (bx < ax)
+        sy = (by > ay) - (by < ay)
+        while (ax, ay) != (bx, by):
+            ax += sx
+            ay += sy
+            path.append((ax, ay))
+    return path
@@ -0,0 +1,183 @@
+# utils/perception.py
+
+# Percepção dos agentes: consultas espaciais sobre os recursos ainda não
+# coletados ("tipo T num raio r", "k mais próximos", "melhor alvo por
+# valor/distância"). Os recursos ficam em baldes de BUCKET x BUCKET
+# células, um conjunto de baldes por tipo; as consultas visitam só os
+# baldes ao redor do ponto, em anéis, e param assim que nenhum balde mais
+# distante pode melhorar a resposta. Coletas saem do índice pela
+# assinatura do ResourceIndex.
+#
+# Distâncias em células, Manhattan por padrão (os agentes andam na
+# vizinhança-4), sem considerar obstáculos.
+import heapq
+
+import constantes
+
+BUCKET = 8
+
+
+def _distance(metric, dx, dy):
+    if metric == 'manhattan':
+        return abs(dx) + abs(dy)
+    return (dx * dx + dy * dy) ** 0.5
+
+
+class PerceptionGrid:
+    """
+    Baldes tipo -> [dict id -> Resource] (dicts, não sets, para que a ordem
+    dos resultados não dependa de endereços de memória). Empates de
+    distância são desfeitos pelo id do recurso.
+    """
+    def __init__(self, index, width=None, height=None, bucket=BUCKET):
+        self.index = index
+        self.width = constantes.GRID_WIDTH if width is None else width
+        self.height = constantes.GRID_HEIGHT if height is None else height
+        self.bucket = bucket
+        self.cols = -(-self.width // bucket)
+        self.rows = -(-self.height // bucket)
+        self.buckets = {kind: [None] * (self.cols * self.rows) for kind in constantes.RESOURCE_VALUES}
+        for res in index.resources:
+            if not res.collected:
+                self.add(res)
+        index.subscribe(self.discard)
+
+    def _slot(self, x, y):
+        return (y // self.bucket) * self.cols + x // self.bucket
+
+    def add(self, res):
+        slots = self.buckets[res.type]
+        slot = self._slot(res.x, res.y)
+        if slots[slot] is None:
+            slots[slot] = {}
+        slots[slot][res.id] = res
+
+    def discard(self, res):
+        found = self.buckets[res.type][self._slot(res.x, res.y)]
+        if found is not None:
+            found.pop(res.id, None)
+
+    def _kinds(self, type):
+        if type is None:
+            return list(self.buckets.values())
+        if isinstance(type, str):
+            return [self.buckets[type]]
+        return [self.buckets[kind] for kind in type]
+
+    def _ring(self, cx, cy, d):
+        """Baldes (índices) à distância de Chebyshev `d` do balde (cx, cy)."""
+        cols, rows = self.cols, self.rows
+        if d == 0:
+            return [cy * cols + cx]
+        slots = []
+        for by in range(max(0, cy - d), min(rows, cy + d + 1)):
+            if by == cy - d or by == cy + d:
+                slots.extend(by * cols + bx for bx in range(max(0, cx - d), min(cols, cx + d + 1)))
+            else:
+                if cx - d >= 0:
+                    slots.append(by * cols + cx - d)
+                if cx + d < cols:
+                    slots.append(by * cols + cx + d)
+        return slots
+
+    def _rings(self, x, y):
+        """(limite inferior da distância, baldes) por anel, do centro para fora."""
+        bucket = self.bucket
+        cx, cy = x // bucket, y // bucket
+        for d in range(max(cx + 1, self.cols - cx, cy + 1, self.rows - cy)):
+            yield (d - 1) * bucket + 1 if d else 0, self._ring(cx, cy, d)
+
+    def within_radius(self, x, y, r, type=None, metric='manhattan'):
+        """
+        Recursos não coletados a até `r` células de (x, y), do tipo `type`
+        (um nome, uma sequência de nomes ou None = todos), em ordem de
+        distância. Só os baldes que cruzam a janela (2r+1)x(2r+1) são vistos.
+        """
+        bucket, cols = self.bucket, self.cols
+        bx0, bx1 = max(0, (x - r) // bucket), min(cols - 1, (x + r) // bucket)
+        by0, by1 = max(0, (y - r) // bucket), min(self.rows - 1, (y + r) // bucket)
+        found = []
+        for slots in self._kinds(type):
+            for by in range(by0, by1 + 1):
+                for slot in range(by * cols + bx0, by * cols + bx1 + 1):
+                    for res in (slots[slot] or {}).values():
+                        d = _distance(metric, res.x - x, res.y - y)
+                        if d <= r and not res.collected:
+                            found.append((d, res.id, res))
+        found.sort()
+        return [res for _, _, res in found]
+
+    def k_nearest(self, x, y, k, type=None, max_radius=None, metric='manhattan'):
+        """Os `k` recursos não coletados mais próximos de (x, y), do mais perto ao mais longe."""
+        kinds = self._kinds(type)
+        best = []   # heap de (-distância, -id, recurso): o pior no topo
+        for bound, ring in self._rings(x, y):
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if max_radius is not None and bound > max_radius:
+                break
+            for slots in kinds:
+                for slot in ring:
+                    for res in (slots[slot] or {}).values():
+                        d = _distance(metric, res.x - x, res.y - y)
+                        if res.collected or (max_radius is not None and d > max_radius):
+                            continue
+                        entry = (-d, -res.id, res)
+                        if len(best) < k:
+                            heapq.heappush(best, entry)
+                        elif entry[:2] > best[0][:2]:
+                            heapq.heapreplace(best, entry)
+        return [res for _, _, res in sorted(best, key=lambda e: (-e[0], -e[1]))]
+
+    def nearest(self, x, y, type=None, max_radius=None, metric='manhattan'):
+        found = self.k_nearest(x, y, 1, type, max_radius, metric)
+        return found[0] if found else None
+
+    def best_target(self, x, y, type=None, max_radius=None, exclude=(), metric='manhattan'):
+        """
+        Recurso não coletado de maior utilidade valor / (distância + 1),
+        ignorando as posições em `exclude`. A busca para no primeiro anel em
+        que nem o tipo mais valioso superaria o melhor já encontrado.
+        """
+        kinds = [kind for kind in constantes.RESOURCE_VALUES
+                 if type is None or kind == type or (not isinstance(type, str) and kind in type)]
+        top_value = max(constantes.RESOURCE_VALUES[kind] for kind in kinds)
+        best, best_key = None, None
+        for bound, ring in self._rings(x, y):
+            if best is not None and top_value / (bound + 1) < best_key[0]:
+                break
+            if max_radius is not None and bound > max_radius:
+                break
+            for kind in kinds:
+                slots = self.buckets[kind]
+                for slot in ring:
+                    for res in (slots[slot] or {}).values():
+                        d = _distance(metric, res.x - x, res.y - y)
+                        if (res.collected or (max_radius is not None and d > max_radius)
+                                or (res.x, res.y) in exclude):
+                            continue
+                        key = (res.value / (d + 1), -res.id)
+                        if best_key is None or key > best_key:
+                            best, best_key = res, key
+        return best
+
+
+def get_perception(env, index):
+    """Índice de percepção compartilhado pelos agentes do ambiente `env`."""
+    perception = getattr(env, 'perception', None)
+    if perception is None or perception.index is not index:
+        perception = env.perception = PerceptionGrid(index)
+    return perception
+
+
+def step_towards(agent, goal):
+    """
+    Um passo de `agent` em direção a `goal` (primeiro no eixo x, depois no
+    y), se a célula estiver livre. Devolve True se o agente andou.
+    """
+    gx, gy = goal
+    for dx, dy in (((gx > agent.x) - (gx < agent.x), 0), (0, (gy > agent.y) - (gy < agent.y))):
+        if (dx or dy) and agent.obstacle_map.passable(agent.x + dx, agent.y + dy):
+            agent.x, agent.y = agent.x + dx, agent.y + dy
+            return True
+    return False
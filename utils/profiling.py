@@ -0,0 +1,213 @@
+# utils/profiling.py
+
+# Perfil de um episódio por processo SimPy e por função. O
+# ProfiledEnvironment embrulha cada gerador passado a `process()` e mede
+# cada retomada (send/throw), então o tempo fica atribuído ao agente (ou ao
+# controlador de tempestade) cujo `run()` o gastou. Funções quentes
+# (find_path, atualização/validação de crenças, desenho) são medidas por
+# wrappers instalados nas instâncias, dentro do processo que as chamou.
+#
+# O custo é de duas leituras de relógio por retomada ou chamada medida;
+# sem a opção 'profile' da config nada disso é instalado.
+from time import perf_counter
+
+import simpy
+
+# Métodos de agentes medidos por `instrument`: nome do método -> rótulo
+PROFILED_METHODS = {
+    'find_path': 'find_path',
+    'validate_beliefs': 'validate_beliefs',
+    'update_beliefs_from_agents': 'update_beliefs',
+}
+ROOT = 'episodio'
+OUTSIDE = 'fora_dos_processos'   # chamadas feitas fora de um processo (ex.: desenho)
+
+
+class _TimedGenerator:
+    """
+    Gerador embrulhado: repassa send/throw/close ao original e soma o tempo
+    de cada retomada em `stat` ([retomadas, segundos, maior retomada]).
+    Atributos do gerador (gi_frame, gi_yieldfrom, __name__...) continuam
+    acessíveis pelo wrapper.
+    """
+    __slots__ = ('profiler', 'generator', 'stat', 'owner')
+
+    def __init__(self, profiler, generator):
+        self.profiler = profiler
+        self.generator = generator
+        self.stat = [0, 0.0, 0.0]
+        frame = generator.gi_frame
+        self.owner = frame.f_locals.get('self') if frame is not None else None
+
+    def send(self, value):
+        # Caminho quente (uma vez por evento): tudo em linha
+        profiler = self.profiler
+        outer = profiler.current
+        profiler.current = self
+        inicio = perf_counter()
+        try:
+            return self.generator.send(value)
+        finally:
+            elapsed = perf_counter() - inicio
+            stat = self.stat
+            stat[0] += 1
+            stat[1] += elapsed
+            if elapsed > stat[2]:
+                stat[2] = elapsed
+            profiler.current = outer
+
+    def throw(self, exc):
+        profiler = self.profiler
+        outer = profiler.current
+        profiler.current = self
+        inicio = perf_counter()
+        try:
+            return self.generator.throw(exc)
+        finally:
+            elapsed = perf_counter() - inicio
+            self.stat[0] += 1
+            self.stat[1] += elapsed
+            profiler.current = outer
+
+    def close(self):
+        return self.generator.close()
+
+    def __getattr__(self, name):
+        return getattr(self.generator, name)
+
+    def label(self):
+        owner = self.owner
+        name = getattr(owner, 'name', None)
+        if name is None:
+            return self.generator.__name__
+        agent_id = getattr(owner, 'id', None)
+        return name if agent_id is None else f"{name}#{agent_id}"
+
+
+class Profiler:
+    """
+    Tempos acumulados por processo (`processes`) e por função dentro de cada
+    processo (`calls`: (processo ou None, rótulo) -> [chamadas, segundos]).
+    """
+    def __init__(self):
+        self.processes = []
+        self.calls = {}
+        self.current = None
+        self.started = perf_counter()
+
+    def watch(self, generator):
+        timed = _TimedGenerator(self, generator)
+        self.processes.append(timed)
+        return timed
+
+    def wrap(self, fn, label):
+        """Versão de `fn` que soma chamadas e tempo em `label`."""
+        calls = self.calls
+
+        def profiled(*args, **kwargs):
+            key = (self.current, label)
+            inicio = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stat = calls.get(key)
+                if stat is None:
+                    stat = calls[key] = [0, 0.0]
+                stat[0] += 1
+                stat[1] += perf_counter() - inicio
+        profiled.__wrapped__ = fn
+        return profiled
+
+    def instrument(self, obj, methods=None):
+        """Troca, só nesta instância, os métodos de `methods` (nome -> rótulo) por versões medidas."""
+        for name, label in (methods or PROFILED_METHODS).items():
+            method = getattr(obj, name, None)
+            if method is not None and not hasattr(method, '__wrapped__'):
+                setattr(obj, name, self.wrap(method, label))
+
+    def reset(self):
+        for timed in self.processes:
+            timed.stat = [0, 0.0, 0.0]
+        self.calls.clear()
+        self.started = perf_counter()
+
+    # --------- Relatórios ---------
+    def rows(self):
+        """
+        Linhas do relatório, da mais cara para a mais barata: dicts com
+        nome, tipo ('processo' ou 'funcao'), chamadas, total_ms, medio_us,
+        max_us (processos) e fracao do tempo total dos processos.
+        """
+        total = sum(timed.stat[1] for timed in self.processes) or 1.0
+        rows = []
+        for timed in self.processes:
+            count, seconds, longest = timed.stat
+            if count:
+                rows.append({'nome': timed.label(), 'tipo': 'processo', 'chamadas': count,
+                             'total_ms': seconds * 1000, 'medio_us': seconds / count * 1e6,
+                             'max_us': longest * 1e6, 'fracao': seconds / total})
+        by_label = {}
+        for (_, label), (count, seconds) in self.calls.items():
+            acc = by_label.setdefault(label, [0, 0.0])
+            acc[0] += count
+            acc[1] += seconds
+        for label, (count, seconds) in by_label.items():
+            rows.append({'nome': label, 'tipo': 'funcao', 'chamadas': count,
+                         'total_ms': seconds * 1000, 'medio_us': seconds / count * 1e6,
+                         'max_us': None, 'fracao': seconds / total})
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def summary(self, limit=None):
+        """Tabela de texto com `rows()` (as `limit` primeiras linhas)."""
+        wall = perf_counter() - self.started
+        lines = [f"{'nome':<28} {'tipo':<8} {'chamadas':>10} {'total ms':>10} "
+                 f"{'médio µs':>10} {'máx µs':>10} {'%':>6}"]
+        for row in self.rows()[:limit]:
+            longest = '' if row['max_us'] is None else f"{row['max_us']:.1f}"
+            lines.append(f"{row['nome']:<28} {row['tipo']:<8} {row['chamadas']:>10} "
+                         f"{row['total_ms']:>10.1f} {row['medio_us']:>10.1f} {longest:>10} "
+                         f"{row['fracao']:>6.1%}")
+        lines.append(f"(tempo de parede desde o início do perfil: {wall:.2f}s)")
+        return "\n".join(lines)
+
+    def collapsed(self):
+        """
+        Pilhas no formato "collapsed" (uma por linha, quadros separados por
+        ';' e o peso em µs), lido por flamegraph.pl, speedscope e afins. O
+        tempo próprio do processo é o total menos o das funções medidas.
+        """
+        children = {}
+        for (timed, label), (_, seconds) in self.calls.items():
+            children.setdefault(timed, []).append((label, seconds))
+        lines = []
+        for timed in self.processes:
+            seconds = timed.stat[1]
+            stack = f"{ROOT};{timed.label()}"
+            for label, child in children.get(timed, ()):
+                seconds -= child
+                lines.append(f"{stack};{label} {int(child * 1e6)}")
+            if timed.stat[0]:
+                lines.append(f"{stack} {max(0, int(seconds * 1e6))}")
+        for label, seconds in children.get(None, ()):
+            lines.append(f"{ROOT};{OUTSIDE};{label} {int(seconds * 1e6)}")
+        return "\n".join(line for line in lines if not line.endswith(' 0'))
+
+    def export_collapsed(self, path):
+        with open(path, 'w') as f:
+            f.write(self.collapsed() + "\n")
+
+
+class ProfiledEnvironment(simpy.Environment):
+    """simpy.Environment cujos processos são medidos por `self.profiler`."""
+    def __init__(self, initial_time=0, profiler=None):
+        super().__init__(initial_time)
+        self.profiler = profiler or Profiler()
+
+    def process(self, generator):
+        return super().process(self.profiler.watch(generator))
+
+
+def get_profiler(env):
+    """Profiler do ambiente, ou None se o episódio não está sendo medido."""
+    return getattr(env, 'profiler', None)
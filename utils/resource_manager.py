@@ -1,36 +1,25 @@
 # utils/resource_manager.py
 
-# Módulo para registrar entregas de recursos pelos agentes
-import constantes
-_deliveries = {}
+# Módulo para registrar entregas de recursos pelos agentes. O registro em si
+# agora é o utils.metrics.MetricsRecorder; este módulo mantém a interface
+# antiga (register_delivery/ledger_for) para quem ainda a usa.
+from utils.metrics import MetricsRecorder, metrics_for, _default_metrics
 
+# Nome antigo do registro de entregas
+DeliveryLedger = MetricsRecorder
+_default_ledger = _default_metrics
 
-def register_delivery(agent_id, type_resource = None):
 
-    # Determina valor do recurso
-    if type_resource != None:
-        if agent_id not in _deliveries:
-            _deliveries[agent_id] = {}
-            _deliveries[agent_id]["val"] = 0
-            _deliveries[agent_id]["resources"] = {}
-            _deliveries[agent_id]["resources"][type_resource] = 1
-            _deliveries[agent_id]["val"] += constantes.RESOURCE_VALUES[type_resource]
-
-        else:
-            if type_resource not in _deliveries[agent_id]["resources"]:
-                _deliveries[agent_id]["resources"][type_resource] = 1
-                _deliveries[agent_id]["val"] += constantes.RESOURCE_VALUES[type_resource]
+def ledger_for(env):
+    """Registro de entregas do ambiente `env` (ou o registro padrão)."""
+    return metrics_for(env)
 
-            else:
-                _deliveries[agent_id]["resources"][type_resource] += 1
-                _deliveries[agent_id]["val"] += constantes.RESOURCE_VALUES[type_resource]
 
+def register_delivery(agent_id, type_resource = None, ledger = None):
+    if ledger is None:
+        ledger = _default_ledger
 
-            #NAO TA SOMANDO ;-;
-
-        print(f"[DELIVERY] Agente {agent_id} entregou valor {constantes.RESOURCE_VALUES[type_resource]}. Total = {_deliveries[agent_id]["val"]}")
-    
-    elif agent_id in _deliveries:
-        return _deliveries[agent_id] #voU RETtorna isso aqui Retorno uma String
+    if type_resource != None:
+        ledger.record_delivery(agent_id, type_resource)
     else:
-        return 0
+        return ledger.get(agent_id)
@@ -0,0 +1,264 @@
+# utils/scenario.py
+
+# Gerador de cenários grandes: sorteio de células sem reposição em O(k) e
+# terreno procedural (montanhas por ruído, rios) como bitmap de obstáculos,
+# com garantia de que toda célula livre alcança a base.
+#
+# O sorteio funciona em Python puro (numpy só acelera sorteios grandes); o
+# terreno requer numpy e usa scipy.ndimage, se houver, para rotular regiões.
+import math
+import random
+from bisect import bisect_right
+from itertools import compress
+
+import constantes
+from utils.pathfinding import ObstacleMap
+
+try:
+    import numpy as np
+except ImportError:  # só o terreno depende de numpy
+    np = None
+try:
+    from scipy import ndimage
+except ImportError:  # rotulação por faixas, abaixo
+    ndimage = None
+
+NUMPY_SAMPLE = 4096     # sorteios a partir deste tamanho usam numpy (se houver)
+
+
+# --------- Sorteio de células ---------
+def base_cells(width, height, base=None, size=None):
+    """Índices (y * width + x) do quadrado da base, recortado na grade."""
+    bx, by = (width // 2, height // 2) if base is None else base
+    half = (constantes.BASE_SIZE if size is None else size) // 2
+    return [y * width + x
+            for y in range(max(0, by - half), min(height, by + half + 1))
+            for x in range(max(0, bx - half), min(width, bx + half + 1))]
+
+
+def excluded_cells(width, height, base=None, obstacles=None):
+    """Células que não recebem recursos: o quadrado da base e os obstáculos."""
+    excluded = set(base_cells(width, height, base))
+    if obstacles is not None:
+        blocked = getattr(obstacles, 'blocked', None)
+        if blocked is not None:
+            excluded.update(compress(range(len(blocked)), blocked))
+        else:
+            excluded.update(o.y * width + o.x for o in obstacles)
+    return excluded
+
+
+def sample_cells(k, width, height, excluded=(), rng=random):
+    """
+    `k` células distintas (índices y * width + x), sorteadas uniformemente
+    entre as que não estão em `excluded`. O sorteio é feito sobre os
+    índices das células livres (0 .. livres-1) e cada um é levado à célula
+    real pulando as excluídas anteriores (busca binária): O(k log m) para
+    m exclusões, sem rejeição, mesmo com a grade quase cheia.
+
+    A partir de NUMPY_SAMPLE células, se houver numpy, o sorteio é feito
+    por um gerador numpy semeado por `rng` (mesma semente, mesmo cenário,
+    mas diferente do sorteio em Python puro); abaixo disso o resultado não
+    depende de numpy estar instalado.
+    """
+    excluded = sorted(excluded)
+    free = width * height - len(excluded)
+    if k > free:
+        raise ValueError(f"{k} recursos não cabem nas {free} células livres")
+    if np is not None and k >= NUMPY_SAMPLE:
+        picks = np.random.default_rng(rng.getrandbits(64)).choice(free, k, replace=False)
+        if excluded:
+            shift = np.array(excluded) - np.arange(len(excluded))
+            picks += np.searchsorted(shift, picks, side='right')
+        return picks.tolist()
+    picks = rng.sample(range(free), k)
+    if not excluded:
+        return picks
+    # shift[i] = quantas células livres vêm antes da i-ésima excluída
+    shift = [cell - i for i, cell in enumerate(excluded)]
+    return [j + bisect_right(shift, j) for j in picks]
+
+
+# --------- Terreno ---------
+def _require_numpy():
+    if np is None:
+        raise ImportError("utils.scenario: o terreno procedural requer numpy (pip install numpy)")
+
+
+def value_noise(width, height, scale, rng=random, octaves=3):
+    """
+    Ruído de valor em [0, 1): grades aleatórias cada vez mais finas,
+    interpoladas (smoothstep) e somadas com peso 1/2 por oitava. Os
+    valores da grade vêm de `rng`, então o terreno segue a semente.
+    """
+    _require_numpy()
+    total = np.zeros((height, width))
+    amplitude, norm = 1.0, 0.0
+    for octave in range(octaves):
+        step = max(1.0, scale / 2 ** octave)
+        gw, gh = int(width / step) + 2, int(height / step) + 2
+        lattice = np.array([rng.random() for _ in range(gw * gh)]).reshape(gh, gw)
+        xs = np.arange(width) / step
+        ys = np.arange(height) / step
+        x0, y0 = xs.astype(np.intp), ys.astype(np.intp)
+        fx, fy = xs - x0, ys - y0
+        fx = fx * fx * (3 - 2 * fx)
+        fy = (fy * fy * (3 - 2 * fy))[:, None]
+        # Separável: interpola as linhas da grade em x, depois em y
+        rows = lattice[:, x0] * (1 - fx) + lattice[:, x0 + 1] * fx
+        total += amplitude * (rows[y0] * (1 - fy) + rows[y0 + 1] * fy)
+        norm += amplitude
+        amplitude /= 2
+    return total / norm
+
+
+def carve_river(blocked, rng=random, river_width=1):
+    """
+    Rio de uma borda à oposta: passo unitário numa direção que oscila
+    (passeio aleatório do ângulo) em torno da direção principal.
+    """
+    height, width = blocked.shape
+    if rng.random() < 0.5:
+        x, y, heading = 0.0, rng.uniform(0, height - 1), 0.0
+    else:
+        x, y, heading = rng.uniform(0, width - 1), 0.0, math.pi / 2
+    angle = heading
+    half = river_width // 2
+    while 0 <= x < width and 0 <= y < height:
+        cx, cy = int(x), int(y)
+        blocked[max(0, cy - half):cy - half + river_width, max(0, cx - half):cx - half + river_width] = True
+        angle += rng.gauss(0, 0.35)
+        angle = heading + max(-1.0, min(1.0, angle - heading))   # no máximo ~57° da direção principal
+        x += math.cos(angle)
+        y += math.sin(angle)
+
+
+def _label_runs(free):
+    """
+    Regiões 4-conexas de `free` (rótulos 1..n, 0 = bloqueado) sem scipy:
+    cada linha vira faixas de células livres, faixas que se sobrepõem em
+    linhas vizinhas são unidas (union-find) e o rótulo é pintado por faixa.
+    """
+    height, width = free.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = free
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[1]       # exclusivo; mesma ordem das faixas
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first = np.searchsorted(rows, np.arange(height + 1)).tolist()
+    starts_l, ends_l = starts.tolist(), ends.tolist()
+    for y in range(height - 1):
+        i, i_end = first[y], first[y + 1]
+        j, j_end = first[y + 1], first[y + 2]
+        while i < i_end and j < j_end:
+            if starts_l[i] < ends_l[j] and starts_l[j] < ends_l[i]:
+                a, b = find(i), find(j)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+            if ends_l[i] < ends_l[j]:
+                i += 1
+            else:
+                j += 1
+
+    roots = np.array([find(i) for i in range(len(parent))], dtype=np.intp)
+    _, run_labels = np.unique(roots, return_inverse=True)
+    lengths = ends - starts
+    labels = np.zeros(height * width, dtype=np.int32)
+    offsets = np.repeat(rows * width + starts - np.cumsum(lengths) + lengths, lengths)
+    labels[offsets + np.arange(lengths.sum())] = np.repeat(run_labels + 1, lengths)
+    return labels.reshape(height, width), int(run_labels.max(initial=-1)) + 1
+
+
+def label_regions(free):
+    """Rótulos das regiões 4-conexas de `free` e o número de regiões."""
+    if ndimage is not None:
+        return ndimage.label(free)
+    return _label_runs(free)
+
+
+def connect_to_base(blocked, base, min_region=16):
+    """
+    Garante que toda célula livre alcança `base`: regiões isoladas menores
+    que `min_region` viram obstáculo; nas demais, abre-se um corredor em L
+    a partir da célula da região mais próxima da base até encontrar a região
+    da base. Altera `blocked` no lugar e devolve quantos corredores abriu.
+    """
+    height, width = blocked.shape
+    bx, by = base
+    blocked[by, bx] = False
+    labels, count = label_regions(~blocked)
+    if count <= 1:
+        return 0
+    home = labels[by, bx]
+    sizes = np.bincount(labels.ravel(), minlength=count + 1)
+    small = sizes < min_region
+    small[0] = small[home] = False
+    blocked |= small[labels]
+
+    # Célula de cada região grande mais próxima da base (Manhattan)
+    ys, xs = np.indices((height, width))
+    dist = (np.abs(xs - bx) + np.abs(ys - by)).ravel()
+    flat = labels.ravel()
+    order = np.argsort(dist, kind='stable')
+    regions, first = np.unique(flat[order], return_index=True)
+    corridors = 0
+    for region, cell in zip(regions.tolist(), order[first].tolist()):
+        if region == 0 or region == home or small[region]:
+            continue
+        x, y = cell % width, cell // width
+        # Primeiro na vertical, depois na horizontal, até tocar a região da base
+        while labels[y, x] != home:
+            blocked[y, x] = False
+            if y != by:
+                y += 1 if by > y else -1
+            else:
+                x += 1 if bx > x else -1
+        corridors += 1
+    return corridors
+
+
+def generate_obstacles(width=None, height=None, mountains=0.15, rivers=2, scale=None,
+                       river_width=1, base=None, min_region=16, rng=random):
+    """
+    ObstacleMap procedural: a fração `mountains` das células mais altas de
+    um ruído de valor vira montanha, `rivers` rios cortam o mapa de borda a
+    borda, o quadrado da base fica livre e `connect_to_base` liga (ou
+    preenche) as regiões isoladas. `scale` é o tamanho típico das
+    montanhas em células (padrão: 1/8 do lado menor).
+    """
+    _require_numpy()
+    width = constantes.GRID_WIDTH if width is None else width
+    height = constantes.GRID_HEIGHT if height is None else height
+    base = (width // 2, height // 2) if base is None else base
+    blocked = np.zeros((height, width), dtype=bool)
+    if mountains > 0:
+        noise = value_noise(width, height, scale or max(4, min(width, height) / 8), rng)
+        blocked |= noise > np.quantile(noise, 1 - mountains)
+    for _ in range(rivers):
+        carve_river(blocked, rng, river_width)
+    blocked.ravel()[base_cells(width, height, base)] = False
+    connect_to_base(blocked, base, min_region)
+    return ObstacleMap(width, height, bytearray(blocked.astype(np.uint8).tobytes()))
+
+
+def generate(width, height, num_crystals, num_metal, num_structures, terrain=None, base=None, rng=random):
+    """
+    Cenário completo: (recursos, ObstacleMap). `terrain` são os argumentos
+    de `generate_obstacles` (None = sem obstáculos).
+    """
+    import recursos
+    if terrain is None:
+        obstacles = ObstacleMap(width, height)
+    else:
+        obstacles = generate_obstacles(width, height, base=base, rng=rng, **terrain)
+    resources = recursos.create_resources(num_crystals, num_metal, num_structures,
+                                          width, height, obstacles, base, rng)
+    return resources, obstacles
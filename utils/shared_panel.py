@@ -0,0 +1,66 @@
+# utils/shared_panel.py
+
+# Painel local (shared_info) que registra o que o próprio agente anotou,
+# para que o BDI leia só as novidades em vez de varrer o painel inteiro.
+
+class SharedPanel(dict):
+    """
+    dict posição -> tipo de recurso. Escritas do agente (`painel[pos] = t`,
+    `update`, `setdefault`) entram num log de alterações; o que chega de
+    fora por `receive` não entra, para não ser reenviado como novidade.
+    `clear` inicia uma nova época e zera o log.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.epoch = 0
+        self.log = []
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if dict.get(self, key, _MISSING) != value:
+            self.log.append(key)
+        dict.__setitem__(self, key, value)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def clear(self):
+        dict.clear(self)
+        self.epoch += 1
+        self.log = []
+
+    def receive(self, mapping):
+        """Incorpora informação recebida de outro agente, sem registrá-la no log."""
+        dict.update(self, mapping)
+
+    def changes_since(self, cursor):
+        """
+        Chaves anotadas desde `cursor` (None = desde o início) e o novo
+        cursor. Custa O(alterações), não O(tamanho do painel).
+        """
+        start = 0
+        if cursor is not None and cursor[0] == self.epoch:
+            start = cursor[1]
+        return self.log[start:], (self.epoch, len(self.log))
+
+    def __reduce__(self):
+        # O pickle padrão de subclasses de dict repõe as chaves por
+        # __setitem__ antes de restaurar `log`; aqui tudo vem de uma vez.
+        return (_restore_panel, (dict(self), self.epoch, self.log))
+
+
+def _restore_panel(items, epoch, log):
+    panel = SharedPanel()
+    dict.update(panel, items)
+    panel.epoch = epoch
+    panel.log = log
+    return panel
+
+
+_MISSING = object()
@@ -0,0 +1,173 @@
+# utils/snapshot.py
+
+# Pontos de salvamento de um episódio. Os geradores SimPy dos agentes não
+# podem ser serializados, então o ponto guarda o estado que eles leem
+# (atributos dos agentes, recursos, quadro, métricas, RNG e fase da
+# tempestade) entre dois passos; ao restaurar, uma Simulation nova começa
+# no mesmo passo e cada `run()` recomeça do topo do laço, que decide tudo
+# a partir desses atributos.
+import pickle
+import random
+import zlib
+
+from simulation import Simulation, set_storm
+from utils.blackboard import get_blackboard
+from utils.profiling import PROFILED_METHODS
+
+MAGIC = b'AGSN'
+VERSION = 4
+
+# Atributos que ligam um agente ao ambiente e aos serviços compartilhados:
+# não vão para o arquivo, são recriados pela Simulation restaurada
+_WIRING = {'env', 'process', 'grid', 'obstacles', 'obstacle_map', 'home', 'board',
+           'metrics', 'trace', 'world', 'index', 'next_home', 'dx', 'dy', 'allocator', 'frontiers',
+           'pool'}
+_WIRING |= set(PROFILED_METHODS)  # métodos medidos, instalados pela Simulation
+# Parte do registro de métricas que vem da config
+_RECORDER_CONFIG = {'log_level', 'series'}
+
+
+def _agent_state(ag):
+    state = {key: value for key, value in vars(ag).items() if key not in _WIRING}
+    if 'cursors' in state:
+        # BDI: cursores nos painéis, por agente -> por id
+        state['cursors'] = {other.id: cursor for other, cursor in state['cursors'].items()}
+    return state
+
+
+def _returning(ag):
+    """
+    O gerador do agente está parado dentro de `return_to_base`? É o único
+    estado que não aparece nos atributos: depois que a tempestade acaba
+    (`in_storm` volta a False) o agente ainda termina o caminho até a base.
+    """
+    process = getattr(ag, 'process', None)
+    inner = getattr(getattr(process, '_generator', None), 'gi_yieldfrom', None)
+    return inner is not None and inner.gi_code.co_name == 'return_to_base'
+
+
+def _restore_agent(ag, state, by_id):
+    if 'cursors' in state:
+        state['cursors'] = {by_id[i]: cursor for i, cursor in state['cursors'].items()}
+    ag.__dict__.update(state)
+
+
+class Snapshot:
+    """
+    Estado de uma Simulation num passo, já serializado (pickle). Cada
+    `restore` desserializa uma cópia nova, então o mesmo ponto pode gerar
+    quantos episódios se quiser. No arquivo, o pickle vai comprimido.
+    """
+    def __init__(self, payload, now):
+        self.payload = payload
+        self.now = now
+
+    @classmethod
+    def capture(cls, sim):
+        """Salva `sim` entre dois passos (depois de um `run`)."""
+        env = sim.env
+        board = get_blackboard(env)
+        allocator = getattr(env, 'allocator', None)
+        frontier = getattr(env, 'frontier', None)
+        if sim.swarm is not None and hasattr(sim.swarm, 'sync'):
+            sim.swarm.sync()    # enxame repartido: traz as posições das faixas
+        # Um único pickle preserva objetos compartilhados (ex.: a tarefa que
+        # o alocador divide com a equipe)
+        state = {
+            'version': VERSION,
+            'config': sim.config,
+            'now': env.now,
+            'storm_phase': env.now - sim.storm_origin,
+            'is_storm': env.is_storm,
+            'resources': sim.resources,
+            'obstacles': sim.obstacles,
+            'agents': [(type(ag).__name__, _agent_state(ag)) for ag in sim.agents],
+            'returning': [ag.id for ag in sim.agents if _returning(ag)],
+            'swarm': _agent_state(sim.swarm) if sim.swarm else None,
+            'visited': sim.world.visited if sim.world is not None else None,
+            'swarm_visited': sim.world.swarm_visited if sim.world is not None else None,
+            'board': {'version': board.version, 'entries': board.entries, 'log': board.log},
+            'allocator': allocator.state() if allocator is not None else None,
+            'frontier': frontier.state() if frontier is not None else None,
+            'recorder': {k: v for k, v in vars(sim.recorder).items() if k not in _RECORDER_CONFIG},
+            'random': random.getstate(),
+        }
+        return cls(pickle.dumps(state, pickle.HIGHEST_PROTOCOL), env.now)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path}: não é um ponto de salvamento")
+        payload = zlib.decompress(data[4:])
+        return cls(payload, pickle.loads(payload)['now'])
+
+    def save(self, path):
+        """Grava o ponto comprimido e devolve o tamanho em bytes."""
+        data = MAGIC + zlib.compress(self.payload, 6)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return len(data)
+
+    def restore(self, **config):
+        """
+        Nova Simulation no estado salvo. `config` sobrepõe a config
+        original (o trace fica desligado, a menos que seja pedido).
+        """
+        state = pickle.loads(self.payload)
+        if state['version'] != VERSION:
+            raise ValueError(f"versão de ponto de salvamento incompatível: {state['version']}")
+        cfg = dict(state['config'], trace=None)
+        cfg.update(config)
+        # Tempestade que acaba exatamente agora: encerrada já na restauração,
+        # antes de marcar quem ainda está voltando (abaixo)
+        cycle = cfg['storm_interval'] + cfg['storm_duration']
+        ending = state['is_storm'] and state['storm_phase'] % cycle == 0
+        sim = Simulation(cfg, start=state['now'], resources=state['resources'],
+                         obstacles=state['obstacles'], storm_phase=state['storm_phase'],
+                         is_storm=state['is_storm'] and not ending)
+
+        if [type(ag).__name__ for ag in sim.agents] != [name for name, _ in state['agents']]:
+            raise ValueError("o elenco de agentes não confere com o ponto de salvamento")
+        by_id = {ag.id: ag for ag in sim.agents}
+        for ag, (_, agent_state) in zip(sim.agents, state['agents']):
+            _restore_agent(ag, agent_state, by_id)
+        if state['swarm'] is not None and sim.swarm is not None:
+            if hasattr(sim.swarm, 'load_state'):
+                sim.swarm.load_state(state['swarm'])   # enxame repartido: memória compartilhada
+            else:
+                _restore_agent(sim.swarm, state['swarm'], by_id)
+        if state['visited'] is not None and sim.world is not None:
+            sim.world.visited = state['visited']
+        if state['swarm_visited'] is not None and sim.world is not None:
+            sim.world.swarm_visited = state['swarm_visited']
+
+        if ending:
+            set_storm(sim.env, sim.storm_targets, False)
+        # Quem estava no meio de return_to_base: `in_storm` faz o topo do
+        # laço de run() voltar para lá, com a mesma continuação
+        for agent_id in state['returning']:
+            by_id[agent_id].in_storm = True
+
+        get_blackboard(sim.env).__dict__.update(state['board'])
+        if state['allocator'] is not None:
+            sim.env.allocator.load_state(state['allocator'], sim.agents)
+        if state['frontier'] is not None:
+            sim.env.frontier.load_state(state['frontier'])
+        sim.recorder.__dict__.update(state['recorder'])
+        random.setstate(state['random'])
+        return sim
+
+    def fork(self, n, seed=0, **config):
+        """
+        Gera `n` variantes a partir do ponto, cada uma com o gerador
+        aleatório ressemeado (`seed + i`). As variantes compartilham o
+        `random` global: rode uma de cada vez (ou em processos separados).
+        """
+        for i in range(n):
+            sim = self.restore(**config)
+            random.seed(seed + i)
+            if sim.swarm is not None:
+                sim.swarm.reseed(random.getrandbits(64))
+            yield sim
@@ -0,0 +1,436 @@
+# utils/stream.py
+
+# Transmissão ao vivo de um episódio para visualizadores em outros
+# processos (painéis, `replay.py --connect`), sem pygame no processo da
+# simulação. Um servidor asyncio, numa thread própria, escuta só em
+# localhost (ou num socket Unix); a cada passo um processo SimPy compara
+# o `x`/`y` dos agentes e as coletas do ResourceIndex com o último quadro
+# enviado e publica um quadro delta, com quadros-chave periódicos.
+#
+# Cada cliente tem uma fila limitada: se ela enche, o quadro é descartado
+# para aquele cliente, que fica dessincronizado (ignora deltas) até o
+# próximo quadro-chave, enviado depois de no mínimo RESYNC_INTERVAL deltas
+# (um cliente sempre atrasado não faz a simulação codificar um quadro-chave
+# por passo). A simulação nunca espera a rede. No fim, cada cliente recebe
+# o quadro-chave final, mesmo que para isso sua fila seja esvaziada.
+# Rodando mais rápido que MAX_FPS quadros por segundo, os passos entre
+# dois quadros se acumulam num único delta.
+#
+# Protocolo: mensagens com prefixo de tamanho (uint32, little-endian).
+#   HELLO (tipo 0): JSON com largura, altura, base, agentes (id, nome,
+#                   classe) e o bitmap de obstáculos (zlib + base64)
+#   quadro: FRAME (tipo 1 = chave, 2 = delta; passo; flags, bit 0 =
+#           tempestade; agentes; recursos) seguido de
+#     chave: todos os agentes (AGENT) e recursos não coletados (RESOURCE)
+#     delta: agentes que se moveram (AGENT) e ids coletados (COLLECTED)
+import asyncio
+import base64
+import ipaddress
+import json
+import os
+import socket
+import struct
+import threading
+import zlib
+from collections import deque
+from time import perf_counter
+
+import constantes
+from mundo import RESOURCE_CODES, RESOURCE_NAMES
+from utils.trace import agent_meta
+
+LENGTH = struct.Struct('<I')
+FRAME = struct.Struct('<BIBHI')         # tipo, passo, flags, agentes, recursos
+AGENT = struct.Struct('<Hhh')           # id, x, y
+RESOURCE = struct.Struct('<IBhh')       # id, código do tipo, x, y
+COLLECTED = struct.Struct('<I')         # id
+
+MSG_HELLO = 0
+MSG_KEYFRAME = 1
+MSG_DELTA = 2
+FLAG_STORM = 1
+
+DEFAULT_ADDRESS = '127.0.0.1:8765'
+KEYFRAME_INTERVAL = 120     # deltas entre quadros-chave
+RESYNC_INTERVAL = 10        # deltas mínimos antes de reenviar um quadro-chave perdido
+QUEUE_SIZE = 64             # quadros pendentes por cliente
+MAX_FPS = 120               # quadros por segundo (de relógio), no máximo
+
+
+def parse_address(text):
+    """'unix:/caminho' -> ('unix', caminho); 'host:porta' ou 'porta' -> (host, porta)."""
+    if text.startswith('unix:'):
+        return 'unix', text[5:]
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def _check_loopback(host):
+    address = ipaddress.ip_address(socket.gethostbyname(host))
+    if not address.is_loopback:
+        raise ValueError(f"o servidor de transmissão só escuta em localhost, não em {host}")
+
+
+def _message(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+
+class FrameEncoder:
+    """
+    Quadros de um episódio, do ponto de vista do último quadro publicado:
+    `positions` guarda onde cada agente estava nele e `collected` os ids
+    coletados desde então (pela assinatura do ResourceIndex).
+    """
+    def __init__(self, env, agents, index):
+        self.env = env
+        self.agents = agents
+        self.index = index
+        self.positions = {}
+        self.collected = []
+        self.storm = False
+        index.subscribe(self.on_collect)
+
+    def on_collect(self, res):
+        self.collected.append(res.id)
+
+    def hello(self, obstacle_map=None, base=constantes.BASE_POS):
+        info = {
+            'width': constantes.GRID_WIDTH if obstacle_map is None else obstacle_map.width,
+            'height': constantes.GRID_HEIGHT if obstacle_map is None else obstacle_map.height,
+            'base': list(base),
+            'agents': agent_meta(self.agents),
+            'obstacles': None,
+        }
+        if obstacle_map is not None:
+            info['obstacles'] = base64.b64encode(zlib.compress(bytes(obstacle_map.blocked))).decode('ascii')
+        return _message(bytes([MSG_HELLO]) + json.dumps(info, ensure_ascii=False).encode('utf-8'))
+
+    def keyframe(self):
+        self.positions = {ag.id: (ag.x, ag.y) for ag in self.agents}
+        self.collected = []
+        self.storm = bool(getattr(self.env, 'is_storm', False))
+        live = [res for res in self.index.resources if not res.collected]
+        parts = [FRAME.pack(MSG_KEYFRAME, int(self.env.now), self.storm, len(self.agents), len(live))]
+        parts.extend(AGENT.pack(ag.id, ag.x, ag.y) for ag in self.agents)
+        parts.extend(RESOURCE.pack(res.id, RESOURCE_CODES[res.type], res.x, res.y) for res in live)
+        return _message(b''.join(parts))
+
+    def delta(self):
+        """Quadro com o que mudou desde o último; None se nada mudou."""
+        positions = self.positions
+        moved = []
+        for ag in self.agents:
+            pos = (ag.x, ag.y)
+            if positions.get(ag.id) != pos:
+                positions[ag.id] = pos
+                moved.append(AGENT.pack(ag.id, ag.x, ag.y))
+        storm = bool(getattr(self.env, 'is_storm', False))
+        if not moved and not self.collected and storm == self.storm:
+            return None
+        self.storm = storm
+        collected, self.collected = self.collected, []
+        parts = [FRAME.pack(MSG_DELTA, int(self.env.now), storm, len(moved), len(collected))]
+        parts.extend(moved)
+        parts.extend(COLLECTED.pack(res_id) for res_id in collected)
+        return _message(b''.join(parts))
+
+
+class _Client:
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(max(2, queue_size))     # cabe o quadro final e o sinal de fim
+        self.synced = False     # recebeu o quadro-chave depois da última perda?
+        self.sent = 0
+        self.dropped = 0
+
+
+class StreamServer:
+    """
+    Servidor de transmissão de uma Simulation. `start()` abre o socket numa
+    thread com seu próprio laço asyncio e instala o processo que gera os
+    quadros; `stop()` envia o que falta e fecha tudo. `address` é o
+    endereço em que ficou escutando (útil com porta 0).
+    """
+    def __init__(self, sim, address=DEFAULT_ADDRESS, keyframe_interval=KEYFRAME_INTERVAL,
+                 queue_size=QUEUE_SIZE, max_fps=MAX_FPS, resync_interval=RESYNC_INTERVAL):
+        self.sim = sim
+        self.kind, self.target = parse_address(address)
+        if self.kind != 'unix':
+            _check_loopback(self.kind)
+        self.keyframe_interval = keyframe_interval
+        self.resync_interval = resync_interval
+        self.queue_size = queue_size
+        self.frame_interval = 1.0 / max_fps if max_fps else 0.0
+        env = sim.env
+        self.encoder = FrameEncoder(env, sim.agents, sim.resource_index)
+        self.hello = self.encoder.hello(getattr(env, 'obstacle_map', None),
+                                        (sim.base_x, sim.base_y))
+        self.clients = []
+        self.need_keyframe = True   # cliente novo: quadro-chave já
+        self.resync = False         # quadro perdido: quadro-chave após resync_interval deltas
+        self.deltas = 0             # deltas desde o último quadro-chave
+        self.final = None           # quadro-chave de encerramento (stop)
+        self.next_frame = 0.0
+        self.frames = 0
+        self.sent = 0
+        self.dropped = 0
+        self.pending = deque()  # (quadro, é chave?) a entregar ao laço; deque: seguro entre threads
+        self.scheduled = False
+        self.address = None
+        self.error = None
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+
+    # --------- Lado da simulação ---------
+    def start(self):
+        self.thread = threading.Thread(target=self._serve, name='stream', daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        self.process = self.sim.env.process(self.run())
+        return self
+
+    def run(self):
+        """Processo SimPy: um quadro ao fim de cada passo (criado depois dos agentes)."""
+        env, encoder = self.sim.env, self.encoder
+        while True:
+            if not self.clients:
+                # Ninguém assistindo: só marca que o próximo cliente precisa de um quadro-chave
+                self.need_keyframe = True
+                encoder.collected.clear()
+            else:
+                agora = perf_counter()
+                if agora >= self.next_frame:
+                    self.next_frame = agora + self.frame_interval
+                    if (self.need_keyframe or self.deltas >= self.keyframe_interval or
+                            (self.resync and self.deltas >= self.resync_interval)):
+                        self.need_keyframe = self.resync = False
+                        self.deltas = 0
+                        self.publish(encoder.keyframe(), True)
+                    else:
+                        frame = encoder.delta()
+                        if frame is not None:
+                            self.deltas += 1
+                            self.publish(frame, False)
+            yield env.timeout(1)
+
+    def publish(self, frame, keyframe):
+        # Passa o quadro ao laço da thread; um único agendamento por lote
+        self.frames += 1
+        self.pending.append((frame, keyframe))
+        if not self.scheduled:
+            self.scheduled = True
+            self.loop.call_soon_threadsafe(self._dispatch)
+
+    def stop(self):
+        if self.thread is None:
+            return
+        if self.loop is not None and self.thread.is_alive():
+            if self.clients:
+                # Fecha com um quadro-chave: quem perdeu deltas termina com o estado final
+                self.final = self.encoder.keyframe()
+            self.loop.call_soon_threadsafe(self._finish.set)
+        self.thread.join(5)
+        self.thread = None
+
+    def stats(self):
+        return {'quadros': self.frames, 'clientes': len(self.clients),
+                'enviados': self.sent, 'descartados': self.dropped}
+
+    # --------- Lado da rede (thread do servidor) ---------
+    def _serve(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as exc:   # erro ao abrir o socket: repassado a start()
+            self.error = exc
+            self.ready.set()
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self._finish = asyncio.Event()
+        if self.kind == 'unix':
+            if os.path.exists(self.target):
+                os.unlink(self.target)
+            server = await asyncio.start_unix_server(self._handle, path=self.target)
+            self.address = f"unix:{self.target}"
+        else:
+            server = await asyncio.start_server(self._handle, self.kind, self.target)
+            host, port = server.sockets[0].getsockname()[:2]
+            self.address = f"{host}:{port}"
+        self.ready.set()
+        async with server:
+            await self._finish.wait()
+            # Último lote da simulação, o quadro-chave final e um sinal de fim
+            self._dispatch()
+            tasks = []
+            for client in self.clients:
+                self._close(client)
+                tasks.append(client.task)
+            if tasks:
+                await asyncio.wait(tasks, timeout=2.0)
+        if self.kind == 'unix' and os.path.exists(self.target):
+            os.unlink(self.target)
+
+    def _close(self, client):
+        queue = client.queue
+        if queue.maxsize - queue.qsize() < 2:
+            # Sem espaço: o quadro-chave final substitui o que estava na fila
+            while not queue.empty():
+                queue.get_nowait()
+                client.dropped += 1
+                self.dropped += 1
+        if self.final is not None:
+            queue.put_nowait(self.final)
+            client.synced = True
+        queue.put_nowait(None)
+
+    def _dispatch(self):
+        self.scheduled = False
+        pending = self.pending
+        while pending:
+            frame, keyframe = pending.popleft()
+            for client in self.clients:
+                if not keyframe and not client.synced:
+                    client.dropped += 1
+                    self.dropped += 1
+                    continue
+                try:
+                    client.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    # Cliente lento: perde o quadro e espera o próximo quadro-chave
+                    client.dropped += 1
+                    self.dropped += 1
+                    client.synced = False
+                    self.resync = True
+                else:
+                    if keyframe:
+                        client.synced = True
+
+    async def _handle(self, reader, writer):
+        client = _Client(writer, self.queue_size)
+        client.task = asyncio.current_task()
+        self.clients.append(client)
+        self.need_keyframe = True
+        try:
+            writer.write(self.hello)
+            while True:
+                frame = await client.queue.get()
+                if frame is None:
+                    break
+                writer.write(frame)
+                await writer.drain()
+                client.sent += 1
+                self.sent += 1
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.remove(client)
+            writer.close()
+
+
+# --------- Clientes ---------
+def decode(payload):
+    """Mensagem (sem o prefixo de tamanho) -> dict."""
+    kind = payload[0]
+    if kind == MSG_HELLO:
+        info = json.loads(bytes(payload[1:]).decode('utf-8'))
+        info['kind'] = 'hello'
+        if info.get('obstacles'):
+            info['obstacles'] = bytearray(zlib.decompress(base64.b64decode(info['obstacles'])))
+        return info
+    kind, tick, flags, n_agents, n_resources = FRAME.unpack_from(payload, 0)
+    offset = FRAME.size
+    end = offset + n_agents * AGENT.size
+    agents = list(AGENT.iter_unpack(payload[offset:end]))
+    message = {'kind': 'keyframe' if kind == MSG_KEYFRAME else 'delta', 'tick': tick,
+               'storm': bool(flags & FLAG_STORM), 'agents': agents}
+    if kind == MSG_KEYFRAME:
+        message['resources'] = [(res_id, RESOURCE_NAMES[code], x, y) for res_id, code, x, y
+                                in RESOURCE.iter_unpack(payload[end:end + n_resources * RESOURCE.size])]
+    else:
+        message['collected'] = [res_id for res_id, in
+                                COLLECTED.iter_unpack(payload[end:end + n_resources * COLLECTED.size])]
+    return message
+
+
+async def open_stream(address=DEFAULT_ADDRESS):
+    """Conecta a um StreamServer; devolve (reader, writer) do asyncio."""
+    kind, target = parse_address(address)
+    if kind == 'unix':
+        return await asyncio.open_unix_connection(target)
+    return await asyncio.open_connection(kind, target)
+
+
+async def messages(reader):
+    """Mensagens decodificadas de uma conexão, até o servidor fechar."""
+    while True:
+        try:
+            header = await reader.readexactly(LENGTH.size)
+            payload = await reader.readexactly(LENGTH.unpack(header)[0])
+        except asyncio.IncompleteReadError:
+            return
+        yield decode(memoryview(payload))
+
+
+class StreamState:
+    """
+    Estado reconstruído no cliente: posições dos agentes, recursos não
+    coletados (id -> (tipo, x, y)), tempestade e passo. Deltas antes do
+    primeiro quadro-chave são ignorados.
+    """
+    def __init__(self):
+        self.info = None
+        self.positions = {}
+        self.resources = {}
+        self.storm = False
+        self.tick = None
+        self.keyframes = 0
+        self.deltas = 0
+
+    def apply(self, message):
+        kind = message['kind']
+        if kind == 'hello':
+            self.info = message
+            return message
+        if kind == 'delta' and not self.keyframes:
+            return None
+        if kind == 'keyframe':
+            self.keyframes += 1
+            self.positions = {}
+            self.resources = {res_id: (rtype, x, y) for res_id, rtype, x, y in message['resources']}
+        else:
+            self.deltas += 1
+            for res_id in message['collected']:
+                self.resources.pop(res_id, None)
+        for agent_id, x, y in message['agents']:
+            self.positions[agent_id] = (x, y)
+        self.storm = message['storm']
+        self.tick = message['tick']
+        return message
+
+
+async def watch(address=DEFAULT_ADDRESS, interval=1.0):
+    """Cliente de texto: uma linha de resumo a cada `interval` segundos."""
+    reader, writer = await open_stream(address)
+    state = StreamState()
+    loop = asyncio.get_running_loop()
+    next_print = loop.time()
+    async for message in messages(reader):
+        state.apply(message)
+        if state.tick is not None and loop.time() >= next_print:
+            next_print = loop.time() + interval
+            print(f"passo {state.tick:>8}  agentes {len(state.positions):>4}  "
+                  f"recursos {len(state.resources):>7}  tempestade {'sim' if state.storm else 'não'}  "
+                  f"quadros-chave {state.keyframes}  deltas {state.deltas}", flush=True)
+    writer.close()
+    print(f"fim da transmissão no passo {state.tick}")
+
+
+if __name__ == "__main__":
+    import sys
+    try:
+        asyncio.run(watch(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ADDRESS))
+    except KeyboardInterrupt:
+        pass
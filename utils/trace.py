@@ -0,0 +1,225 @@
+# utils/trace.py
+
+# Registro binário de eventos de um episódio, para auditar o comportamento
+# dos agentes sem depender de print. Cada evento é um registro de tamanho
+# fixo (16 bytes); eles se acumulam num buffer pré-alocado que é despejado
+# no arquivo quando enche e ao final de cada Simulation.run. O arquivo pode
+# ser mapeado em memória (TraceReader) sem ser carregado inteiro.
+#
+# Arquivo: cabeçalho (HEADER) + metadados JSON + registros (RECORD).
+import json
+import mmap
+import struct
+from bisect import bisect_left
+
+from mundo import RESOURCE_CODES, RESOURCE_NAMES, np
+
+MAGIC = b'AGTR'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')        # magic, versão, tamanho do registro, bytes de metadados
+RECORD = struct.Struct('<IBxHhhi')      # tick, evento, agente, x, y, argumento (16 bytes)
+
+# Eventos (campo `arg` entre parênteses)
+EV_SPAWN_RESOURCE = 0   # agente = código do tipo (id do recurso)
+EV_SPAWN_OBSTACLE = 1
+EV_MOVE = 2
+EV_COLLECT = 3          # (id do recurso)
+EV_DELIVER = 4          # (código do tipo entregue)
+EV_STORM_ON = 5
+EV_STORM_OFF = 6
+EV_BELIEF = 7           # (código do tipo; 0 = crença retirada)
+
+EVENT_NAMES = {
+    EV_SPAWN_RESOURCE: 'spawn_resource',
+    EV_SPAWN_OBSTACLE: 'spawn_obstacle',
+    EV_MOVE: 'move',
+    EV_COLLECT: 'collect',
+    EV_DELIVER: 'deliver',
+    EV_STORM_ON: 'storm_on',
+    EV_STORM_OFF: 'storm_off',
+    EV_BELIEF: 'belief',
+}
+
+NO_AGENT = 0xFFFF
+
+
+class TraceWriter:
+    """
+    Grava eventos do ambiente `env` em `path`. Os ganchos ficam nos agentes
+    (`if self.trace is not None: self.trace.move(...)`) e no
+    storm_controller; sem trace, custam uma comparação.
+    """
+    def __init__(self, env, path, meta=None, capacity=65536):
+        self.env = env
+        self.path = path
+        self.meta = dict(meta or {})    # completado até o primeiro flush
+        self.file = None
+        self.buffer = bytearray(RECORD.size * capacity)
+        self.end = len(self.buffer)
+        self.pos = 0
+        self.flushed = 0        # registros já no arquivo
+        self._pack = RECORD.pack_into
+
+    def __len__(self):
+        return self.flushed + self.pos // RECORD.size
+
+    def record(self, event, agent, x, y, arg=0):
+        pos = self.pos
+        self._pack(self.buffer, pos, self.env.now, event, agent, x, y, arg)
+        self.pos = pos = pos + 16
+        if pos == self.end:
+            self.flush()
+
+    # --------- Ganchos ---------
+    def move(self, agent_id, x, y):
+        # caminho mais frequente: sem passar por record()
+        pos = self.pos
+        self._pack(self.buffer, pos, self.env.now, EV_MOVE, agent_id, x, y, 0)
+        self.pos = pos = pos + 16
+        if pos == self.end:
+            self.flush()
+
+    def collect(self, agent_id, res):
+        self.record(EV_COLLECT, agent_id, res.x, res.y, res.id)
+
+    def deliver(self, agent_id, x, y, rtype):
+        self.record(EV_DELIVER, agent_id, x, y, RESOURCE_CODES[rtype])
+
+    def storm(self, active):
+        self.record(EV_STORM_ON if active else EV_STORM_OFF, NO_AGENT, 0, 0)
+
+    def belief(self, agent_id, pos, rtype):
+        """Crença nova sobre `pos` (`rtype` None = crença retirada)."""
+        self.record(EV_BELIEF, agent_id, pos[0], pos[1], RESOURCE_CODES[rtype] if rtype else 0)
+
+    def spawn(self, resources, obstacles=(), agents=()):
+        """Estado inicial: recursos ainda não coletados, obstáculos e agentes."""
+        for res in resources:
+            if res.collected:
+                continue
+            self.record(EV_SPAWN_RESOURCE, RESOURCE_CODES[res.type], res.x, res.y, res.id)
+        cells = obstacles.cells() if hasattr(obstacles, 'cells') else ((o.x, o.y) for o in obstacles)
+        for x, y in cells:
+            self.record(EV_SPAWN_OBSTACLE, NO_AGENT, x, y)
+        for ag in agents:
+            self.record(EV_MOVE, ag.id, ag.x, ag.y)
+
+    # --------- Arquivo ---------
+    def flush(self):
+        if self.file is None:
+            # O cabeçalho sai no primeiro flush, com os metadados já completos
+            meta_bytes = json.dumps(self.meta, ensure_ascii=False).encode('utf-8')
+            self.file = open(self.path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(meta_bytes)))
+            self.file.write(meta_bytes)
+        if self.pos:
+            self.file.write(memoryview(self.buffer)[:self.pos])
+            self.flushed += self.pos // RECORD.size
+            self.pos = 0
+        self.file.flush()
+
+    def close(self):
+        if self.file is None or not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def get_trace(env):
+    """TraceWriter do ambiente `env`, ou None se o trace está desligado."""
+    return getattr(env, 'trace', None)
+
+
+def agent_meta(agents):
+    """Metadados dos agentes para o cabeçalho: id -> nome e classe."""
+    return [{'id': ag.id, 'name': ag.name, 'class': type(ag).__name__} for ag in agents]
+
+
+class TraceReader:
+    """
+    Lê um arquivo de trace mapeado em memória. `records()` itera tuplas
+    (tick, evento, agente, x, y, arg); `array()` devolve uma visão NumPy
+    estruturada sem cópia (requer numpy).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, meta_len = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f"{path}: não é um trace (ou versão incompatível)")
+        self.version = version
+        self.meta = json.loads(bytes(self.map[HEADER.size:HEADER.size + meta_len]).decode('utf-8'))
+        self.offset = HEADER.size + meta_len
+        self.count = (len(self.map) - self.offset) // RECORD.size
+        self._ticks = None
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return RECORD.unpack_from(self.map, self.offset + i * RECORD.size)
+
+    def records(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        view = memoryview(self.map)[self.offset + start * RECORD.size:self.offset + stop * RECORD.size]
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    def tick_at(self, i):
+        return struct.unpack_from('<I', self.map, self.offset + i * RECORD.size)[0]
+
+    def last_tick(self):
+        return self.tick_at(self.count - 1) if self.count else 0
+
+    def index_of_tick(self, tick):
+        """Índice do primeiro registro com tick >= `tick` (busca binária)."""
+        if self._ticks is None:
+            self._ticks = _TickView(self)
+        return bisect_left(self._ticks, tick)
+
+    def array(self):
+        if np is None:
+            raise ImportError("TraceReader.array requer numpy (pip install numpy)")
+        dtype = np.dtype([('tick', '<u4'), ('event', 'u1'), ('pad', 'u1'), ('agent', '<u2'),
+                          ('x', '<i2'), ('y', '<i2'), ('arg', '<i4')])
+        return np.frombuffer(self.map, dtype=dtype, count=self.count, offset=self.offset)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class _TickView:
+    """Sequência dos ticks dos registros, para bisect sem desempacotar tudo."""
+    def __init__(self, reader):
+        self.reader = reader
+
+    def __len__(self):
+        return self.reader.count
+
+    def __getitem__(self, i):
+        return self.reader.tick_at(i)
+
+
+def describe(record):
+    """Texto legível de um registro (para depuração)."""
+    tick, event, agent, x, y, arg = record
+    name = EVENT_NAMES.get(event, str(event))
+    if event in (EV_SPAWN_RESOURCE,):
+        return f"{tick:>7} {name} {RESOURCE_NAMES.get(agent)} id={arg} ({x},{y})"
+    if event in (EV_DELIVER, EV_BELIEF):
+        return f"{tick:>7} {name} agente={agent} ({x},{y}) {RESOURCE_NAMES.get(arg, '-')}"
+    return f"{tick:>7} {name} agente={agent} ({x},{y}) arg={arg}"
+
+
+if __name__ == "__main__":
+    import sys
+    reader = TraceReader(sys.argv[1])
+    print(f"{reader.path}: {len(reader)} registros, até o passo {reader.last_tick()}")
+    print(json.dumps(reader.meta, ensure_ascii=False))
+    for record in reader.records(0, 50):
+        print(describe(record))